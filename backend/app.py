@@ -1,14 +1,21 @@
-import pandas as pd
+import os
+import json
 import datetime
+import itertools
 import random
-from flask import Flask, request, jsonify
+import time
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
-from googletrans import Translator
-from rapidfuzz import fuzz
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
-from pyphonetics import Soundex
+from fuzzy_name_lib import (DualScriptIndex, NameIndex, iter_search_name, load_and_preprocess_data, metrics,
+                            search_name, search_names_bulk, search_page)
+from fuzzy_name_lib.sessions import SuggestionCancelled, SuggestionSessions
+from fuzzy_name_lib.sharding import ShardedIndex
+from fuzzy_name_lib.snapshot import load_or_build
+from fuzzy_name_lib.storage import PostgresBackend
+from fuzzy_name_lib.translation import CACHED_BACKENDS, configure_translation_cache, set_translation_backend
 
 app = Flask(__name__)
 CORS(app)
@@ -21,9 +28,12 @@ engine = create_engine(DATABASE_URL)
 # Create a session factory
 Session = sessionmaker(bind=engine)
 
-# Initialize the translator and Soundex encoder
-translator = Translator()
-soundex = Soundex()
+# Query translation: offline transliteration by default, 'google' needs network access.
+# Remote translations are cached on disk so a restart starts warm.
+TRANSLATION_BACKEND = os.environ.get('TRANSLATION_BACKEND', 'transliterate')
+set_translation_backend(TRANSLATION_BACKEND)
+if TRANSLATION_BACKEND in CACHED_BACKENDS:
+    configure_translation_cache(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translation_cache.sqlite3'))
 
 def generate_fir_number():
     """Generate a unique FIR number based on current date and random number"""
@@ -32,169 +42,82 @@ def generate_fir_number():
     random_num = random.randint(1000, 9999)
     return f"FIR{date_str}{random_num}"
 
-# Load and preprocess the dataset
-def load_and_preprocess_data():
-    query = 'SELECT * FROM "Names_individuals";'
-    df = pd.read_sql(query, engine)
-    
-    # Normalize the column names
-    df.columns = df.columns.str.strip().str.lower()
-    print("Columns in dataset:", df.columns)
-    
-    # Ensure relevant columns are strings
-    df['names'] = df['names'].astype(str)
-    df['voter_gender'] = df['voter_gender'].astype(str) if 'voter_gender' in df.columns else ''
-    df['casetype'] = df['casetype'].astype(str)
-    df['casefir'] = df['casefir'].astype(str) if 'casefir' in df.columns else ''
-    df['location'] = df['location'].astype(str)
-
-    return df
-
-# Load the data globally
-data = load_and_preprocess_data()
-
-def translate_input(input_text):
-    try:
-        if input_text.isascii():
-            translated = translator.translate(input_text, src='en', dest='hi').text
-        else:
-            translated = translator.translate(input_text, src='hi', dest='en').text
-        return translated
-    except Exception as e:
-        print(f"Translation error: {e}")
-        return input_text
-
-def get_phonetic_code(name):
-    try:
-        return soundex.phonetics(name)
-    except Exception as e:
-        print(f"Error generating phonetic code for {name}: {e}")
-        return None
-
-def get_suggestions(input_text, dataframe, limit=10):
-    input_text = input_text.strip().lower()
-    translated_text = translate_input(input_text).lower() if input_text else ""
-    input_phonetic = get_phonetic_code(input_text)
-    suggestions = []
-
-    matching_names = []
-    other_names = []
-
-    for _, row in dataframe.iterrows():
-        name = row['names'].lower()
-        name_phonetic = get_phonetic_code(name)
-        
-        partial_ratio_score = max(
-            fuzz.partial_ratio(input_text, name),
-            fuzz.partial_ratio(translated_text, name) if translated_text else 0
-        )
-        
-        prefix_score = 0
-        match_len = 0
-        if name.startswith(input_text) or (translated_text and name.startswith(translated_text)):
-             prefix_score = 100
-             match_len = len(input_text) if name.startswith(input_text) else len(translated_text) if translated_text else 0
-        elif  input_text and (name.startswith(input_text[:1]) or (translated_text and name.startswith(translated_text[:1]))):
-           match_len = 1
-           if name.startswith(input_text[:2]) or (translated_text and name.startswith(translated_text[:2])):
-                match_len=2
-                if name.startswith(input_text[:3]) or (translated_text and name.startswith(translated_text[:3])):
-                     match_len=3
-           prefix_score = 50 + match_len * 10  
-        
-        
-        length_penalty = 0 if match_len == 0 else (1 - (match_len / len(name))) * 25
-
-        total_score = partial_ratio_score + prefix_score - length_penalty
-
-        suggestion = {
-                'name': row['names'],
-                'age': row.get('age', 'N/A'),
-                'location': row.get('location', 'N/A'),
-                'score': total_score
-            }
-
-        if name.startswith(input_text) or (translated_text and name.startswith(translated_text)):
-             matching_names.append(suggestion)
-        else:
-           other_names.append(suggestion)
-    
-    if matching_names:
-      if len(matching_names) > 1 and input_text and len(input_text) > 1:
-        match_char = input_text[1]
-        matching_with_char = []
-        matching_without_char = []
-        for item in matching_names:
-           if len(item['name']) > 1 and item['name'].lower()[1] == match_char:
-              matching_with_char.append(item)
-           else:
-              matching_without_char.append(item)
-        
-        if matching_with_char:
-            sorted_matching_names = sorted(matching_with_char, key=lambda x: x['score'], reverse = True)
-            sorted_matching_names_without_char = sorted(matching_without_char,key=lambda x: x['name'])
-            sorted_matching_names = sorted_matching_names + sorted_matching_names_without_char
-        
-        else:
-           sorted_matching_names = sorted(matching_names,key=lambda x: x['name'])
-           
-      else:
-         sorted_matching_names = sorted(matching_names, key=lambda x: x['score'], reverse = True)
-    else:
-        sorted_matching_names = []
-      
-    sorted_other_names = sorted(other_names, key=lambda x: x['score'], reverse=True)
-    
-    suggestions = sorted_matching_names + sorted_other_names
-    
-    return [sugg for sugg in suggestions[:limit]]
-
-def search_name(input_name, dataframe):
-    input_name = input_name.strip().lower()
-    translated_name = translate_input(input_name).lower() if input_name else "" # Set to "" if input_name is empty
-    input_phonetic = get_phonetic_code(input_name)
-    results = []
-
-    for _, row in dataframe.iterrows():
-        name = row['names'].lower()
-        name_phonetic = get_phonetic_code(name)
-        
-        partial_ratio_score = max(
-            fuzz.partial_ratio(input_name, name),
-            fuzz.partial_ratio(translated_name, name) if translated_name else 0 # only calculate if translated_name is present
-        )
-        
-        prefix_score = 0
-        match_len = 0
-        if name.startswith(input_name) or (translated_name and name.startswith(translated_name)):
-             prefix_score = 100
-             match_len = len(input_name) if name.startswith(input_name) else len(translated_name) if translated_name else 0
-        elif  input_name and (name.startswith(input_name[:1]) or (translated_name and name.startswith(translated_name[:1]))): # if names starts with same first char
-           match_len = 1
-           if name.startswith(input_name[:2]) or (translated_name and name.startswith(translated_name[:2])): # if names starts with same 2 char
-                match_len=2
-                if name.startswith(input_name[:3]) or (translated_name and name.startswith(translated_name[:3])): # if names starts with same 3 char
-                     match_len=3
-           prefix_score = 50 + match_len * 10  
-        
-        # Calculate length penalty: shorter match gets less penalty
-        length_penalty = 0 if match_len == 0 else (1 - (match_len / len(name))) * 25
-
-        total_score = partial_ratio_score + prefix_score - length_penalty
-
-
-        if total_score > 60 or (input_phonetic and name_phonetic and input_phonetic == name_phonetic):
-            results.append({
-                'name': row['names'],
-                'age': row.get('age', 'N/A'),
-                'casetype': row.get('casetype', 'N/A'),
-                'casefir': row.get('casefir', 'N/A'),
-                'location': row.get('location', 'N/A'),
-                'confidence': total_score,
-            })
-
-    results.sort(key=lambda x: x['confidence'], reverse=True)
-    return results
+INDEX_SNAPSHOT_PATH = os.environ.get(
+    'INDEX_SNAPSHOT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index_snapshot'))
+
+# With DUAL_SCRIPT=1 every name is indexed in both Roman and Devanagari script at load,
+# so queries are matched in their own script and never translated per request
+DUAL_SCRIPT = os.environ.get('DUAL_SCRIPT', '0') == '1'
+
+def build_name_index():
+    # Load only the searched columns, in chunks; the DataFrame is not kept since
+    # the index holds everything search needs.
+    index_class = DualScriptIndex if DUAL_SCRIPT else NameIndex
+    return index_class.from_dataframe(load_and_preprocess_data(engine, "Names_individuals"))
+
+def load_new_rows(start):
+    # Rows inserted (e.g. by /add-record) after the snapshot was saved
+    return load_and_preprocess_data(engine, "Names_individuals", offset=start)
+
+# Open the memory-mapped index snapshot while it still matches the table's row count,
+# extend it with the rows added since, or rebuild it from the database and save a fresh one
+with engine.connect() as connection:
+    row_count = connection.execute(text('SELECT count(*) FROM "Names_individuals";')).scalar()
+# The version names the index kind, so switching DUAL_SCRIPT rebuilds instead of loading the other kind
+name_index = load_or_build(INDEX_SNAPSHOT_PATH, build_name_index,
+                           version='dual-script' if DUAL_SCRIPT else 'single-script', rows=row_count,
+                           load_rows=load_new_rows)
+# With TYPO_DISTANCE set (1 or 2), /search and /suggest also return names holding a
+# token within that many edits of a query token, found in a SymSpell deletion dictionary
+TYPO_DISTANCE = int(os.environ.get('TYPO_DISTANCE', '0')) or None
+# Type-ahead state per client, so each keystroke narrows the previous one's matches
+suggestion_sessions = SuggestionSessions(name_index, typo_distance=TYPO_DISTANCE)
+# With SEARCH_BACKEND=postgres, /search rescores only the candidates pg_trgm and
+# fuzzystrmatch find inside the database instead of scoring every row in memory
+storage_backend = None
+if os.environ.get('SEARCH_BACKEND', 'memory') == 'postgres':
+    storage_backend = PostgresBackend(engine, "Names_individuals")
+    storage_backend.prepare()
+# With SEARCH_CANDIDATES set, /search scores only that many trigram and prefix
+# candidates per source instead of every row of the in-memory index
+SEARCH_CANDIDATES = int(os.environ.get('SEARCH_CANDIDATES', '0')) or None
+# With SEARCH_LSH=1 those candidates come from MinHash LSH tables instead, for very large tables
+SEARCH_LSH = os.environ.get('SEARCH_LSH', '0') == '1'
+# With SEARCH_SHARDS set, /search fans out to that many worker processes, one index shard each
+# (single-script indexes only). Each shard would pick its own candidates, so the merged
+# results would not be those of the whole index: shards do not combine with candidates.
+SEARCH_SHARDS = int(os.environ.get('SEARCH_SHARDS', '0'))
+if SEARCH_SHARDS > 0 and (SEARCH_CANDIDATES or SEARCH_LSH):
+    raise ValueError("SEARCH_SHARDS cannot be combined with SEARCH_CANDIDATES or SEARCH_LSH")
+search_engine = ShardedIndex(name_index, shards=SEARCH_SHARDS) if SEARCH_SHARDS > 0 and not DUAL_SCRIPT else None
+# Page size of /search requests sending a cursor without a limit, and of SEARCH_BACKEND=postgres results
+DEFAULT_PAGE_SIZE = 50
+
+# Per-stage timings and counts for /metrics; METRICS=0 turns recording off.
+# METRICS_LOG=1 also prints one JSON line per request with its own timings.
+metrics.enable(os.environ.get('METRICS', '1') != '0')
+METRICS_LOG = os.environ.get('METRICS_LOG', '0') == '1'
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    metrics.begin_request()
+
+@app.after_request
+def record_request_metrics(response):
+    # Streamed responses are timed up to their first byte
+    seconds = time.perf_counter() - g.request_start
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe('fuzzy_name_http_request_seconds', seconds, endpoint=endpoint)
+    metrics.increment('fuzzy_name_http_requests_total', endpoint=endpoint, status=response.status_code)
+    record = metrics.end_request()
+    if METRICS_LOG and record is not None:
+        print(json.dumps({"endpoint": endpoint, "status": response.status_code, "seconds": seconds, **record}))
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/suggest', methods=['GET'])
 def suggest():
@@ -205,8 +128,13 @@ def suggest():
         return jsonify({"error": "Name input is required"}), 400
 
     try:
-        suggestions = get_suggestions(input_text, data)
-        return jsonify({"suggestions": suggestions})
+        session_id = request.args.get('session') or request.remote_addr
+        suggestions = suggestion_sessions.suggest(session_id, input_text)
+        with metrics.stage('http.jsonify'):
+            return jsonify({"suggestions": suggestions})
+    except SuggestionCancelled:
+        # A newer keystroke from the same client is being answered instead
+        return jsonify({"suggestions": [], "stale": True})
     except Exception as e:
         print(f"Error occurred during suggestion generation: {e}")
         return jsonify({"error": str(e)}), 500
@@ -221,16 +149,92 @@ def search():
 
     if not input_name:
         return jsonify({"error": "Name is required"}), 400
+    # e.g. {"location": "Dewas", "voter_gender": "1", "age": {"min": 20, "max": 30}},
+    # answered from the in-memory attribute indexes before any name is scored
+    filters = req_data.get('filters') or None
+    if filters is not None and not isinstance(filters, dict):
+        return jsonify({"error": "filters must be an object"}), 400
+    # {"limit": n} returns one page and a "next_cursor" to pass back as {"cursor": ...};
+    # {"stream": true} sends one JSON line per result, best first, as they are built
+    limit = req_data.get('limit')
+    cursor = req_data.get('cursor')
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    if cursor is not None and not isinstance(cursor, str):
+        return jsonify({"error": "cursor must be a string"}), 400
+    # {"tokens": true} matches names token by token, so word order and initials do not matter
+    options = dict(max_candidates=SEARCH_CANDIDATES, typo_distance=TYPO_DISTANCE, lsh=SEARCH_LSH, filters=filters,
+                   tokens=bool(req_data.get('tokens')))
+
+    if req_data.get('stream'):
+        def generate():
+            try:
+                max_edits = req_data.get('max_edits')
+                results = iter_search_name(input_name, name_index,
+                                           max_edits=None if max_edits is None else int(max_edits), **options)
+                for result in itertools.islice(results, limit):
+                    yield json.dumps(result, ensure_ascii=False) + "\n"
+            except Exception as e:
+                print(f"Error occurred during streaming search: {e}")
+                yield json.dumps({"error": str(e)}) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
     try:
-        results = search_name(input_name, data)
+        if limit is not None or cursor:
+            if req_data.get('max_edits') is not None:
+                return jsonify({"error": "limit and cursor do not apply to max_edits searches"}), 400
+            results, next_cursor = search_page(input_name, name_index, limit or DEFAULT_PAGE_SIZE, cursor, **options)
+            with metrics.stage('http.jsonify'):
+                return jsonify({"results": results, "next_cursor": next_cursor})
+        # {"max_edits": k} asks for exactly the names within k edits, from the in-memory index
+        if req_data.get('max_edits') is not None:
+            results = search_name(input_name, name_index, max_edits=int(req_data['max_edits']), filters=filters)
+        elif filters or options['tokens']:
+            results = search_name(input_name, name_index, **options)
+        elif storage_backend:
+            # Candidates are capped at MAX_CANDIDATES, so only the best page of them is reliable
+            results = storage_backend.search(input_name, limit=DEFAULT_PAGE_SIZE)
+        elif search_engine:
+            # Requests with max_edits, filters or tokens were answered by the in-memory index above
+            results = search_engine.search(input_name, typo_distance=TYPO_DISTANCE)
+        else:
+            results = search_name(input_name, name_index, max_candidates=SEARCH_CANDIDATES,
+                                  typo_distance=TYPO_DISTANCE, lsh=SEARCH_LSH)
         if not results:
             return jsonify({"message": "No results found for the given name."}), 404
-        return jsonify({"results": results})
+        with metrics.stage('http.jsonify'):
+            return jsonify({"results": results})
+    except ValueError as e:
+        print(f"Invalid search: {e}")
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error occurred: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/search/batch', methods=['POST'])
+def search_batch():
+    req_data = request.json or {}
+    names = req_data.get('names')
+    limit = req_data.get('limit')
+    print(f"Received {len(names) if isinstance(names, list) else 0} names to search")
+
+    if not isinstance(names, list) or not names or not all(isinstance(name, str) for name in names):
+        return jsonify({"error": "names must be a non-empty list of strings"}), 400
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    def generate():
+        # One JSON line per name, sent as soon as its block of queries is scored
+        try:
+            for name, results in search_names_bulk(names, name_index, limit=limit):
+                yield json.dumps({"name": name, "results": results}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            print(f"Error occurred during batch search: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/add-record', methods=['POST'])
 def add_record():
      try:
@@ -280,6 +284,9 @@ def add_record():
             inserted_record = result.fetchone()
             session.commit()
 
+            # Make the new record searchable straight away, without reloading the table
+            name_index.add_record(inserted_record._mapping)
+
              # Format response record
             response_record = {
                 'name': inserted_record.names,
@@ -113,7 +113,9 @@ const PoliceDashboard = () => {
             setIsSuggestionsLoading(true);
             try {
                 const suggestions = await suggestName(query);
-                setNameSuggestions(suggestions);
+                if (suggestions !== null) {
+                    setNameSuggestions(suggestions);
+                }
             } catch (error) {
                 console.error("Error fetching suggestions:", error);
             } finally {
@@ -2,6 +2,9 @@ import axios from "axios";
 
 const BASE_URL = "http://localhost:5000";
 
+// Identifies this tab's suggestion session, so each keystroke builds on the last one
+const SUGGEST_SESSION = Math.random().toString(36).slice(2);
+
 export const searchName = async (name) => {
   try {
     const response = await axios.post(`${BASE_URL}/search`, { name });
@@ -16,9 +19,13 @@ export const searchName = async (name) => {
 export const suggestName = async (name) => {
   try {
     const response = await axios.get(`${BASE_URL}/suggest`, {
-      params: { name },
+      params: { name, session: SUGGEST_SESSION },
     });
     console.log("Suggestion API Response:", response);
+    // Superseded by a newer keystroke: keep whatever that one returns
+    if (response.data.stale) {
+      return null;
+    }
     if (response.data.suggestions && Array.isArray(response.data.suggestions)) {
       return response.data.suggestions.map((item) => item.name);
     }
@@ -0,0 +1,235 @@
+"""Benchmark index build, search_name and get_suggestions on synthetic names tables.
+
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 --output results.json
+    python benchmarks/run_benchmarks.py --rows 10000 --compare results.json
+    python benchmarks/run_benchmarks.py --rows 1000000 --bands 32 --band-rows 2 --recall-k 10
+
+Tables are drawn from a NameModel learned from backend/data/data.csv, so the
+same seed gives the same table and queries on every commit. Each table size
+runs in its own process, so its peak RSS is not inflated by the previous one.
+Search queries are sampled names with one noise operation applied; suggestion
+queries are prefixes of sampled names, as typed into the dashboard. The trigram
+candidate mode (``max_candidates``) and the MinHash LSH mode (``lsh=True``) of
+``search_name`` are timed on the search queries, and their recall@k is measured
+against the exact full scan.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Import the library from this checkout, installed or not
+sys.path.insert(0, os.path.dirname(HERE))
+DEFAULT_SOURCE = os.path.join(HERE, '..', '..', 'backend', 'data', 'data.csv')
+DEFAULT_ROWS = (10000, 100000)
+WARMUP_CALLS = 5
+
+
+def latency_stats(seconds, items=None):
+    """p50/p95/p99/mean in milliseconds and throughput for a list of call durations."""
+    seconds = np.asarray(seconds, dtype=np.float64)
+    milliseconds = seconds * 1000
+    return {
+        'calls': len(seconds),
+        'p50_ms': float(np.percentile(milliseconds, 50)),
+        'p95_ms': float(np.percentile(milliseconds, 95)),
+        'p99_ms': float(np.percentile(milliseconds, 99)),
+        'mean_ms': float(milliseconds.mean()),
+        'throughput_per_s': float((items or len(seconds)) / seconds.sum()),
+    }
+
+
+def recall_at_k(exact_rows, approximate_rows):
+    """Share of the row ids of the exact top-k pages that the approximate pages also hold.
+
+    Both rank ties by row id, so a tied row counts only if it is the same row.
+    """
+    found = total = 0
+    for exact, approximate in zip(exact_rows, approximate_rows):
+        found += len(set(exact.tolist()) & set(approximate.tolist()))
+        total += len(exact)
+    return found / total if total else 1.0
+
+
+def _top_rows(index, queries, k, max_candidates=None, lsh=False):
+    # Row ids of the results search_name(query, index, limit=k, ...) returns, for each query
+    from fuzzy_name_lib.search import MAX_CANDIDATES, candidate_rows, lsh_candidate_rows, match_rows
+    from fuzzy_name_lib.translation import translate_input
+    top = []
+    for query in queries:
+        query = query.strip().lower()
+        translated = translate_input(query).lower() if query else ""
+        rows = None
+        if lsh:
+            rows = lsh_candidate_rows(index, query, translated, max_candidates=max_candidates or MAX_CANDIDATES)
+        elif max_candidates is not None:
+            rows = candidate_rows(index, query, translated, max_candidates=max_candidates)
+        top.append(match_rows(index, query, translated, limit=k, rows=rows)[0])
+    return top
+
+
+def _time_calls(function, arguments):
+    durations = []
+    for argument in arguments:
+        start = time.perf_counter()
+        function(argument)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run_size(rows, queries, seed, source, build_repeats, bands, band_rows, recall_k):
+    """Benchmark one table size in this process and return its results."""
+    from fuzzy_name_lib import NameIndex, get_suggestions, search_name
+    from fuzzy_name_lib.search import MAX_CANDIDATES
+    from fuzzy_name_lib.data_loader import peak_rss_bytes
+    from fuzzy_name_lib.minhash_index import MinHashIndex
+    from fuzzy_name_lib.synthetic import NameModel, perturb
+
+    model = NameModel.from_csv(source)
+    start = time.perf_counter()
+    table = model.sample(rows, seed=seed)
+    generate_seconds = time.perf_counter() - start
+
+    build_durations = []
+    for _ in range(build_repeats):
+        index = None  # let the previous build go before measuring the next
+        start = time.perf_counter()
+        index = NameIndex.from_dataframe(table)
+        build_durations.append(time.perf_counter() - start)
+    del table
+    build_rss = peak_rss_bytes()
+
+    rng = np.random.default_rng(seed + 1)
+    names = index.names[rng.integers(rows, size=queries)].tolist()
+    search_queries = perturb(names, seed=seed, probabilities=model.noise_probabilities())
+    suggest_queries = [name[:int(rng.integers(3, max(len(name), 3) + 1))] for name in names]
+
+    for query in search_queries[:WARMUP_CALLS]:
+        search_name(query, index)
+        get_suggestions(query, index)
+    search_durations = _time_calls(lambda query: search_name(query, index), search_queries)
+    suggest_durations = _time_calls(lambda query: get_suggestions(query, index), suggest_queries)
+
+    start = time.perf_counter()
+    index.minhash_index = MinHashIndex(index.lower_names, bands, band_rows)
+    lsh_build_seconds = time.perf_counter() - start
+    candidate_durations = _time_calls(
+        lambda query: search_name(query, index, limit=recall_k, max_candidates=MAX_CANDIDATES), search_queries)
+    lsh_durations = _time_calls(lambda query: search_name(query, index, limit=recall_k, lsh=True), search_queries)
+    exact_rows = _top_rows(index, search_queries, recall_k)
+    candidate_rows = _top_rows(index, search_queries, recall_k, max_candidates=MAX_CANDIDATES)
+    lsh_rows = _top_rows(index, search_queries, recall_k, lsh=True)
+
+    return {
+        'rows': rows,
+        'queries': queries,
+        'generate_seconds': generate_seconds,
+        'index_build': dict(latency_stats(build_durations, rows * len(build_durations)),
+                            peak_rss_bytes=build_rss),
+        'search_name': latency_stats(search_durations),
+        'get_suggestions': latency_stats(suggest_durations),
+        'candidate_search': dict(latency_stats(candidate_durations), max_candidates=MAX_CANDIDATES,
+                                 recall_k=recall_k, recall=recall_at_k(exact_rows, candidate_rows)),
+        'lsh_search': dict(latency_stats(lsh_durations), bands=bands, band_rows=band_rows,
+                           build_seconds=lsh_build_seconds, recall_k=recall_k,
+                           recall=recall_at_k(exact_rows, lsh_rows)),
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+
+
+def environment():
+    import numpy
+    import pandas
+    import rapidfuzz
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'rapidfuzz': rapidfuzz.__version__,
+    }
+
+
+def compare(results, baseline):
+    """Print the change of each latency percentile against a previous run."""
+    previous = {entry['rows']: entry for entry in baseline['results']}
+    for entry in results['results']:
+        old = previous.get(entry['rows'])
+        if old is None:
+            continue
+        for benchmark in ('index_build', 'search_name', 'get_suggestions', 'candidate_search', 'lsh_search'):
+            if benchmark not in old or benchmark not in entry:
+                continue
+            changes = ', '.join(
+                f"{metric} {old[benchmark][metric]:.2f} -> {entry[benchmark][metric]:.2f} ms "
+                f"({(entry[benchmark][metric] / old[benchmark][metric] - 1) * 100:+.1f}%)"
+                for metric in ('p50_ms', 'p95_ms', 'p99_ms'))
+            print(f"{entry['rows']:>10} rows {benchmark:<16} {changes}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark fuzzy_name_lib on synthetic names tables.')
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_ROWS),
+                        help='table sizes to benchmark, e.g. 10000 100000 1000000 10000000')
+    parser.add_argument('--queries', type=int, default=200, help='search and suggestion queries per size')
+    parser.add_argument('--build-repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bands', type=int, default=24, help='MinHash LSH bands')
+    parser.add_argument('--band-rows', type=int, default=2, help='MinHash values per LSH band')
+    parser.add_argument('--recall-k', type=int, default=10, help='page size candidate and LSH recall are measured at')
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help='CSV the name model is learned from')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        # Child process: one size, results as JSON on stdout
+        print(json.dumps(run_size(args.rows[0], args.queries, args.seed, args.source, args.build_repeats,
+                                  args.bands, args.band_rows, args.recall_k)))
+        return
+
+    results = {'environment': environment(), 'seed': args.seed, 'results': []}
+    for rows in args.rows:
+        print(f"Benchmarking {rows} rows...", file=sys.stderr)
+        command = [sys.executable, os.path.abspath(__file__), '--single', '--rows', str(rows),
+                   '--queries', str(args.queries), '--build-repeats', str(args.build_repeats),
+                   '--seed', str(args.seed), '--source', args.source, '--bands', str(args.bands),
+                   '--band-rows', str(args.band_rows), '--recall-k', str(args.recall_k)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        entry = json.loads(output.strip().splitlines()[-1])
+        results['results'].append(entry)
+        print(f"  build p50 {entry['index_build']['p50_ms']:.0f} ms, "
+              f"search p50/p99 {entry['search_name']['p50_ms']:.1f}/{entry['search_name']['p99_ms']:.1f} ms, "
+              f"suggest p50/p99 {entry['get_suggestions']['p50_ms']:.1f}/{entry['get_suggestions']['p99_ms']:.1f} ms, "
+              f"candidates p50 {entry['candidate_search']['p50_ms']:.1f} ms at recall@{args.recall_k} "
+              f"{entry['candidate_search']['recall']:.3f}, "
+              f"LSH p50 {entry['lsh_search']['p50_ms']:.1f} ms at recall@{args.recall_k} "
+              f"{entry['lsh_search']['recall']:.3f}, "
+              f"peak RSS {entry['peak_rss_bytes'] / 2 ** 20:.0f} MiB", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            compare(results, json.load(baseline_file))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
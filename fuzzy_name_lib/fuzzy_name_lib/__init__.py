@@ -1,5 +1,7 @@
 from .data_loader import load_and_preprocess_data
 from .translation import translate_input
 from .phonetics import get_phonetic_code
+from .index import NameIndex
+from .dual_script import DualScriptIndex
 from .suggestion import get_suggestions
-from .search import search_name
+from .search import iter_search_name, search_name, search_names_bulk, search_page
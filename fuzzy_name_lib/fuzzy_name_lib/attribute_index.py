@@ -0,0 +1,138 @@
+"""Bitmap and sorted-array indexes over the display fields, for filtering rows before scoring.
+
+A filter maps a field to a value, a list of values (any of them) or, for
+integer fields such as age, a ``{'min': low, 'max': high}`` range with either
+bound optional. Each categorical field keeps the rows of every category as a
+compressed bitset, and each integer field its values sorted alongside their row
+ids, so the rows matching all filters come from a few bit operations and binary
+searches instead of reading every record.
+"""
+import numpy as np
+from .columns import CategoricalColumn, IntColumn
+
+# Added rows compared directly before a field's index is rebuilt (as in PrefixIndex)
+MIN_TAIL_SIZE = 1024
+INT32_MAX = 2 ** 31 - 1
+
+
+class CategoryBitmaps:
+    """The rows holding each category of a ``CategoricalColumn``.
+
+    As in Roaring bitmaps, each category keeps whichever is smaller: a packed
+    bitmap of one bit per row, or the sorted row ids of a rare category.
+    """
+
+    def __init__(self, column):
+        codes = np.asarray(column.codes.array)
+        self.column = column
+        self.rows = len(codes)
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        bounds = np.searchsorted(codes[order], np.arange(len(column.categories) + 1))
+        self.sets = []
+        for code in range(len(column.categories)):
+            row_ids = order[bounds[code]:bounds[code + 1]]
+            if len(row_ids) * 32 < self.rows:
+                self.sets.append(row_ids)
+            else:
+                bits = np.zeros(self.rows, dtype=bool)
+                bits[row_ids] = True
+                self.sets.append(np.packbits(bits))
+
+    def mask(self, values, rows):
+        """Boolean mask over the first ``rows`` rows of those holding any of ``values``."""
+        codes = set()
+        for value in values:
+            # Loaded categories are strings, while requests may send numbers
+            code = self.column.category_codes.get(value, self.column.category_codes.get(str(value)))
+            if code is not None:
+                codes.add(code)
+        mask = np.zeros(rows, dtype=bool)
+        built = min(self.rows, rows)
+        for code in codes:
+            if code >= len(self.sets):
+                continue
+            found = self.sets[code]
+            if found.dtype == np.uint8:
+                mask[:built] |= np.unpackbits(found, count=self.rows)[:built].astype(bool)
+            else:
+                mask[found[found < rows]] = True
+        if rows > self.rows and codes:
+            mask[self.rows:] = np.isin(self.column.codes.array[self.rows:rows], list(codes))
+        return mask
+
+
+class SortedValues:
+    """The values of an ``IntColumn`` in ascending order, with the row id of each."""
+
+    def __init__(self, column):
+        values = np.asarray(column.values.array)
+        self.column = column
+        self.rows = len(values)
+        self.row_ids = np.argsort(values, kind='stable').astype(np.int32)
+        self.values = values[self.row_ids]
+
+    def mask(self, low, high, rows):
+        """Boolean mask over the first ``rows`` rows of those valued ``low`` to ``high``, inclusive.
+
+        Rows with no value never match.
+        """
+        low = IntColumn.MISSING + 1 if low is None else max(int(low), IntColumn.MISSING + 1)
+        high = INT32_MAX if high is None else min(int(high), INT32_MAX)
+        mask = np.zeros(rows, dtype=bool)
+        start = np.searchsorted(self.values, low, side='left')
+        stop = np.searchsorted(self.values, high, side='right')
+        found = self.row_ids[start:stop]
+        mask[found[found < rows]] = True
+        if rows > self.rows:
+            added = self.column.values.array[self.rows:rows]
+            mask[self.rows:] = (added >= low) & (added <= high)
+        return mask
+
+
+class AttributeIndex:
+    """Rows matching structured filters on an index's display fields.
+
+    Each field's index is built on first use and rebuilt once enough rows have
+    been added after it; until then the added rows are compared directly.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.columns = {}
+
+    def _column_index(self, column, rows):
+        values = self.fields.get(column)
+        if values is None:
+            raise ValueError(f"Unknown filter field {column!r}; expected one of {sorted(self.fields)}")
+        if not isinstance(values, (CategoricalColumn, IntColumn)):
+            return values
+        built = self.columns.get(column)
+        if built is None or rows - built.rows > max(MIN_TAIL_SIZE, built.rows // 8):
+            built = CategoryBitmaps(values) if isinstance(values, CategoricalColumn) else SortedValues(values)
+            self.columns[column] = built
+        return built
+
+    def _mask(self, column, value, rows):
+        built = self._column_index(column, rows)
+        is_range = isinstance(value, dict)
+        if is_range and not isinstance(built, SortedValues):
+            raise ValueError(f"Filter field {column!r} does not take a range")
+        if is_range:
+            return built.mask(value.get('min'), value.get('max'), rows)
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        if isinstance(built, CategoryBitmaps):
+            return built.mask(values, rows)
+        mask = np.zeros(rows, dtype=bool)
+        if isinstance(built, SortedValues):
+            for single in values:
+                mask |= built.mask(single, single, rows)
+            return mask
+        # Free-text fields such as casefir are not indexed; their values are compared directly
+        return np.isin(built.values.array[:rows], [str(single) for single in values])
+
+    def matching_rows(self, filters, rows):
+        """Row ids, ascending, among the first ``rows`` rows matching every filter."""
+        mask = np.ones(rows, dtype=bool)
+        for column, value in filters.items():
+            mask &= self._mask(column, value, rows)
+        return mask.nonzero()[0]
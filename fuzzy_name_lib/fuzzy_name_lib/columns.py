@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+
+class GrowableArray:
+    """NumPy array with spare capacity, so appends are amortized O(1).
+
+    It can wrap a read-only (e.g. memory-mapped) array; the first append copies
+    it into a private buffer. String arrays widen when a longer value arrives.
+    """
+
+    def __init__(self, values=(), dtype=None):
+        self.buffer = np.asarray(values, dtype=dtype)
+        self.size = len(self.buffer)
+
+    @property
+    def array(self):
+        return self.buffer[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row_id):
+        return self.buffer[:self.size][row_id]
+
+    def extend(self, values):
+        dtype = self.buffer.dtype
+        values = np.asarray(values, dtype=str if dtype.kind == 'U' else dtype)
+        if not len(values):
+            return
+        stop = self.size + len(values)
+        if dtype.kind == 'U' and values.dtype.itemsize > dtype.itemsize:
+            # Headroom, so slightly longer strings do not each force a copy
+            dtype = np.dtype(f'<U{values.dtype.itemsize // 4 + 8}')
+        if stop > len(self.buffer) or dtype != self.buffer.dtype or not self.buffer.flags.writeable:
+            capacity = max(stop, 2 * len(self.buffer), 16) if stop > len(self.buffer) else len(self.buffer)
+            buffer = np.zeros(capacity, dtype=dtype)
+            buffer[:self.size] = self.buffer[:self.size]
+            self.buffer = buffer
+        self.buffer[self.size:stop] = values
+        self.size = stop
+
+
+class CategoricalColumn:
+    """Dictionary-encoded column: one integer code per row, each distinct value stored once."""
+
+    def __init__(self, values=(), categories=None, codes=None):
+        self.categories = list(categories) if categories is not None else []
+        self.category_codes = {value: code for code, value in enumerate(self.categories)}
+        self.codes = GrowableArray(codes if codes is not None else (), dtype=np.int32)
+        self.extend(values)
+
+    @classmethod
+    def from_categorical(cls, categorical):
+        return cls(categories=categorical.categories, codes=np.asarray(categorical.codes, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row_id):
+        code = self.codes[row_id]
+        return self.categories[code] if code >= 0 else 'N/A'
+
+    def extend(self, values):
+        codes = []
+        for value in values:
+            code = self.category_codes.get(value)
+            if code is None:
+                code = self.category_codes[value] = len(self.categories)
+                self.categories.append(value)
+            codes.append(code)
+        self.codes.extend(codes)
+
+
+class IntColumn:
+    """Integer column stored as a compact array; missing values read back as None."""
+
+    MISSING = -2 ** 31
+
+    def __init__(self, values=(), array=None):
+        self.values = GrowableArray(array if array is not None else (), dtype=np.int32)
+        self.extend(values)
+
+    @classmethod
+    def from_series(cls, series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(array=np.where(np.isnan(values), cls.MISSING, values).astype(np.int32))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, row_id):
+        value = int(self.values[row_id])
+        return None if value == self.MISSING else value
+
+    def extend(self, values):
+        converted = []
+        for value in values:
+            try:
+                converted.append(int(value))
+            except (TypeError, ValueError):
+                converted.append(self.MISSING)
+        self.values.extend(converted)
+
+
+class StringColumn:
+    """Text column stored as a fixed-width NumPy string array."""
+
+    def __init__(self, values=(), array=None):
+        self.values = GrowableArray(array if array is not None else [str(value) for value in values], dtype=str)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, row_id):
+        return str(self.values[row_id])
+
+    def extend(self, values):
+        self.values.extend([str(value) for value in values])
+
+
+def as_column(values):
+    """Store a DataFrame column (or any sequence) in the most compact column type."""
+    if isinstance(values, (CategoricalColumn, IntColumn, StringColumn)):
+        return values
+    if isinstance(values, pd.Series):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return CategoricalColumn.from_categorical(values.cat)
+        if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+            return IntColumn.from_series(values)
+        return StringColumn(values.astype(str).tolist())
+    values = list(values)
+    return as_column(pd.Series(values, dtype=None if values else object))
@@ -1,12 +1,105 @@
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
-
-def load_and_preprocess_data(db_url, table_name):
-    engine = create_engine(db_url)
-    query = f'SELECT * FROM "{table_name}";'
-    df = pd.read_sql(query, engine)
-    
-    # Normalize column names
-    df.columns = df.columns.str.strip().str.lower()
-    df['names'] = df['names'].astype(str)
+from pandas.api.types import union_categoricals
+from sqlalchemy import column, create_engine, inspect, select, table
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Only the columns search and the dashboard use are read
+LOAD_COLUMNS = ('names', 'age', 'location', 'casetype', 'casefir', 'voter_gender')
+# Low-cardinality text columns, stored once per distinct value
+CATEGORICAL_COLUMNS = ('location', 'casetype', 'voter_gender')
+# Numeric columns and their nullable dtypes
+NUMERIC_COLUMNS = {'age': 'Int16', 'id': 'Int64'}
+
+
+def _to_integers(values, dtype):
+    numbers = pd.to_numeric(values, errors='coerce')
+    bounds = np.iinfo(dtype.lower())
+    # Fractions and values the dtype cannot hold become missing rather than failing the load
+    valid = (numbers % 1 == 0) & numbers.between(bounds.min, bounds.max)
+    if not valid.all():
+        numbers = numbers.where(valid)
+    return numbers.astype(dtype)
+
+
+def _compact_chunk(chunk):
+    chunk.columns = chunk.columns.str.strip().str.lower()
+    if 'names' in chunk.columns:
+        chunk['names'] = chunk['names'].astype(str)
+    for column in chunk.columns:
+        if column in CATEGORICAL_COLUMNS:
+            chunk[column] = chunk[column].astype(str).astype('category')
+        elif column in NUMERIC_COLUMNS:
+            chunk[column] = _to_integers(chunk[column], NUMERIC_COLUMNS[column])
+        elif column != 'names':
+            chunk[column] = chunk[column].astype(str)
+    return chunk
+
+
+def _concat_chunks(chunks, columns):
+    if not chunks:
+        return pd.DataFrame(columns=list(columns))
+    data = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if column in CATEGORICAL_COLUMNS:
+            # Plain concat would fall back to object dtype when categories differ
+            data[column] = union_categoricals(parts, ignore_order=True)
+        else:
+            data[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(data)
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def table_columns(engine, table_name, columns=LOAD_COLUMNS):
+    """Those of ``columns`` that ``table_name`` has, spelled as in the table; the rest are skipped."""
+    available = {column['name'].strip().lower(): column['name']
+                 for column in inspect(engine).get_columns(table_name)}
+    return [available[column] for column in columns if column in available]
+
+
+def iter_chunks(db_url, table_name, columns=LOAD_COLUMNS, chunksize=50000, offset=0):
+    """Yield compacted DataFrame chunks of ``columns`` streamed through a server-side cursor.
+
+    Columns the table does not have are left out of the chunks. With ``offset``
+    the first ``offset`` rows are skipped, e.g. those a saved index already holds.
+    """
+    engine = create_engine(db_url) if isinstance(db_url, str) else db_url
+    selected = [column(name) for name in table_columns(engine, table_name, columns)]
+    query = select(*selected).select_from(table(table_name))
+    if offset:
+        query = query.offset(offset)
+
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as connection:
+        for chunk in pd.read_sql(query, connection, chunksize=chunksize):
+            yield _compact_chunk(chunk)
+
+
+def load_and_preprocess_data(db_url, table_name, columns=LOAD_COLUMNS, chunksize=50000, offset=0):
+    """Stream ``columns`` of ``table_name`` in chunks through a server-side cursor.
+
+    Low-cardinality columns come back as categoricals and ages as small integers.
+    Memory use is printed and kept in ``df.attrs['memory']``. ``offset`` skips
+    the first rows, as in ``iter_chunks``.
+    """
+    chunks = list(iter_chunks(db_url, table_name, columns, chunksize, offset))
+    df = _concat_chunks(chunks, columns)
+    del chunks
+
+    df.attrs['memory'] = {
+        'rows': len(df),
+        'dataframe_bytes': int(df.memory_usage(deep=True).sum()),
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+    print(f"Loaded {len(df)} rows, columns {list(df.columns)}: {df.attrs['memory']}")
     return df
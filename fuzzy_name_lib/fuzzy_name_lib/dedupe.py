@@ -0,0 +1,271 @@
+"""Find records of the same person entered more than once in a names table.
+
+The job runs in three out-of-core steps, so the table never has to fit in memory:
+
+1. Stream the table in chunks. Each row gets one blocking key per pass in
+   ``BLOCKING_PASSES`` (e.g. phonetic code and location). Keys are hashed into
+   partition files on disk, and the report fields are spilled per chunk.
+2. Score every partition in a process pool. Only rows sharing a blocking key
+   are compared, with the same ``fuzz.partial_ratio`` based confidence search uses.
+3. Cluster the matched pairs with union-find and write one report row per
+   duplicate record. A pair blocked by several passes can turn up in several
+   partitions, so pairs are deduplicated across partitions first.
+
+Run it as ``python -m fuzzy_name_lib.dedupe DB_URL duplicates.csv``.
+"""
+import argparse
+import csv
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+from .data_loader import LOAD_COLUMNS, iter_chunks
+from .phonetics import encode_names
+from .scoring import score_name
+from .transliteration import transliterate
+
+# Each pass blocks rows on all of its keys; a pair is a candidate if any pass blocks it
+BLOCKING_PASSES = (
+    ('phonetic', 'location'),
+    ('phonetic', 'age_band'),
+    ('prefix', 'location', 'age_band'),
+)
+AGE_BAND_WIDTH = 5
+PREFIX_LENGTH = 3
+# Pairs must reach this confidence (out of 200) in both directions to count as duplicates
+DUPLICATE_THRESHOLD = 150
+# Larger blocks are compared in a sliding window over their sorted names instead of all pairs
+MAX_BLOCK_SIZE = 500
+WINDOW_SIZE = 50
+REPORT_COLUMNS = ('name', 'age', 'location', 'casetype', 'casefir', 'voter_gender')
+
+
+def roman_names(names):
+    """Lowercased Roman form of each name without punctuation, so Devanagari and Roman entries compare."""
+    return [' '.join(re.sub(r'[^\w\s]', ' ', name if name.isascii() else transliterate(name)).lower().split())
+            for name in names]
+
+
+def blocking_keys(chunk, names, passes=BLOCKING_PASSES):
+    """One key per pass for each row of ``chunk``; rows missing a key part get None."""
+    parts = {
+        'phonetic': encode_names(names, 'soundex'),
+        'prefix': [name.replace(' ', '')[:PREFIX_LENGTH] or None for name in names],
+    }
+    if 'location' in chunk:
+        parts['location'] = [str(location).strip().lower() or None if pd.notna(location) else None
+                             for location in chunk['location']]
+    if 'age' in chunk:
+        parts['age_band'] = [int(age) // AGE_BAND_WIDTH if pd.notna(age) else None for age in chunk['age']]
+
+    keys = []
+    for pass_id, pass_parts in enumerate(passes):
+        columns = [parts.get(part, [None] * len(names)) for part in pass_parts]
+        keys.append([f'{pass_id}|' + '|'.join(map(str, values)) if None not in values else None
+                     for values in zip(*columns)])
+    return keys
+
+
+def pair_confidence(name_a, name_b):
+    """Confidence that two lowercased names are the same, the lower of both search directions."""
+    return min(score_name(name_b, name_a, '')[0], score_name(name_a, name_b, '')[0])
+
+
+def _block_pairs(row_ids, names, threshold):
+    # partial_ratio is at most 100 below the confidence, so cut off everything lower first
+    cutoff = max(threshold - 100, 0)
+    if len(row_ids) <= MAX_BLOCK_SIZE:
+        matrix = process.cdist(names, names, scorer=fuzz.partial_ratio, score_cutoff=cutoff, workers=1)
+        first, second = np.nonzero(np.triu(matrix, k=1))
+    else:
+        order = np.argsort(names, kind='stable')
+        row_ids, names = row_ids[order], names[order]
+        first, second = [], []
+        for offset in range(1, WINDOW_SIZE + 1):
+            for position in range(len(names) - offset):
+                if fuzz.partial_ratio(names[position], names[position + offset], score_cutoff=cutoff):
+                    first.append(position)
+                    second.append(position + offset)
+    for a, b in zip(first, second):
+        yield row_ids[a], row_ids[b], names[a], names[b]
+
+
+def score_partition(path, threshold=DUPLICATE_THRESHOLD):
+    """Score the candidate pairs of one partition file.
+
+    Returns the candidate pairs, packed as ``row_a << 32 | row_b`` in an int64
+    array, and the matched pairs as ``(row_a, row_b, confidence)``.
+    """
+    entries = pd.read_csv(path, names=['key', 'row_id', 'name'], dtype={'key': str, 'name': str},
+                          keep_default_na=False)
+    seen = set()
+    matches = []
+    for _, block in entries.groupby('key', sort=False):
+        if len(block) < 2:
+            continue
+        row_ids = block['row_id'].to_numpy(dtype=np.int64)
+        names = block['name'].to_numpy(dtype=str)
+        for row_a, row_b, name_a, name_b in _block_pairs(row_ids, names, threshold):
+            pair = (min(row_a, row_b), max(row_a, row_b))
+            if pair[0] == pair[1] or pair in seen:
+                continue
+            seen.add(pair)
+            confidence = pair_confidence(name_a, name_b)
+            if confidence >= threshold:
+                matches.append((int(pair[0]), int(pair[1]), float(confidence)))
+    candidates = np.fromiter(((int(row_a) << 32) | int(row_b) for row_a, row_b in seen), dtype=np.int64,
+                             count=len(seen))
+    return candidates, matches
+
+
+class UnionFind:
+    """Disjoint sets over row ids, with path halving and union by size."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size.get(root_a, 1) < self.size.get(root_b, 1):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] = self.size.get(root_a, 1) + self.size.pop(root_b, 1)
+
+    def groups(self):
+        groups = defaultdict(list)
+        for item in self.parent:
+            groups[self.find(item)].append(item)
+        return [sorted(members) for members in groups.values() if len(members) > 1]
+
+
+def _partition_rows(db_url, table_name, work_dir, passes, partitions, chunksize):
+    paths = [os.path.join(work_dir, f'keys-{partition}.csv') for partition in range(partitions)]
+    files = [open(path, 'w', encoding='utf-8', newline='') for path in paths]
+    writers = [csv.writer(keys_file) for keys_file in files]
+    rows = 0
+    chunk_starts = []
+    try:
+        for chunk_id, chunk in enumerate(iter_chunks(db_url, table_name, LOAD_COLUMNS, chunksize)):
+            names = roman_names(chunk['names'].astype(str))
+            row_ids = range(rows, rows + len(chunk))
+            for keys in blocking_keys(chunk, names, passes):
+                for key, row_id, name in zip(keys, row_ids, names):
+                    if key is not None:
+                        # crc32, not hash(): it must be the same in every process
+                        writers[zlib.crc32(key.encode('utf-8')) % partitions].writerow((key, row_id, name))
+            report = chunk.rename(columns={'names': 'name'}).reindex(columns=list(REPORT_COLUMNS))
+            report.index = row_ids
+            report.to_pickle(os.path.join(work_dir, f'rows-{chunk_id}.pkl'))
+            chunk_starts.append(rows)
+            rows += len(chunk)
+    finally:
+        for keys_file in files:
+            keys_file.close()
+    return paths, chunk_starts, rows
+
+
+def _write_report(clusters, chunk_starts, work_dir, output_path):
+    cluster_of = {row_id: cluster_id for cluster_id, members in enumerate(clusters, 1) for row_id in members}
+    by_chunk = defaultdict(list)
+    for row_id in cluster_of:
+        by_chunk[int(np.searchsorted(chunk_starts, row_id, side='right')) - 1].append(row_id)
+
+    parts = [pd.read_pickle(os.path.join(work_dir, f'rows-{chunk_id}.pkl')).loc[sorted(row_ids)]
+             for chunk_id, row_ids in sorted(by_chunk.items())]
+    report = pd.concat(parts) if parts else pd.DataFrame(columns=list(REPORT_COLUMNS))
+    report.insert(0, 'cluster_id', [cluster_of[row_id] for row_id in report.index])
+    report.insert(1, 'cluster_size', report.groupby('cluster_id')['cluster_id'].transform('size'))
+    report = report.rename_axis('row_id').reset_index().sort_values(['cluster_id', 'row_id'])
+    report.to_csv(output_path, index=False, columns=['cluster_id', 'cluster_size', 'row_id', *REPORT_COLUMNS])
+
+
+def find_duplicates(db_url, table_name, output_path, pairs_path=None, passes=BLOCKING_PASSES,
+                    threshold=DUPLICATE_THRESHOLD, partitions=64, workers=None, chunksize=50000, work_dir=None):
+    """Write a CSV report of duplicate clusters in ``table_name`` to ``output_path``.
+
+    Row ids are positions in the streamed table. ``pairs_path`` optionally gets
+    every matched pair with its confidence. Partitions are scored by ``workers``
+    processes (all cores by default, inline when 1); intermediate files go to
+    ``work_dir`` or a temporary directory. Returns a summary dict.
+    """
+    own_work_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix='dedupe-') if own_work_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        paths, chunk_starts, rows = _partition_rows(db_url, table_name, work_dir, passes, partitions, chunksize)
+
+        if workers == 1:
+            results = [score_partition(path, threshold) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(score_partition, paths, [threshold] * len(paths)))
+
+        # The same pair from several partitions is counted, written and joined once
+        candidates = np.unique(np.concatenate([pairs for pairs, _ in results])) if results else []
+        matched = {(row_a, row_b): confidence for _, matches in results for row_a, row_b, confidence in matches}
+        union_find = UnionFind()
+        pairs_file = open(pairs_path, 'w', encoding='utf-8', newline='') if pairs_path else None
+        try:
+            pairs_writer = csv.writer(pairs_file) if pairs_file else None
+            if pairs_writer:
+                pairs_writer.writerow(('row_id_a', 'row_id_b', 'confidence'))
+            for (row_a, row_b), confidence in sorted(matched.items()):
+                union_find.union(row_a, row_b)
+                if pairs_writer:
+                    pairs_writer.writerow((row_a, row_b, confidence))
+        finally:
+            if pairs_file:
+                pairs_file.close()
+
+        clusters = sorted(union_find.groups())
+        _write_report(clusters, chunk_starts, work_dir, output_path)
+    finally:
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = {
+        'rows': rows,
+        'candidate_pairs': len(candidates),
+        'matched_pairs': len(matched),
+        'clusters': len(clusters),
+        'duplicate_rows': sum(len(members) for members in clusters),
+    }
+    print(f"Duplicate detection on {table_name}: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find duplicate person records in a names table.')
+    parser.add_argument('db_url', help='SQLAlchemy database URL')
+    parser.add_argument('output', help='CSV report of duplicate clusters')
+    parser.add_argument('--table', default='Names_individuals')
+    parser.add_argument('--pairs', help='also write every matched pair to this CSV')
+    parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD)
+    parser.add_argument('--partitions', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=None, help='scoring processes (default: all cores)')
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--work-dir', help='directory for intermediate files (default: a temporary one)')
+    args = parser.parse_args(argv)
+    find_duplicates(args.db_url, args.table, args.output, pairs_path=args.pairs, threshold=args.threshold,
+                    partitions=args.partitions, workers=args.workers, chunksize=args.chunksize,
+                    work_dir=args.work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""SymSpell-style deletion dictionary over the distinct tokens of the stored names.
+
+Every token is stored under each string left after deleting up to
+``max_distance`` characters from its first ``prefix_length`` characters. Two
+tokens within ``max_distance`` edits always share such a string, so a lookup
+only has to generate the query's own deletes and verify the tokens stored under
+them, whatever the size of the table. Cutting tokens to a prefix bounds the
+deletes per token, and with them the memory, at the price of a few more tokens
+to verify.
+"""
+from collections import defaultdict
+from itertools import combinations
+from rapidfuzz.distance import OSA
+
+# Edits a lookup may span; deletes are generated up to this many
+MAX_DISTANCE = 2
+# Characters of each token whose deletes are stored
+PREFIX_LENGTH = 7
+
+
+def deletes(word, max_distance):
+    """``word`` and every string left after deleting up to ``max_distance`` of its characters."""
+    variants = {word}
+    for count in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), count):
+            variants.add(''.join(char for position, char in enumerate(word) if position not in positions))
+    return variants
+
+
+class DeletionIndex:
+    """Tokens within a few edits of a word, and the rows whose names hold them.
+
+    Distances are optimal string alignment distances, so swapping two adjacent
+    characters counts as one edit. The tokens and their postings are those of
+    ``token_index``; only the deletes are kept here, and ``update`` indexes the
+    tokens added to it since.
+    """
+
+    def __init__(self, token_index, max_distance=MAX_DISTANCE, prefix_length=PREFIX_LENGTH):
+        self.token_index = token_index
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.variants = defaultdict(list)
+        self.indexed = 0
+        self.update()
+
+    def update(self):
+        """Store the deletes of the tokens ``token_index`` gained since the last update."""
+        tokens = self.token_index.tokens
+        for token_id in range(self.indexed, len(tokens)):
+            for variant in deletes(tokens[token_id][:self.prefix_length], self.max_distance):
+                self.variants[variant].append(token_id)
+            self.indexed = token_id + 1
+
+    def lookup(self, word, max_distance=MAX_DISTANCE):
+        """``(token, distance)`` for every stored token within ``max_distance`` edits of ``word``,
+        nearest first and alphabetically within a distance."""
+        if max_distance > self.max_distance:
+            raise ValueError(f"max_distance {max_distance} exceeds the {self.max_distance} the index was built for")
+        candidates = set()
+        for variant in deletes(word[:self.prefix_length], max_distance):
+            candidates.update(self.variants.get(variant, ()))
+        tokens = self.token_index.tokens
+        found = []
+        for token_id in candidates:
+            token = tokens[token_id]
+            if abs(len(token) - len(word)) <= max_distance:
+                distance = OSA.distance(word, token, score_cutoff=max_distance)
+                if distance <= max_distance:
+                    found.append((distance, token))
+        return [(token, distance) for distance, token in sorted(found)]
+
+    def matching_rows(self, words, max_distance=MAX_DISTANCE):
+        """Row ids, ascending, of names holding a token within ``max_distance`` edits of any of ``words``."""
+        token_ids = self.token_index.token_ids
+        return self.token_index.rows_holding({token_ids[token] for word in words
+                                              for token, _ in self.lookup(word, max_distance)})
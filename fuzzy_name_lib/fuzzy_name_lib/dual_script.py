@@ -0,0 +1,84 @@
+"""A names table stored in both Roman and Devanagari script.
+
+Every name is transliterated to both scripts once, when it is loaded or added,
+and each script gets its own ``NameIndex`` view over the same rows. A query is
+then matched against the names in its own script only, so search and
+suggestions need neither a per-request translation nor a second set of fuzzy
+scores for the translated query.
+"""
+from .index import DISPLAY_FIELDS, NameIndex, PinnedIndex
+from .phonetics import ENCODERS
+from .transliteration import has_devanagari, to_devanagari, to_roman
+
+
+def script_forms(names):
+    """Lowercased Roman and Devanagari forms of each name, transliterating each distinct name once."""
+    forms = {}
+    for name in names:
+        lower = name.lower()
+        if lower not in forms:
+            forms[lower] = (to_roman(lower), to_devanagari(lower))
+    pairs = [forms[name.lower()] for name in names]
+    return [roman for roman, _ in pairs], [devanagari for _, devanagari in pairs]
+
+
+class DualScriptIndex:
+    """Roman and Devanagari ``NameIndex`` views over one set of rows.
+
+    ``roman`` owns the display names and fields; ``devanagari`` shares them, so a
+    row id means the same record in both. Rows are added to both at once with
+    ``add``.
+    """
+
+    def __init__(self, names, fields=None, phonetic_encoders=tuple(ENCODERS)):
+        names = [str(name) for name in names]
+        roman, devanagari = script_forms(names)
+        self.roman = NameIndex(names, fields, phonetic_encoders, match_names=roman)
+        self.devanagari = self.roman.view(devanagari)
+
+    @classmethod
+    def from_dataframe(cls, dataframe, phonetic_encoders=tuple(ENCODERS)):
+        fields = {column: dataframe[column] for column in DISPLAY_FIELDS if column in dataframe.columns}
+        return cls(dataframe['names'].tolist(), fields, phonetic_encoders)
+
+    @classmethod
+    def from_parts(cls, roman, devanagari):
+        """Pair two loaded indexes over the same rows, sharing ``roman``'s names, fields and lock."""
+        index = cls.__new__(cls)
+        devanagari._names, devanagari.fields, devanagari.lock = roman._names, roman.fields, roman.lock
+        devanagari.attribute_index = roman.attribute_index
+        index.roman, index.devanagari = roman, devanagari
+        return index
+
+    def __len__(self):
+        return len(self.roman)
+
+    @property
+    def lock(self):
+        return self.roman.lock
+
+    def pinned(self):
+        """Both views pinned (see ``NameIndex.pinned``) at the same row count."""
+        pinned = DualScriptIndex.__new__(DualScriptIndex)
+        rows = len(self)
+        pinned.roman, pinned.devanagari = PinnedIndex(self.roman, rows), PinnedIndex(self.devanagari, rows)
+        return pinned
+
+    def for_query(self, query):
+        """The view a query is matched in: Devanagari if it has any Devanagari characters, else Roman."""
+        return self.devanagari if has_devanagari(query) else self.roman
+
+    def add(self, names, fields=None):
+        """Append rows to both views; returns their row ids."""
+        names = [str(name) for name in names]
+        roman, devanagari = script_forms(names)
+        with self.roman.lock:
+            # The shared display names grow last, with the Roman view
+            self.devanagari._extend_match_names(devanagari)
+            return self.roman._extend(names, roman, fields or {})
+
+    def add_record(self, record):
+        """Append one database row, given as a mapping with a 'names' key."""
+        fields = {column: [record[column]] for column in self.roman.fields if column in record}
+        return self.add([record['names']], fields)[0]
+
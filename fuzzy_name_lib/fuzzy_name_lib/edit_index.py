@@ -0,0 +1,144 @@
+"""Exact edit-distance search over the sorted dictionary of distinct names.
+
+The sorted names are walked as if they were a trie, running a Levenshtein
+automaton over them: each dictionary node (a name prefix) gets one dynamic
+programming row, computed from its parent's, and names sharing a prefix with
+the previous one reuse its rows. Only the cells within ``max_edits`` of the
+diagonal are computed. As soon as every cell of a row exceeds ``max_edits`` no
+name with that prefix can match, so all of them are skipped with one bisection.
+"""
+import bisect
+from collections import defaultdict
+import numpy as np
+from rapidfuzz.distance import Levenshtein
+
+# Added names are folded into the sorted dictionary once they outgrow this (as in PrefixIndex)
+MIN_TAIL_SIZE = 256
+
+
+def _next_row(row, char, query, depth, max_edits):
+    # Distances from ``query`` prefixes to the node one ``char`` below ``row``'s, capped at
+    # max_edits + 1, and the smallest of them
+    cap = max_edits + 1
+    new = [cap] * len(row)
+    new[0] = smallest = min(depth, cap)
+    left = new[0]
+    for column in range(max(1, depth - max_edits), min(len(query), depth + max_edits) + 1):
+        left = min(left + 1, row[column] + 1, row[column - 1] + (query[column - 1] != char), cap)
+        new[column] = left
+        if left < smallest:
+            smallest = left
+    return new, smallest
+
+
+def _sorted_postings(names):
+    # Distinct names in code point order, and the row ids holding each, grouped alike
+    distinct, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    offsets = np.searchsorted(inverse[order], np.arange(len(distinct) + 1)).astype(np.int64)
+    return distinct.tolist(), order.astype(np.int32), offsets
+
+
+def _after_prefix(prefix):
+    # The smallest string greater than every string starting with ``prefix``
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class EditDistanceIndex:
+    """The rows whose name is within a number of Levenshtein edits of a query.
+
+    Distinct names are kept sorted, each with the rows holding it. Rows added
+    later are checked one by one, and folded into the sorted dictionary once they
+    outgrow an eighth of it, as in ``PrefixIndex``.
+
+    ``state`` holds the sorted names, their row ids and offsets, and the added
+    names, and is replaced whole by ``compact``. Readers take no lock, so each
+    search reads one ``state`` throughout.
+    """
+
+    def __init__(self, names=()):
+        self.state = (*_sorted_postings(names), defaultdict(list))
+        self.rows = len(names)
+
+    def __len__(self):
+        return self.rows
+
+    def add(self, names):
+        distinct, _, _, buckets = self.state
+        for row_id, name in enumerate(names, self.rows):
+            buckets[name].append(row_id)
+        self.rows += len(names)
+        if len(buckets) > max(MIN_TAIL_SIZE, len(distinct) // 8):
+            self.compact()
+
+    def compact(self):
+        """Merge rows added since the build into the sorted dictionary."""
+        distinct, row_ids, offsets, buckets = self.state
+        if not buckets:
+            return
+        names = np.repeat(np.array(distinct, dtype=str), np.diff(offsets))[np.argsort(row_ids)]
+        added = sorted((row_id, name) for name, added_ids in buckets.items() for row_id in added_ids)
+        names = np.concatenate([names, np.array([name for _, name in added], dtype=str)])
+        self.state = (*_sorted_postings(names), defaultdict(list))
+
+    def matches(self, query, max_edits, state=None):
+        """``{name: distance}`` for names within ``max_edits`` of ``query``, and the dictionary nodes visited."""
+        names, _, _, buckets = state or self.state
+        found, visited = {}, 0
+        rows = [list(range(len(query) + 1))]
+        previous, position = '', 0
+        while position < len(names):
+            name = names[position]
+            common = 0
+            while common < min(len(name), len(previous), len(rows) - 1) and name[common] == previous[common]:
+                common += 1
+            del rows[common + 1:]
+            pruned = False
+            for depth in range(common + 1, len(name) + 1):
+                row, smallest = _next_row(rows[-1], name[depth - 1], query, depth, max_edits)
+                rows.append(row)
+                visited += 1
+                if smallest > max_edits:
+                    pruned = True
+                    break
+            previous = name
+            if pruned:
+                position = bisect.bisect_left(names, _after_prefix(name[:len(rows) - 1]), position + 1)
+                continue
+            if rows[-1][-1] <= max_edits:
+                found[name] = rows[-1][-1]
+            position += 1
+        # A copy, as add() may insert names meanwhile
+        for name in list(buckets):
+            distance = Levenshtein.distance(query, name, score_cutoff=max_edits)
+            if distance <= max_edits:
+                found[name] = min(found.get(name, distance), distance)
+            visited += 1
+        return found, visited
+
+    def lookup(self, name, state=None):
+        """Row ids, ascending, holding exactly ``name``."""
+        names, row_ids, offsets, buckets = state or self.state
+        position = bisect.bisect_left(names, name)
+        rows = np.zeros(0, dtype=np.int32)
+        if position < len(names) and names[position] == name:
+            rows = row_ids[offsets[position]:offsets[position + 1]]
+        added = buckets.get(name)
+        return np.concatenate([rows, np.array(added, dtype=np.int32)]) if added else rows
+
+    def search(self, queries, max_edits):
+        """Row ids, ascending, within ``max_edits`` of any query, their distances, and the nodes visited."""
+        state = self.state
+        best, visited = {}, 0
+        for query in queries:
+            found, count = self.matches(query, max_edits, state)
+            visited += count
+            for name, distance in found.items():
+                best[name] = min(best.get(name, distance), distance)
+        if not best:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), visited
+        parts = [(self.lookup(name, state), distance) for name, distance in best.items()]
+        row_ids = np.concatenate([rows for rows, _ in parts]).astype(np.int64)
+        distances = np.concatenate([np.full(len(rows), distance) for rows, distance in parts])
+        order = np.argsort(row_ids, kind='stable')
+        return row_ids[order], distances[order], visited
@@ -0,0 +1,254 @@
+import threading
+import numpy as np
+from .attribute_index import AttributeIndex
+from .columns import GrowableArray, as_column
+from .deletion_index import DeletionIndex
+from .edit_index import EditDistanceIndex
+from .minhash_index import MinHashIndex
+from .ngram_index import TrigramIndex
+from .phonetics import ENCODERS, PhoneticIndex
+from .prefix_index import PrefixIndex
+from .token_index import TokenIndex
+
+# Columns carried alongside each name so results can be built without touching the DataFrame
+DISPLAY_FIELDS = ('age', 'casetype', 'casefir', 'location', 'voter_gender')
+
+
+class NameIndex:
+    """Columnar, precomputed view of the names table.
+
+    Every column is a flat NumPy array aligned by row id, so search and
+    suggestions can score the whole table without creating a pandas object per
+    row. Categorical and integer columns stay dictionary-encoded and compact, and
+    phonetic codes and character trigrams live in indexes built once at load time.
+    The token deletion dictionary for typo correction, the sorted name dictionary
+    for edit-distance search and the MinHash LSH tables are built on first use.
+
+    Rows added with ``add`` are appended to every structure in place; the arrays
+    grow by doubling, so inserts are amortized O(1). Because everything is a plain
+    array, an index can also be saved and memory-mapped back (see ``snapshot``).
+    """
+
+    def __init__(self, names, fields=None, phonetic_encoders=tuple(ENCODERS), match_names=None):
+        names = [str(name) for name in names]
+        self._names = GrowableArray(names, dtype=str)
+        self.fields = {column: as_column(values) for column, values in (fields or {}).items()}
+        self.attribute_index = AttributeIndex(self.fields)
+        # What queries are matched against: the lowercased names unless given
+        self._index_match_names([name.lower() for name in names] if match_names is None else list(match_names),
+                                phonetic_encoders)
+        self.lock = threading.Lock()
+
+    def _index_match_names(self, lower_names, phonetic_encoders):
+        self._lower_names = GrowableArray(lower_names, dtype=str)
+        self._lengths = GrowableArray([len(name) for name in lower_names], dtype=np.int64)
+        self.phonetic_index = PhoneticIndex(lower_names, phonetic_encoders)
+        self.prefix_index = PrefixIndex(self._lower_names.array)
+        self.trigram_index = TrigramIndex(self._lower_names.array)
+        self._deletion_index = None
+        self._edit_index = None
+        self._minhash_index = None
+        self._token_index = None
+
+    @classmethod
+    def from_dataframe(cls, dataframe, phonetic_encoders=tuple(ENCODERS)):
+        fields = {column: dataframe[column] for column in DISPLAY_FIELDS if column in dataframe.columns}
+        return cls(dataframe['names'].tolist(), fields, phonetic_encoders)
+
+    @classmethod
+    def from_parts(cls, names, lower_names, lengths, fields, phonetic_index, prefix_index, trigram_index):
+        """Assemble an index from prebuilt arrays and sub-indexes, without recomputing anything."""
+        index = cls.__new__(cls)
+        index._names = GrowableArray(names)
+        index._lower_names = GrowableArray(lower_names)
+        index._lengths = GrowableArray(lengths)
+        index.fields = fields
+        index.attribute_index = AttributeIndex(fields)
+        index.phonetic_index = phonetic_index
+        index.prefix_index = prefix_index
+        index.trigram_index = trigram_index
+        index._deletion_index = None
+        index._edit_index = None
+        index._minhash_index = None
+        index._token_index = None
+        index.lock = threading.Lock()
+        return index
+
+    def view(self, match_names):
+        """A NameIndex over the same rows that matches ``match_names`` instead.
+
+        The view shares this index's display names, fields (with their attribute
+        index) and lock, so its rows
+        must only be added through its owner (see ``DualScriptIndex``).
+        """
+        view = NameIndex.__new__(NameIndex)
+        view._names, view.fields, view.lock = self._names, self.fields, self.lock
+        view.attribute_index = self.attribute_index
+        view._index_match_names(list(match_names), tuple(self.phonetic_index.codes))
+        return view
+
+    def __len__(self):
+        return len(self._names)
+
+    @property
+    def names(self):
+        return self._names.array
+
+    @property
+    def lower_names(self):
+        return self._lower_names.array
+
+    @property
+    def name_array(self):
+        return self._lower_names.array
+
+    @property
+    def name_lengths(self):
+        return self._lengths.array
+
+    @property
+    def deletion_index(self):
+        with self.lock:
+            if self._deletion_index is None:
+                self._deletion_index = DeletionIndex(self._get_token_index())
+            return self._deletion_index
+
+    @property
+    def edit_index(self):
+        with self.lock:
+            if self._edit_index is None:
+                self._edit_index = EditDistanceIndex(self._lower_names.array)
+            return self._edit_index
+
+    @property
+    def minhash_index(self):
+        with self.lock:
+            if self._minhash_index is None:
+                self._minhash_index = MinHashIndex(self._lower_names.array)
+            return self._minhash_index
+
+    @minhash_index.setter
+    def minhash_index(self, minhash_index):
+        # e.g. MinHashIndex(index.lower_names, bands=32, rows=2) to trade latency for recall
+        with self.lock:
+            self._minhash_index = minhash_index
+
+    @property
+    def token_index(self):
+        with self.lock:
+            return self._get_token_index()
+
+    def _get_token_index(self):
+        # Callers hold the lock; the deletion dictionary is built over the same token index
+        if self._token_index is None:
+            self._token_index = TokenIndex(self._lower_names.array)
+        return self._token_index
+
+    @property
+    def phonetic_codes(self):
+        return self.phonetic_index.codes['soundex'].array
+
+    def add(self, names, fields=None):
+        """Append rows to every structure without rebuilding; returns their row ids."""
+        names = [str(name) for name in names]
+        with self.lock:
+            return self._extend(names, [name.lower() for name in names], fields or {})
+
+    def _extend(self, names, lower_names, fields):
+        # Display fields first and names last: ``len`` counts names, so a row only becomes
+        # part of a ``pinned`` index once everything about it is in place
+        start = len(self)
+        for column, values in self.fields.items():
+            values.extend(fields.get(column, ['N/A'] * len(names)))
+        self._extend_match_names(lower_names)
+        self._names.extend(names)
+        return range(start, start + len(names))
+
+    def _extend_match_names(self, lower_names):
+        start = len(self._lower_names)
+        self._lengths.extend([len(name) for name in lower_names])
+        self.trigram_index.add(lower_names)
+        if self._edit_index is not None:
+            self._edit_index.add(lower_names)
+        if self._minhash_index is not None:
+            self._minhash_index.add(lower_names)
+        if self._token_index is not None:
+            self._token_index.add(lower_names)
+        if self._deletion_index is not None:
+            self._deletion_index.update()
+        self._lower_names.extend(lower_names)
+        self.phonetic_index.add(lower_names)
+        for row_id, name in enumerate(lower_names, start):
+            self.prefix_index.add(name, row_id)
+
+    def add_record(self, record):
+        """Append one database row, given as a mapping with a 'names' key."""
+        fields = {column: [record[column]] for column in self.fields if column in record}
+        return self.add([record['names']], fields)[0]
+
+    def field(self, column, row_id):
+        values = self.fields.get(column)
+        return values[row_id] if values is not None else 'N/A'
+
+    def pinned(self):
+        """This index as of now, for one query to read while records are being added."""
+        return PinnedIndex(self, len(self))
+
+
+class PinnedIndex:
+    """A NameIndex cut to the rows it had when pinned.
+
+    ``add`` extends the match arrays and sub-indexes before the names, and readers
+    take no lock, so a query could otherwise see arrays longer than ``len`` and
+    postings of half-added rows. Here ``len`` is fixed, every array is cut to it
+    and row ids read from the sub-indexes go through ``clip_rows``; everything else
+    is the index's own.
+    """
+
+    def __init__(self, index, rows):
+        self.index = index
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def names(self):
+        return self.index.names[:self.rows]
+
+    @property
+    def lower_names(self):
+        return self.index.lower_names[:self.rows]
+
+    @property
+    def name_array(self):
+        return self.index.name_array[:self.rows]
+
+    @property
+    def name_lengths(self):
+        return self.index.name_lengths[:self.rows]
+
+    @property
+    def phonetic_codes(self):
+        return self.index.phonetic_codes[:self.rows]
+
+    def pinned(self):
+        return self
+
+
+def clip_rows(index, row_ids, *aligned):
+    """``row_ids`` (and arrays aligned with them) without rows past ``len(index)``."""
+    keep = np.asarray(row_ids) < len(index)
+    if aligned:
+        return (np.asarray(row_ids)[keep], *(np.asarray(values)[keep] for values in aligned))
+    return np.asarray(row_ids)[keep]
+
+
+def as_name_index(data):
+    """Accept either a prebuilt NameIndex (or DualScriptIndex) or a DataFrame with a 'names' column."""
+    if isinstance(data, (NameIndex, PinnedIndex)) or hasattr(data, 'for_query'):
+        return data
+    return NameIndex.from_dataframe(data)
@@ -0,0 +1,174 @@
+"""Hot-path instrumentation: stage timings, candidate and scoring counts, and a Prometheus exporter.
+
+Nothing is recorded until ``enable()`` is called. While disabled, ``stage()``
+returns a shared no-op context manager and ``observe``/``increment`` return
+straight away, so instrumented code pays only a function call.
+
+Within ``begin_request()``/``end_request()`` the stage timings and observed
+values of the current request (thread or task) are also collected, for
+structured per-request logs.
+"""
+import contextvars
+import threading
+import time
+from contextlib import nullcontext
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+# name: (help, buckets)
+HISTOGRAMS = {
+    'fuzzy_name_stage_seconds': ('Time spent in each stage of a search or suggestion.', LATENCY_BUCKETS),
+    'fuzzy_name_candidates': ('Candidate rows per query, by where they came from.', SIZE_BUCKETS),
+    'fuzzy_name_rows_scored': ('Rows fuzzy-scored per query.', SIZE_BUCKETS),
+    'fuzzy_name_results': ('Results returned per query.', SIZE_BUCKETS),
+    'fuzzy_name_edit_nodes_visited': ('Dictionary nodes the edit-distance search visited per query.', SIZE_BUCKETS),
+    'fuzzy_name_http_request_seconds': ('HTTP request latency by endpoint.', LATENCY_BUCKETS),
+}
+COUNTERS = {
+    'fuzzy_name_http_requests_total': 'HTTP requests by endpoint and status.',
+    'fuzzy_name_suggest_cache_total': 'Suggestion session cache lookups by cache and result.',
+    'fuzzy_name_suggest_cancelled_total': 'Suggestion requests superseded by a newer keystroke.',
+}
+
+enabled = False
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_callbacks = {}
+_request = contextvars.ContextVar('fuzzy_name_request', default=None)
+_NO_OP = nullcontext()
+
+
+def enable(flag=True):
+    global enabled
+    enabled = flag
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        position = 0
+        while position < len(self.buckets) and value > self.buckets[position]:
+            position += 1
+        self.counts[position] += 1
+        self.total += value
+        self.count += 1
+
+
+def observe(name, value, **labels):
+    """Add ``value`` to histogram ``name`` (see ``HISTOGRAMS``)."""
+    if not enabled:
+        return
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        histogram = series.get(_key(labels))
+        if histogram is None:
+            histogram = series[_key(labels)] = _Histogram(HISTOGRAMS[name][1])
+        histogram.observe(value)
+    record = _request.get()
+    if record is not None:
+        if name == 'fuzzy_name_stage_seconds':
+            record['stages'][labels['stage']] = record['stages'].get(labels['stage'], 0) + value
+        else:
+            record.setdefault(name, {})['.'.join(map(str, labels.values())) or 'value'] = value
+
+
+def increment(name, amount=1, **labels):
+    """Add ``amount`` to counter ``name`` (see ``COUNTERS``)."""
+    if not enabled:
+        return
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[_key(labels)] = series.get(_key(labels), 0) + amount
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe('fuzzy_name_stage_seconds', time.perf_counter() - self.start, stage=self.name)
+
+
+def stage(name):
+    """Context manager timing one stage, e.g. ``with metrics.stage('search.translate'):``."""
+    return _Stage(name) if enabled else _NO_OP
+
+
+def register_gauge(name, help_text, callback):
+    """Export ``callback()`` as gauge ``name`` whenever metrics are rendered."""
+    _callbacks[name] = (help_text, callback, 'gauge')
+
+
+def register_counter(name, help_text, callback):
+    """Export ``callback()``, a running total kept elsewhere, as counter ``name`` whenever metrics are rendered."""
+    _callbacks[name] = (help_text, callback, 'counter')
+
+
+def begin_request():
+    if enabled:
+        _request.set({'stages': {}})
+
+
+def end_request():
+    """The current request's stage timings and observed values, or None."""
+    record = _request.get()
+    _request.set(None)
+    return record
+
+
+def _labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for name, series in sorted(_histograms.items()):
+            lines += [f'# HELP {name} {HISTOGRAMS[name][0]}', f'# TYPE {name} histogram']
+            for key, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, '+Inf'), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(key, [("le", bound)])} {cumulative}')
+                lines.append(f'{name}_sum{_labels(key)} {histogram.total}')
+                lines.append(f'{name}_count{_labels(key)} {histogram.count}')
+        for name, series in sorted(_counters.items()):
+            lines += [f'# HELP {name} {COUNTERS[name]}', f'# TYPE {name} counter']
+            for key, value in sorted(series.items()):
+                lines.append(f'{name}{_labels(key)} {value}')
+    for name, (help_text, callback, kind) in sorted(_callbacks.items()):
+        try:
+            value = callback()
+        except Exception as e:
+            print(f"Error reading {kind} {name}: {e}")
+            continue
+        if value is not None:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
@@ -0,0 +1,105 @@
+"""MinHash signatures of name trigrams in banded LSH tables, for approximate candidates.
+
+Each name's set of character trigrams is summarised by ``bands * rows`` MinHash
+values; two names agree on any one of them with probability equal to the
+Jaccard similarity of their trigram sets. The values are cut into ``bands``
+bands of ``rows`` values each, and names whose values agree on a whole band
+land in the same bucket of that band's table. A name with Jaccard similarity
+``s`` to the query therefore becomes a candidate with probability
+``1 - (1 - s ** rows) ** bands``: more bands raise recall, more rows per band
+cut the candidates (and the work) down to closer names.
+"""
+from collections import defaultdict
+import numpy as np
+from .ngram_index import BUILD_CHUNK, _chunk_postings
+
+BANDS = 24
+ROWS = 2
+# Odd 64-bit multiplier mixing the values of a band into one bucket key
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash_parameters(count, seed):
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 2 ** 63, size=count, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    return multipliers, rng.integers(0, 2 ** 63, size=count, dtype=np.uint64)
+
+
+class MinHashIndex:
+    """Banded LSH tables over MinHash signatures of the names' trigram sets.
+
+    Each band's table is a sorted array of bucket keys with the row id of each, so
+    a lookup is one binary search per band. Rows added later go to a dict until
+    the next ``compact``, as in ``TrigramIndex``. Names shorter than three
+    characters have no trigrams and are never candidates.
+    """
+
+    def __init__(self, names=(), bands=BANDS, rows=ROWS, seed=0):
+        self.bands = bands
+        self.band_rows = rows
+        self.multipliers, self.increments = _hash_parameters(bands * rows, seed)
+        names = np.asarray(names, dtype=str)
+        parts = [self._band_keys(names[start:start + BUILD_CHUNK], start)
+                 for start in range(0, len(names), BUILD_CHUNK)]
+        keys = np.concatenate([part[0] for part in parts], axis=1) if parts else np.zeros((bands, 0), np.uint64)
+        row_ids = np.concatenate([part[1] for part in parts]) if parts else np.zeros(0, dtype=np.int32)
+        self._sort(keys, np.broadcast_to(row_ids, keys.shape))
+        self.buckets = defaultdict(list)
+        self.rows = len(names)
+
+    def __len__(self):
+        return self.rows
+
+    def _band_keys(self, names, first_row):
+        # Bucket keys, one row per band, of the names that have trigrams, and their row ids
+        codes, row_ids = _chunk_postings(names, first_row)
+        if not len(codes):
+            return np.zeros((self.bands, 0), dtype=np.uint64), row_ids
+        starts = np.flatnonzero(np.r_[True, row_ids[1:] != row_ids[:-1]])
+        codes = codes.astype(np.uint64)
+        keys = np.zeros((self.bands, len(starts)), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for position, (multiplier, increment) in enumerate(zip(self.multipliers, self.increments)):
+                values = np.minimum.reduceat((codes * multiplier + increment) >> np.uint64(32), starts)
+                band = position // self.band_rows
+                keys[band] = (keys[band] ^ values) * _MIX
+        return keys, row_ids[starts]
+
+    def _sort(self, keys, row_ids):
+        order = np.argsort(keys, axis=1, kind='stable')
+        self.keys = np.take_along_axis(keys, order, axis=1)
+        self.row_ids = np.take_along_axis(row_ids, order, axis=1).astype(np.int32)
+
+    def add(self, names):
+        keys, row_ids = self._band_keys(np.asarray(names, dtype=str), self.rows)
+        for band in range(self.bands):
+            for key, row_id in zip(keys[band].tolist(), row_ids.tolist()):
+                self.buckets[band, key].append(row_id)
+        self.rows += len(names)
+
+    def compact(self):
+        """Fold rows added since the build into the sorted band tables."""
+        if not self.buckets:
+            return
+        added = [[] for _ in range(self.bands)]
+        for (band, key), row_ids in self.buckets.items():
+            added[band] += [(key, row_id) for row_id in row_ids]
+        keys = np.concatenate([self.keys, np.array([[key for key, _ in band] for band in added], np.uint64)], axis=1)
+        row_ids = np.concatenate([self.row_ids, np.array([[row_id for _, row_id in band] for band in added],
+                                                         np.int32)], axis=1)
+        self._sort(keys, row_ids)
+        self.buckets.clear()
+
+    def candidates(self, queries):
+        """Row ids, ascending, sharing a bucket with any of ``queries`` in some band."""
+        parts = []
+        for query in queries:
+            keys, _ = self._band_keys(np.array([query], dtype=str), 0)
+            for band, key in enumerate(keys[:, 0] if keys.shape[1] else ()):
+                start = np.searchsorted(self.keys[band], key, side='left')
+                stop = np.searchsorted(self.keys[band], key, side='right')
+                parts.append(self.row_ids[band, start:stop])
+                parts.append(np.array(self.buckets.get((band, int(key)), ()), dtype=np.int32))
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts)).astype(np.int64)
@@ -0,0 +1,130 @@
+"""Character trigram inverted index over lowercased names, for partial-ratio candidates.
+
+Each trigram is packed into one int64 (three 21-bit code points), so Roman and
+Devanagari names share one index. Posting lists are int32 row ids stored back to
+back in a single array, grouped by trigram and ascending within each group.
+"""
+from collections import defaultdict
+import numpy as np
+
+NGRAM = 3
+# Every Unicode code point fits in 21 bits
+_CODE_BITS = 21
+# Names turned into trigrams per vectorised step while building
+BUILD_CHUNK = 100000
+
+
+def trigram_codes(name):
+    """The distinct trigrams of ``name`` as packed int64 codes."""
+    points = [ord(char) for char in name]
+    return {(points[start] << 2 * _CODE_BITS) | (points[start + 1] << _CODE_BITS) | points[start + 2]
+            for start in range(len(points) - NGRAM + 1)}
+
+
+def _chunk_postings(names, first_row):
+    # (code, row id) pairs of each name's distinct trigrams, in row order
+    names = np.asarray(names, dtype=str)
+    width = names.dtype.itemsize // 4
+    if width < NGRAM or not len(names):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    points = names.view(np.uint32).reshape(len(names), width).astype(np.int64)
+    codes = (points[:, :-2] << 2 * _CODE_BITS) | (points[:, 1:-1] << _CODE_BITS) | points[:, 2:]
+    valid = np.arange(width - NGRAM + 1) < (np.char.str_len(names) - NGRAM + 1)[:, None]
+    rows = np.nonzero(valid)[0]
+    codes = codes[valid]
+    order = np.lexsort((codes, rows))
+    rows, codes = rows[order], codes[order]
+    distinct = np.ones(len(codes), dtype=bool)
+    distinct[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    return codes[distinct], (rows[distinct] + first_row).astype(np.int32)
+
+
+def _group(codes, row_ids):
+    # Sort (code, row id) pairs in row order into posting lists: grams, offsets, row ids
+    order = np.argsort(codes, kind='stable')
+    codes, row_ids = codes[order], row_ids[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.zeros(0, dtype=np.int64)
+    return codes[starts], np.append(starts, len(codes)).astype(np.int64), row_ids
+
+
+class TrigramIndex:
+    """Inverted index from character trigram to the rows whose name contains it.
+
+    Rows present at build time are grouped into sorted arrays (``grams``,
+    ``offsets``, ``row_ids``) that can be memory-mapped; rows added later go to a
+    dict until the next ``compact``, as in ``PhoneticIndex``.
+
+    ``state`` holds the three arrays and the dict of added rows; ``compact``
+    replaces it whole, so a reader that reads ``state`` once never pairs one
+    build's offsets with another's row ids.
+    """
+
+    def __init__(self, names=()):
+        names = np.asarray(names, dtype=str)
+        parts = [_chunk_postings(names[start:start + BUILD_CHUNK], start)
+                 for start in range(0, len(names), BUILD_CHUNK)]
+        codes = np.concatenate([part[0] for part in parts]) if parts else np.zeros(0, dtype=np.int64)
+        row_ids = np.concatenate([part[1] for part in parts]) if parts else np.zeros(0, dtype=np.int32)
+        self.state = (*_group(codes, row_ids), defaultdict(list))
+        self.rows = len(names)
+
+    @classmethod
+    def from_parts(cls, grams, offsets, row_ids, rows):
+        """Assemble an index from its sorted posting arrays."""
+        index = cls()
+        index.state, index.rows = (grams, offsets, row_ids, defaultdict(list)), rows
+        return index
+
+    @property
+    def grams(self):
+        return self.state[0]
+
+    @property
+    def offsets(self):
+        return self.state[1]
+
+    @property
+    def row_ids(self):
+        return self.state[2]
+
+    def __len__(self):
+        return self.rows
+
+    def add(self, names):
+        buckets = self.state[3]
+        for row_id, name in enumerate(names, self.rows):
+            for code in trigram_codes(name):
+                buckets[code].append(row_id)
+        self.rows += len(names)
+
+    def compact(self):
+        """Fold rows added since the build into the sorted posting arrays."""
+        grams, offsets, row_ids, buckets = self.state
+        if not buckets:
+            return
+        added = [(code, row_id) for code, added_ids in buckets.items() for row_id in added_ids]
+        codes = np.concatenate([np.repeat(grams, np.diff(offsets)),
+                                np.array([code for code, _ in added], dtype=np.int64)])
+        row_ids = np.concatenate([row_ids, np.array([row_id for _, row_id in added], dtype=np.int32)])
+        # Added rows come after the built ones, so a stable sort keeps each list ascending
+        order = np.lexsort((row_ids, codes))
+        self.state = (*_group(codes[order], row_ids[order]), defaultdict(list))
+
+    def postings(self, code, state=None):
+        """Row ids, ascending, of names containing the trigram ``code``."""
+        grams, offsets, row_ids, buckets = state or self.state
+        position = np.searchsorted(grams, code)
+        if position < len(grams) and grams[position] == code:
+            rows = row_ids[offsets[position]:offsets[position + 1]]
+        else:
+            rows = np.zeros(0, dtype=np.int32)
+        added = buckets.get(code)
+        return np.concatenate([rows, np.array(added, dtype=np.int32)]) if added else rows
+
+    def shared_counts(self, query):
+        """Row ids, ascending, sharing at least one trigram with ``query``, and how many they share."""
+        state = self.state
+        lists = [self.postings(code, state) for code in trigram_codes(query)]
+        if not lists:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(lists), return_counts=True)
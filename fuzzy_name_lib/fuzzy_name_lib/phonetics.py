@@ -1,10 +1,143 @@
-from pyphonetics import Soundex
+import re
+from collections import defaultdict
+import numpy as np
+from pyphonetics import Soundex, Metaphone
+from unidecode import unidecode
+from .columns import GrowableArray
 
 soundex = Soundex()
+metaphone = Metaphone()
 
-def get_phonetic_code(name):
+# Romanisation variants that sound the same in Indian names, applied in order
+INDIC_FOLDS = [
+    ('w', 'v'),
+    ('sh', 's'),
+    ('aa', 'a'),
+    ('ee', 'i'),
+    ('oo', 'u'),
+    ('ph', 'f'),
+    ('z', 'j'),
+    ('q', 'k'),
+]
+
+
+def indic_key(name):
+    """Sound-alike key that folds common Indic romanisation variants (v/w, sh/s, aa/a, ...)."""
+    key = re.sub(r'[^a-z]', '', unidecode(name).lower())
+    if not key:
+        raise ValueError('No letters to encode.')
+    for variant, canonical in INDIC_FOLDS:
+        key = key.replace(variant, canonical)
+    # Doubled consonants ("Kapoor"/"Kappor") are not distinguished when spoken
+    return re.sub(r'(.)\1+', r'\1', key)
+
+
+ENCODERS = {
+    'soundex': soundex.phonetics,
+    'metaphone': metaphone.phonetics,
+    'indic': indic_key,
+}
+
+
+def get_phonetic_code(name, encoder='soundex'):
     try:
-        return soundex.phonetics(name)
+        return ENCODERS[encoder](name)
     except Exception as e:
         print(f"Error generating phonetic code for {name}: {e}")
         return None
+
+
+def encode_names(names, encoder='soundex'):
+    """Encode a batch of names, each distinct name once; unencodable names get None."""
+    encode = ENCODERS[encoder]
+    cache = {}
+    codes = []
+    for name in names:
+        if name not in cache:
+            try:
+                cache[name] = encode(name)
+            except Exception:
+                cache[name] = None
+        codes.append(cache[name])
+    return codes
+
+
+def group_rows(codes):
+    """Group row ids by code: distinct codes, start offsets, and row ids ordered by code."""
+    order = np.argsort(codes, kind='stable')
+    distinct, starts = np.unique(codes[order], return_index=True)
+    return distinct, np.append(starts, len(codes)).astype(np.int64), order.astype(np.int64)
+
+
+class PhoneticIndex:
+    """Blocking index from phonetic code to row ids, one table per encoder.
+
+    Stored names are encoded once when they are added, so a query's sound-alike
+    candidates are a lookup instead of a scan over the table. Rows present at
+    build time are grouped into sorted arrays (see ``group_rows``) that can be
+    memory-mapped; rows added later go to a dict until the next ``compact``.
+    Unencodable names get the empty code and are never matched.
+
+    ``states`` holds, per encoder, the ``group_rows`` blocks and the dict of added
+    rows as one tuple that ``compact`` replaces whole; each lookup reads it once.
+    """
+
+    def __init__(self, names=(), encoders=tuple(ENCODERS)):
+        names = list(names)
+        self.codes = {}
+        self.states = {}
+        for encoder in encoders:
+            codes = np.array([code or '' for code in encode_names(names, encoder)], dtype=str)
+            self.codes[encoder] = GrowableArray(codes)
+            self.states[encoder] = (*group_rows(codes), defaultdict(list))
+
+    @classmethod
+    def from_parts(cls, codes, blocks):
+        """Assemble an index from per-encoder code arrays and their ``group_rows`` blocks."""
+        index = cls(encoders=())
+        index.codes = {encoder: GrowableArray(array) for encoder, array in codes.items()}
+        index.states = {encoder: (*block, defaultdict(list)) for encoder, block in blocks.items()}
+        return index
+
+    @property
+    def blocks(self):
+        """Per encoder, the ``group_rows`` blocks of the rows folded in by the last ``compact``."""
+        return {encoder: state[:3] for encoder, state in self.states.items()}
+
+    def __len__(self):
+        return len(next(iter(self.codes.values()), ()))
+
+    def add(self, names):
+        names = list(names)
+        start = len(self)
+        for encoder, codes in self.codes.items():
+            new_codes = [code or '' for code in encode_names(names, encoder)]
+            buckets = self.states[encoder][3]
+            for row_id, code in enumerate(new_codes, start):
+                if code:
+                    buckets[code].append(row_id)
+            codes.extend(new_codes)
+
+    def compact(self):
+        """Fold rows added since the build into the sorted blocks."""
+        for encoder, codes in self.codes.items():
+            self.states[encoder] = (*group_rows(codes.array), defaultdict(list))
+
+    def lookup(self, name, encoder='soundex'):
+        """Row ids, ascending, whose code under ``encoder`` equals the query's code."""
+        code = encode_names([name], encoder)[0]
+        if not code:
+            return np.zeros(0, dtype=np.int64)
+        distinct, offsets, row_ids, buckets = self.states[encoder]
+        position = np.searchsorted(distinct, code)
+        if position < len(distinct) and distinct[position] == code:
+            rows = row_ids[offsets[position]:offsets[position + 1]]
+        else:
+            rows = np.zeros(0, dtype=np.int64)
+        added = buckets.get(code)
+        return np.concatenate([rows, np.array(added, dtype=np.int64)]) if added else rows
+
+    def candidates(self, name, encoders=None):
+        """Row ids, ascending, that sound like ``name`` under any of ``encoders``."""
+        rows = [self.lookup(name, encoder) for encoder in (encoders or self.codes)]
+        return np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.int64)
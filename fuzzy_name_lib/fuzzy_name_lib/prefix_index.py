@@ -0,0 +1,80 @@
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+# Sorts after every character a name can contain, closing a prefix range
+_MAX_CHAR = '\U0010ffff'
+# Added names are merged into the main sorted arrays once the tail outgrows this
+MIN_TAIL_SIZE = 256
+
+
+class PrefixIndex:
+    """Lowercased names in sorted order, for prefix lookups by binary-search range.
+
+    The sorted names and their row ids are plain NumPy arrays, so they can be
+    memory-mapped. Names added after the build go to a small sorted tail that is
+    merged into the main arrays once it outgrows an eighth of them, so an insert
+    costs amortized O(1) instead of a full re-sort.
+
+    ``state`` holds the sorted keys and row ids and the tail's, and is never
+    changed in place: ``add`` and ``compact`` build a new one and swap it in with
+    one assignment. Readers take no lock, so each lookup reads one ``state``.
+    """
+
+    def __init__(self, names=()):
+        names = np.asarray(names, dtype=str)
+        order = np.argsort(names, kind='stable')
+        self.state = (names[order], order.astype(np.int64), (), ())
+
+    @classmethod
+    def from_parts(cls, keys, row_ids):
+        """Assemble an index from already sorted keys and their row ids."""
+        index = cls()
+        index.state = (keys, row_ids, (), ())
+        return index
+
+    @property
+    def keys(self):
+        return self.state[0]
+
+    @property
+    def row_ids(self):
+        return self.state[1]
+
+    def __len__(self):
+        keys, _, tail_keys, _ = self.state
+        return len(keys) + len(tail_keys)
+
+    def add(self, name, row_id):
+        keys, row_ids, tail_keys, tail_row_ids = self.state
+        position = bisect_right(tail_keys, name)
+        tail_keys = (*tail_keys[:position], name, *tail_keys[position:])
+        tail_row_ids = (*tail_row_ids[:position], row_id, *tail_row_ids[position:])
+        self.state = (keys, row_ids, tail_keys, tail_row_ids)
+        if len(tail_keys) > max(MIN_TAIL_SIZE, len(keys) // 8):
+            self.compact()
+
+    def compact(self):
+        """Merge the tail of added names into the main sorted arrays."""
+        keys, row_ids, tail_keys, tail_row_ids = self.state
+        if not tail_keys:
+            return
+        keys = np.concatenate([keys, np.array(tail_keys, dtype=str)])
+        row_ids = np.concatenate([row_ids, np.array(tail_row_ids, dtype=np.int64)])
+        # Two sorted runs; a stable sort keeps equal names in row order
+        order = np.argsort(keys, kind='stable')
+        self.state = (keys[order], row_ids[order], (), ())
+
+    def lookup(self, *prefixes):
+        """Row ids, ascending, of names starting with any of the non-empty ``prefixes``."""
+        keys, row_ids, tail_keys, tail_row_ids = self.state
+        ranges = []
+        for prefix in prefixes:
+            if prefix:
+                start, stop = np.searchsorted(keys, [prefix, prefix + _MAX_CHAR])
+                ranges.append(row_ids[start:stop])
+                start = bisect_left(tail_keys, prefix)
+                stop = bisect_left(tail_keys, prefix + _MAX_CHAR, start)
+                ranges.append(np.array(tail_row_ids[start:stop], dtype=np.int64))
+        if not ranges:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(ranges))
@@ -0,0 +1,175 @@
+import heapq
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Results must score above this to be returned by search_name
+SEARCH_THRESHOLD = 60
+# Upper bound on the cells of one batched score matrix (float64, so 128 MB)
+MAX_MATRIX_CELLS = 2 ** 24
+
+
+def score_name(name, input_text, translated_text):
+    """Score a lowercased stored name against the lowercased query and its translation.
+
+    Returns ``(score, starts_with)`` where ``starts_with`` is True when the name
+    begins with the full query or its translation.
+    """
+    partial_ratio_score = max(
+        fuzz.partial_ratio(input_text, name),
+        fuzz.partial_ratio(translated_text, name) if translated_text else 0
+    )
+
+    prefix_score = 0
+    match_len = 0
+    starts_with = name.startswith(input_text) or bool(translated_text and name.startswith(translated_text))
+    if starts_with:
+        prefix_score = 100
+        match_len = len(input_text) if name.startswith(input_text) else len(translated_text)
+    elif input_text and (name.startswith(input_text[:1]) or (translated_text and name.startswith(translated_text[:1]))):  # same first char
+        match_len = 1
+        if name.startswith(input_text[:2]) or (translated_text and name.startswith(translated_text[:2])):  # same 2 chars
+            match_len = 2
+            if name.startswith(input_text[:3]) or (translated_text and name.startswith(translated_text[:3])):  # same 3 chars
+                match_len = 3
+        prefix_score = 50 + match_len * 10
+
+    # Calculate length penalty: shorter match gets less penalty
+    length_penalty = 0 if match_len == 0 else (1 - (match_len / len(name))) * 25
+
+    return partial_ratio_score + prefix_score - length_penalty, starts_with
+
+
+def _startswith(names, prefix):
+    return np.char.startswith(names, prefix) if prefix else np.zeros(len(names), dtype=bool)
+
+
+def prefix_bonus(names, lengths, input_text, translated_text):
+    """Vectorised prefix score and length penalty of ``score_name``.
+
+    Returns ``(prefix_score, length_penalty, starts_with)`` arrays.
+    """
+    starts_input = np.char.startswith(names, input_text)
+    starts_translated = _startswith(names, translated_text)
+    starts_with = starts_input | starts_translated
+
+    match_len = np.where(starts_input, len(input_text), len(translated_text))
+    prefix_score = np.where(starts_with, 100, 0)
+    if input_text:
+        # Cascade on the first 1, 2 and 3 characters; each level implies the previous one
+        partial_len = np.zeros(len(names), dtype=np.int64)
+        for size in (1, 2, 3):
+            partial_len += _startswith(names, input_text[:size]) | _startswith(names, translated_text[:size])
+        match_len = np.where(starts_with, match_len, partial_len)
+        prefix_score = np.where(starts_with, 100, np.where(partial_len > 0, 50 + partial_len * 10, 0))
+    else:
+        match_len = np.where(starts_with, match_len, 0)
+
+    length_penalty = np.where(match_len > 0, (1 - (match_len / np.maximum(lengths, 1))) * 25, 0.0)
+    return prefix_score, length_penalty, starts_with
+
+
+def partial_ratios(queries, names, score_cutoff=None, workers=-1):
+    """Best ``fuzz.partial_ratio`` of any query against each name, in one batched call."""
+    queries = [query for query in queries if query]
+    if not queries or not len(names):
+        return np.zeros(len(names))
+    matrix = process.cdist(queries, names, scorer=fuzz.partial_ratio, score_cutoff=score_cutoff,
+                           dtype=np.float64, workers=workers)
+    return matrix.max(axis=0)
+
+
+def _partial_ratio_block(pairs, names, score_cutoff, workers):
+    queries = [query for pair in pairs for query in pair if query]
+    matrix = None
+    if queries and len(names):
+        matrix = process.cdist(queries, names, scorer=fuzz.partial_ratio, score_cutoff=score_cutoff,
+                               dtype=np.float64, workers=workers)
+    row = 0
+    for pair in pairs:
+        used = sum(1 for query in pair if query)
+        yield matrix[row:row + used].max(axis=0) if used and matrix is not None else np.zeros(len(names))
+        row += used
+
+
+def partial_ratio_blocks(query_pairs, names, score_cutoff=None, workers=-1, max_cells=MAX_MATRIX_CELLS):
+    """Yield ``partial_ratios`` of each ``(input_text, translated_text)`` pair, in order.
+
+    Pairs are scored in blocks with one ``cdist`` call each, sized so that a
+    block's matrix stays under ``max_cells`` however many names there are.
+    """
+    rows_per_block = max(1, max_cells // max(len(names), 1))
+    block, block_rows = [], 0
+    for pair in query_pairs:
+        used = sum(1 for query in pair if query)
+        if block and block_rows + used > rows_per_block:
+            yield from _partial_ratio_block(block, names, score_cutoff, workers)
+            block, block_rows = [], 0
+        block.append(pair)
+        block_rows += used
+    if block:
+        yield from _partial_ratio_block(block, names, score_cutoff, workers)
+
+
+def score_prefix_matches(index, input_text, translated_text, rows):
+    """Scores for rows known to start with the query or its translation.
+
+    The query is then a substring of the name, so its partial ratio is always 100
+    and only the prefix score and length penalty need computing.
+    """
+    prefix_score, length_penalty, _ = prefix_bonus(index.name_array[rows], index.name_lengths[rows],
+                                                   input_text, translated_text)
+    return 100.0 + prefix_score - length_penalty
+
+
+def score_names(index, input_text, translated_text, rows=None, threshold=None, always_score=None, workers=-1,
+                partial=None):
+    """Score index rows against the query and its translation, matching ``score_name``.
+
+    ``rows`` restricts scoring to the given row ids. With ``threshold`` set, rows that
+    get no prefix bonus and are not flagged in ``always_score`` are scored with
+    rapidfuzz's ``score_cutoff``, so anything below the threshold comes back as 0
+    instead of its exact value. ``partial`` passes in partial ratios already scored
+    with that cutoff (see ``partial_ratio_blocks``). Returns ``(scores, starts_with)``
+    aligned with ``rows``.
+    """
+    if rows is None:
+        names, lengths = index.name_array, index.name_lengths
+    else:
+        names, lengths = index.name_array[rows], index.name_lengths[rows]
+    prefix_score, length_penalty, starts_with = prefix_bonus(names, lengths, input_text, translated_text)
+    queries = (input_text, translated_text)
+
+    if threshold is None:
+        return partial_ratios(queries, names, workers=workers) + prefix_score - length_penalty, starts_with
+
+    exact = prefix_score > 0
+    if always_score is not None:
+        exact |= always_score
+    if partial is None:
+        partial = np.zeros(len(names))
+        partial[exact] = partial_ratios(queries, names[exact], workers=workers)
+        pruned = ~exact
+        partial[pruned] = partial_ratios(queries, names[pruned], score_cutoff=threshold, workers=workers)
+    else:
+        # Cut-off scores are exact at or above the threshold and 0 below it
+        redo = exact & (partial < threshold)
+        partial = partial.copy()
+        partial[redo] = partial_ratios(queries, names[redo], workers=workers)
+    return partial + prefix_score - length_penalty, starts_with
+
+
+def top_k(scores, k):
+    """Positions of the ``k`` highest ``scores``, best first; equal scores keep their order.
+
+    Only scores at least as high as the k-th best go through the bounded heap, so
+    positions that cannot make the top k are never compared or looked up.
+    """
+    scores = np.asarray(scores)
+    if k <= 0 or not len(scores):
+        return []
+    positions = np.arange(len(scores))
+    if len(scores) > k:
+        kth_best = np.partition(scores, len(scores) - k)[len(scores) - k]
+        positions = positions[scores >= kth_best]
+    best = heapq.nsmallest(k, zip((-scores[positions]).tolist(), positions.tolist()))
+    return [position for _, position in best]
@@ -1,24 +1,322 @@
-from rapidfuzz import fuzz
 from .translation import translate_input
-from .phonetics import get_phonetic_code
+import base64
+import json
+import numpy as np
+from . import metrics
+from .token_index import name_tokens
+from .dual_script import DualScriptIndex
+from .index import as_name_index, clip_rows
+from .scoring import SEARCH_THRESHOLD, partial_ratio_blocks, score_names, top_k
 
-def search_name(input_name, dataframe):
+# Candidates taken from each source when only candidates are scored
+MAX_CANDIDATES = 200
+
+
+def _shortest_with_prefix(index, query, max_candidates):
+    # The shortest names starting with the query's first one, two or three characters,
+    # which earn a prefix bonus even without a trigram in common
+    parts = []
+    for length in (1, 2, 3):
+        rows = clip_rows(index, index.prefix_index.lookup(query[:length]))
+        parts.append(rows[np.argsort(index.name_lengths[rows], kind='stable')[:max_candidates]])
+    return parts
+
+
+def candidate_rows(index, input_name, translated_name, max_candidates=MAX_CANDIDATES):
+    """Row ids, ascending, worth scoring when only the best matches are wanted.
+
+    Per query (and translation): the rows sharing the most trigrams with it, overall
+    and among names with the same initial, plus the shortest names starting with
+    its first one, two or three characters, which earn a prefix bonus even without
+    a trigram in common. At most ``max_candidates`` from each.
+    """
+    parts = []
+    for query in (input_name, translated_name):
+        if not query:
+            continue
+        row_ids, counts = clip_rows(index, *index.trigram_index.shared_counts(query))
+        same_initial = np.isin(row_ids, index.prefix_index.lookup(query[:1]))
+        for rows, shared in ((row_ids, counts), (row_ids[same_initial], counts[same_initial])):
+            parts.append(rows[np.lexsort((rows, -shared))[:max_candidates]])
+        parts += _shortest_with_prefix(index, query, max_candidates)
+    return np.unique(np.concatenate(parts)).astype(np.int64) if parts else np.zeros(0, dtype=np.int64)
+
+
+def lsh_candidate_rows(index, input_name, translated_name, max_candidates=MAX_CANDIDATES):
+    """Row ids, ascending, sharing a MinHash LSH bucket with the query or its translation,
+    plus the shortest names starting like them (at most ``max_candidates`` each)."""
+    queries = [query for query in (input_name, translated_name) if query]
+    parts = [clip_rows(index, index.minhash_index.candidates(queries))]
+    for query in queries:
+        parts += _shortest_with_prefix(index, query, max_candidates)
+    return np.unique(np.concatenate(parts)).astype(np.int64)
+
+
+def match_rows(index, input_name, translated_name, phonetic_encoders=('soundex',), limit=None, workers=-1,
+               partial=None, rows=None, typo_distance=None, filtered=None, after=None):
+    """Row ids and confidences of the rows ``search_name`` returns, best first.
+
+    Takes an already normalised query and its translation. Rows scoring above
+    ``SEARCH_THRESHOLD`` are kept, and so are sound-alike rows whatever their score.
+    ``rows`` (ascending) restricts scoring to those rows and the sound-alike ones.
+    With ``typo_distance`` set, rows holding a token within that many edits of a
+    query token are kept like sound-alikes. ``filtered`` (ascending) excludes every
+    other row, sound-alike or not. With ``after``, a ``(confidence, row_id)``, only
+    the rows ranked after it are returned.
+    """
+    with metrics.stage('search.phonetic'):
+        candidates = clip_rows(index, index.phonetic_index.candidates(input_name, phonetic_encoders))
+    metrics.observe('fuzzy_name_candidates', len(candidates), source='phonetic')
+    if typo_distance:
+        with metrics.stage('search.typos'):
+            corrected = clip_rows(index, index.deletion_index.matching_rows(
+                name_tokens(input_name) + name_tokens(translated_name), typo_distance))
+        metrics.observe('fuzzy_name_candidates', len(corrected), source='typo')
+        candidates = np.union1d(candidates, corrected).astype(np.int64)
+    if filtered is not None:
+        candidates = np.intersect1d(candidates, filtered, assume_unique=True)
+        rows = filtered if rows is None else np.intersect1d(rows, filtered, assume_unique=True)
+    if rows is None:
+        kept = np.zeros(len(index), dtype=bool)
+        kept[candidates] = True
+    else:
+        rows = np.union1d(rows, candidates)
+        kept = np.isin(rows, candidates, assume_unique=True)
+    with metrics.stage('search.score'):
+        scores, _ = score_names(index, input_name, translated_name, rows=rows, threshold=SEARCH_THRESHOLD,
+                                always_score=kept, workers=workers, partial=partial)
+
+    with metrics.stage('search.select'):
+        positions = ((scores > SEARCH_THRESHOLD) | kept).nonzero()[0]
+        if after is not None:
+            # Ranked by confidence, then row id: keep what sorts after the cursor
+            score, row_id = after
+            found, ids = scores[positions], (positions if rows is None else rows[positions])
+            positions = positions[(found < score) | ((found == score) & (ids > row_id))]
+        if limit is None:
+            positions = positions[np.argsort(-scores[positions], kind='stable')]
+        else:
+            positions = positions[top_k(scores[positions], limit)]
+    metrics.observe('fuzzy_name_rows_scored', len(scores), operation='search')
+    metrics.observe('fuzzy_name_results', len(positions), operation='search')
+    return (positions if rows is None else rows[positions]), scores[positions]
+
+
+def edit_rows(index, input_name, translated_name, max_edits, limit=None, filtered=None):
+    """Row ids and confidences of the rows whose name is within ``max_edits`` Levenshtein
+    edits of the query or its translation (and among ``filtered`` if given), fewest
+    edits first, then best first."""
+    with metrics.stage('search.edits'):
+        queries = [query for query in dict.fromkeys((input_name, translated_name)) if query]
+        row_ids, distances, visited = index.edit_index.search(queries, max_edits)
+        row_ids, distances = clip_rows(index, row_ids, distances)
+        if filtered is not None:
+            keep = np.isin(row_ids, filtered)
+            row_ids, distances = row_ids[keep], distances[keep]
+    metrics.observe('fuzzy_name_edit_nodes_visited', visited)
+    with metrics.stage('search.score'):
+        scores, _ = score_names(index, input_name, translated_name, rows=row_ids)
+    with metrics.stage('search.select'):
+        positions = np.lexsort((-scores, distances))[:limit]
+    metrics.observe('fuzzy_name_rows_scored', len(row_ids), operation='search')
+    metrics.observe('fuzzy_name_results', len(positions), operation='search')
+    return row_ids[positions], scores[positions]
+
+
+def _result(index, row_id, score):
+    return {
+        'name': index.names[row_id],
+        'age': index.field('age', row_id),
+        'casetype': index.field('casetype', row_id),
+        'casefir': index.field('casefir', row_id),
+        'location': index.field('location', row_id),
+        'confidence': float(score),
+    }
+
+
+def token_rows(index, input_name, translated_name, limit=None, filtered=None, after=None):
+    """Row ids and token-set scores of the rows holding a token close to one of the query's
+    (or its translation's), scoring above ``SEARCH_THRESHOLD``, best first.
+
+    Only the rows sharing such a token are looked up and scored, each by the better
+    of the query and its translation (see ``token_index.align_tokens``). ``filtered``
+    and ``after`` work as in ``match_rows``.
+    """
+    queries = [name_tokens(query) for query in dict.fromkeys((input_name, translated_name)) if query]
+    with metrics.stage('search.tokens'):
+        rows = clip_rows(index, index.token_index.matching_rows([token for tokens in queries for token in tokens]))
+        if filtered is not None:
+            rows = np.intersect1d(rows, filtered, assume_unique=True)
+    metrics.observe('fuzzy_name_candidates', len(rows), source='token')
+    with metrics.stage('search.score'):
+        scores = np.zeros(len(rows), dtype=np.float64)
+        for tokens in queries:
+            scores = np.maximum(scores, index.token_index.scores(tokens, rows))
+    with metrics.stage('search.select'):
+        positions = (scores > SEARCH_THRESHOLD).nonzero()[0]
+        if after is not None:
+            score, row_id = after
+            found = scores[positions]
+            positions = positions[(found < score) | ((found == score) & (rows[positions] > row_id))]
+        if limit is None:
+            positions = positions[np.argsort(-scores[positions], kind='stable')]
+        else:
+            positions = positions[top_k(scores[positions], limit)]
+    metrics.observe('fuzzy_name_rows_scored', len(rows), operation='search')
+    metrics.observe('fuzzy_name_results', len(positions), operation='search')
+    return rows[positions], scores[positions]
+
+
+def search_results(index, row_ids, scores):
+    """Result dicts for matched rows, in the order given."""
+    with metrics.stage('search.results'):
+        results = [_result(index, row_id, score) for row_id, score in zip(row_ids, scores)]
+    return results
+
+
+def encode_cursor(score, row_id):
+    """Opaque cursor for the result after the row ``row_id`` scored ``score``."""
+    return base64.urlsafe_b64encode(json.dumps([float(score), int(row_id)]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """The ``(score, row_id)`` a cursor from ``encode_cursor`` points after; ValueError if malformed."""
+    try:
+        score, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(row_id)
+    except (TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+
+
+def _search_rows(input_name, data, phonetic_encoders, limit, max_candidates, typo_distance, max_edits, lsh,
+                 filters, tokens=False, after=None):
+    # The index results come from (a DualScriptIndex's view) and their row ids and scores, best first.
+    # Pinned, so rows added while the query runs are left out rather than half read
+    index = as_name_index(data).pinned()
     input_name = input_name.strip().lower()
-    translated_name = translate_input(input_name).lower()
-    input_phonetic = get_phonetic_code(input_name)
-    results = []
-
-    for _, row in dataframe.iterrows():
-        name = row['names'].lower()
-        name_phonetic = get_phonetic_code(name)
-        confidence = max(
-            fuzz.partial_ratio(input_name, name),
-            fuzz.partial_ratio(translated_name, name)
-        )
-        if confidence > 60 or (input_phonetic and name_phonetic and input_phonetic == name_phonetic):
-            results.append({
-                'name': row['names'],
-                'location': row.get('location', 'N/A'),
-                'confidence': confidence,
-            })
-    return sorted(results, key=lambda x: x['confidence'], reverse=True)
+    if isinstance(index, DualScriptIndex):
+        # Matched in the query's own script, where every name is already transliterated
+        index, translated_name = index.for_query(input_name), ""
+    else:
+        with metrics.stage('search.translate'):
+            translated_name = translate_input(input_name).lower() if input_name else ""
+    filtered = None
+    if filters:
+        with metrics.stage('search.filter'):
+            filtered = index.attribute_index.matching_rows(filters, len(index))
+        metrics.observe('fuzzy_name_candidates', len(filtered), source='filter')
+    if max_edits is not None:
+        if after is not None:
+            raise ValueError("Cursors only page through results ranked by confidence, not max_edits")
+        return (index, *edit_rows(index, input_name, translated_name, max_edits, limit, filtered))
+    if tokens:
+        return (index, *token_rows(index, input_name, translated_name, limit, filtered, after))
+    rows = None
+    if lsh:
+        with metrics.stage('search.candidates'):
+            rows = lsh_candidate_rows(index, input_name, translated_name, max_candidates or MAX_CANDIDATES)
+        metrics.observe('fuzzy_name_candidates', len(rows), source='lsh')
+    elif max_candidates is not None:
+        with metrics.stage('search.candidates'):
+            rows = candidate_rows(index, input_name, translated_name, max_candidates)
+        metrics.observe('fuzzy_name_candidates', len(rows), source='trigram')
+    return (index, *match_rows(index, input_name, translated_name, phonetic_encoders, limit, rows=rows,
+                               typo_distance=typo_distance, filtered=filtered, after=after))
+
+
+def search_name(input_name, data, phonetic_encoders=('soundex',), limit=None, max_candidates=None,
+                typo_distance=None, max_edits=None, lsh=False, filters=None, tokens=False):
+    """Rows scoring above ``SEARCH_THRESHOLD`` or sounding like the query, best first.
+
+    With ``limit`` set only the ``limit`` best results are built. With
+    ``max_candidates`` set only ``candidate_rows`` are scored instead of the whole
+    table, so results are the best matches among them; pair it with a ``limit``.
+    With ``lsh`` set the candidates come from ``lsh_candidate_rows`` instead, for
+    tables too large to hold trigram postings for.
+    With ``typo_distance`` (1 or 2) set, rows holding a token within that many
+    edits of a query token are returned too, whatever their score.
+
+    With ``max_edits`` set, exactly the rows whose whole name is within that many
+    edits of the query or its translation are returned instead, fewest edits first.
+
+    ``filters`` maps display fields to a value, a list of values or, for integer
+    fields, a ``{'min': ..., 'max': ...}`` range, e.g. ``{'location': 'Dewas',
+    'age': {'min': 20, 'max': 30}}``. The matching rows come from the attribute
+    indexes before anything is scored, and no other row is returned.
+
+    With ``tokens`` set, names are matched token by token instead (see
+    ``token_rows``): word order, initials and punctuation no longer matter, a
+    surname alone finds every name holding it, and only rows sharing a close
+    token are scored. Confidences are then token-set scores out of 100.
+    """
+    return search_results(*_search_rows(input_name, data, phonetic_encoders, limit, max_candidates,
+                                        typo_distance, max_edits, lsh, filters, tokens))
+
+
+def search_page(input_name, data, limit, cursor=None, phonetic_encoders=('soundex',), max_candidates=None,
+                typo_distance=None, lsh=False, filters=None, tokens=False):
+    """One page of ``search_name`` results and the cursor of the next page (None after the last).
+
+    A cursor holds the confidence and row id of the last result returned, so the
+    next page is the ``limit`` best rows ranked after it: only those are selected
+    and built, and rows added in between never make a result repeat or be skipped.
+    Raises ValueError for a ``limit`` below 1 or a cursor it did not hand out.
+    """
+    if limit < 1:
+        raise ValueError(f"Page limit must be at least 1, got {limit}")
+    after = decode_cursor(cursor) if cursor else None
+    index, row_ids, scores = _search_rows(input_name, data, phonetic_encoders, limit, max_candidates,
+                                          typo_distance, None, lsh, filters, tokens, after)
+    next_cursor = encode_cursor(scores[-1], row_ids[-1]) if len(row_ids) == limit else None
+    return search_results(index, row_ids, scores), next_cursor
+
+
+def iter_search_name(input_name, data, phonetic_encoders=('soundex',), max_candidates=None, typo_distance=None,
+                     max_edits=None, lsh=False, filters=None, tokens=False):
+    """Yield ``search_name``'s results one at a time, building each result dict only when it is reached.
+
+    Only the row ids and confidences of the matches are held, so memory stays the
+    same however many results the consumer takes, and stopping early skips the rest.
+    """
+    index, row_ids, scores = _search_rows(input_name, data, phonetic_encoders, None, max_candidates,
+                                          typo_distance, max_edits, lsh, filters, tokens)
+    for row_id, score in zip(row_ids, scores):
+        yield _result(index, row_id, score)
+
+
+def search_names_bulk(input_names, data, phonetic_encoders=('soundex',), limit=None, workers=-1):
+    """Search many names at once, yielding ``(input_name, results)`` in input order.
+
+    Each distinct query is normalised and translated once, then the queries are
+    scored against the index in blocks, each one multithreaded rapidfuzz ``cdist``
+    call over all names. Results are yielded as their block finishes, so they can
+    be streamed. Blank names get no results.
+    """
+    index = as_name_index(data).pinned()
+    input_names = list(input_names)
+    queries = list(dict.fromkeys(name.strip().lower() for name in input_names if name.strip()))
+    if isinstance(index, DualScriptIndex):
+        # Each query is matched in its own script's view, untranslated
+        views = {query: index.for_query(query) for query in queries}
+        query_pairs = [(query, "") for query in queries]
+    else:
+        views = dict.fromkeys(queries, index)
+        query_pairs = [(query, translate_input(query).lower()) for query in queries]
+    # One stream of score blocks per view, each over its own queries in order
+    partials = {}
+    for view in {id(view): view for view in views.values()}.values():
+        pairs = [pair for pair in query_pairs if views[pair[0]] is view]
+        partials[id(view)] = partial_ratio_blocks(pairs, view.name_array, score_cutoff=SEARCH_THRESHOLD,
+                                                  workers=workers)
+
+    done = {}
+    pending = iter(query_pairs)
+    for input_name in input_names:
+        query = input_name.strip().lower()
+        while query and query not in done:
+            query, translated = next(pending)
+            view = views[query]
+            done[query] = search_results(view, *match_rows(view, query, translated, phonetic_encoders, limit,
+                                                           workers=workers, partial=next(partials[id(view)])))
+            query = input_name.strip().lower()
+        yield input_name, done.get(query, [])
@@ -0,0 +1,164 @@
+"""Type-ahead suggestion sessions, so each keystroke builds on the previous one."""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+from . import metrics
+from .dual_script import DualScriptIndex
+from .suggestion import suggestion_dicts, suggestion_page
+from .translation import translate_input
+
+
+class SuggestionCancelled(Exception):
+    """The request was superseded by a newer keystroke from the same client."""
+
+
+class _Session:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.last_used = time.monotonic()
+        # Rows starting with ``query`` and rows sharing ``pool_key``'s first characters,
+        # as of an index ``rows`` long
+        self.query = None
+        self.input_matches = None
+        self.pool_key = None
+        self.pool = None
+        self.rows = 0
+
+
+class _Flight:
+    """One suggestion computation and the (session, generation) tickets waiting on it."""
+
+    def __init__(self):
+        self.future = Future()
+        self.tickets = []
+
+    def cancelled(self):
+        return all(session.generation != generation for session, generation in self.tickets)
+
+
+class SuggestionSessions:
+    """Suggestion state per client, for ``get_suggestions`` on every keystroke.
+
+    A session keeps the rows matching the client's previous query. When the next
+    query extends it, those rows are narrowed instead of looked up again, and the
+    pool of rows sharing the query's first character is reused. Concurrent requests
+    for the same query share one computation, which is cancelled once every client
+    waiting on it has sent a newer keystroke. Results match ``get_suggestions``.
+    """
+
+    def __init__(self, index, limit=10, max_sessions=10000, ttl=600, typo_distance=None):
+        self.index = index
+        self.limit = limit
+        self.typo_distance = typo_distance
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def _session(self, client_id):
+        now = time.monotonic()
+        session = self.sessions.pop(client_id, None)
+        if session is None or now - session.last_used > self.ttl:
+            session = _Session()
+        session.last_used = now
+        self.sessions[client_id] = session
+        # Drop the least recently used sessions once expired or over the limit
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if len(self.sessions) <= self.max_sessions and now - oldest.last_used <= self.ttl:
+                break
+            self.sessions.popitem(last=False)
+        return session
+
+    def suggest(self, client_id, input_text):
+        """Suggestions for ``input_text`` typed by ``client_id``; raises ``SuggestionCancelled`` if superseded."""
+        query = input_text.strip().lower()
+        with self.lock:
+            session = self._session(client_id)
+            session.generation += 1
+            ticket = (session, session.generation)
+            flight = self.in_flight.get(query)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[query] = _Flight()
+            flight.tickets.append(ticket)
+        metrics.increment('fuzzy_name_suggest_cache_total', cache='in_flight', result='miss' if leader else 'hit')
+
+        if leader:
+            try:
+                flight.future.set_result(self._compute(session, query, flight))
+            except Exception as e:
+                flight.future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.in_flight.pop(query, None)
+
+        result = flight.future.result()
+        if session.generation != ticket[1]:
+            metrics.increment('fuzzy_name_suggest_cancelled_total')
+            raise SuggestionCancelled(f"Suggestion for {input_text!r} superseded")
+        return result
+
+    def _input_matches(self, session, index, query, rows):
+        with session.lock:
+            cached_query, cached, cached_rows = session.query, session.input_matches, session.rows
+        if cached_query and cached is not None and query.startswith(cached_query):
+            metrics.increment('fuzzy_name_suggest_cache_total', cache='input_matches', result='hit')
+            # Names starting with the longer query are among those starting with the shorter one
+            if rows > cached_rows:
+                cached = np.concatenate([cached, np.arange(cached_rows, rows)])
+            return cached[np.char.startswith(index.lower_names[cached], query)]
+        metrics.increment('fuzzy_name_suggest_cache_total', cache='input_matches', result='miss')
+        matches = index.prefix_index.lookup(query)
+        # Rows added while this ran are picked up on the next keystroke
+        return matches[matches < rows]
+
+    def _pool(self, session, index, pool_key, rows):
+        with session.lock:
+            cached_key, cached, cached_rows = session.pool_key, session.pool, session.rows
+        hit = cached_key == pool_key and cached is not None
+        metrics.increment('fuzzy_name_suggest_cache_total', cache='pool', result='hit' if hit else 'miss')
+        if not hit:
+            pool = index.prefix_index.lookup(*pool_key)
+            return pool[pool < rows]
+        if rows > cached_rows:
+            added = np.arange(cached_rows, rows)
+            names = index.lower_names[added]
+            starts = np.zeros(len(added), dtype=bool)
+            for prefix in pool_key:
+                if prefix:
+                    starts |= np.char.startswith(names, prefix)
+            cached = np.concatenate([cached, added[starts]])
+        return cached
+
+    def _compute(self, session, query, flight):
+        # A dual-script index answers from the query's own script's view, untranslated; cached
+        # rows of one view never match a query in the other script, so sessions can share them
+        index = self.index.pinned()
+        if isinstance(index, DualScriptIndex):
+            index, translated = index.for_query(query), ""
+        else:
+            with metrics.stage('suggest.translate'):
+                translated = translate_input(query).lower() if query else ""
+        if flight.cancelled():
+            raise SuggestionCancelled(f"Suggestion for {query!r} superseded")
+
+        rows = len(index)
+        input_matches = pool = None
+        if query:
+            pool_key = (query[:1], translated[:1])
+            input_matches = self._input_matches(session, index, query, rows)
+            pool = self._pool(session, index, pool_key, rows)
+            with session.lock:
+                session.query, session.input_matches = query, input_matches
+                session.pool_key, session.pool, session.rows = pool_key, pool, rows
+
+        page = suggestion_page(index, query, translated, self.limit, input_matches, pool, flight.cancelled,
+                               self.typo_distance)
+        if page is None:
+            raise SuggestionCancelled(f"Suggestion for {query!r} superseded")
+        return suggestion_dicts(index, page)
@@ -0,0 +1,183 @@
+"""Search a name index split across worker processes, one shard each.
+
+Every worker holds its shard's names in its own ``NameIndex`` and scores queries
+independently of the others, so a single search uses as many cores as there are
+shards. The parent keeps the full index for building results.
+
+Workers are forked where the platform allows it. With the ``spawn`` start method
+(e.g. on Windows) the main script must guard its start-up code with
+``if __name__ == '__main__':``, since every worker imports it again.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import numpy as np
+from . import metrics
+from .columns import GrowableArray
+from .index import NameIndex
+from .search import match_rows, search_results
+from .translation import translate_input
+
+
+def _serve_shard(connection, names, row_ids):
+    # Runs in the worker: build the shard once, then answer requests until told to stop
+    index = NameIndex(names)
+    row_ids = GrowableArray(row_ids, dtype=np.int64)
+    connection.send(('ready', len(index)))
+    while True:
+        command, *args = connection.recv()
+        try:
+            if command == 'search':
+                *query, typo_distance = args
+                rows, scores = match_rows(index, *query, workers=1, typo_distance=typo_distance)
+                connection.send(('ok', (row_ids.array[rows], scores)))
+            elif command == 'add':
+                names, new_row_ids = args
+                index.add(names)
+                row_ids.extend(new_row_ids)
+                connection.send(('ok', len(index)))
+            elif command == 'stop':
+                connection.send(('ok', None))
+                return
+        except Exception as e:
+            connection.send(('error', f"{type(e).__name__}: {e}"))
+
+
+class _Shard:
+    def __init__(self, context, names, row_ids):
+        self.connection, worker_end = context.Pipe()
+        self.process = context.Process(target=_serve_shard, args=(worker_end, names, row_ids), daemon=True)
+        self.process.start()
+        worker_end.close()
+        self.row_ids = GrowableArray(row_ids, dtype=np.int64)
+
+    def wait_ready(self):
+        self.connection.recv()
+
+    def request(self, *message):
+        self.connection.send(message)
+
+    def reply(self):
+        status, value = self.connection.recv()
+        if status == 'error':
+            raise RuntimeError(f"Shard error: {value}")
+        return value
+
+    def stop(self):
+        try:
+            self.request('stop')
+            self.reply()
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.connection.close()
+
+
+class ShardedIndex:
+    """Fan each search out to ``shards`` worker processes and merge their results.
+
+    Rows added to ``index`` (e.g. with ``NameIndex.add_record``) are sent to the
+    smallest shard before the next search, so shards stay balanced without a
+    re-split. A shard whose worker died is rebuilt from the parent's copy of its
+    rows; ``rebuild`` re-splits everything.
+    """
+
+    def __init__(self, index, shards=None, start_method=None):
+        self.index = index
+        self.shard_count = shards or os.cpu_count() or 1
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.context = multiprocessing.get_context(start_method)
+        self.lock = threading.Lock()
+        self.shards = []
+        self.rows = 0
+        self.rebuild()
+        atexit.register(self.close)
+
+    def __len__(self):
+        return self.rows
+
+    def rebuild(self):
+        """Split the whole index into fresh shards, replacing the running ones."""
+        with self.lock:
+            self._stop_shards()
+            rows = len(self.index)
+            names = self.index.names[:rows]
+            splits = np.array_split(np.arange(rows, dtype=np.int64), self.shard_count)
+            # Start every worker before waiting on any, so they build in parallel
+            self.shards = [_Shard(self.context, names[row_ids], row_ids) for row_ids in splits]
+            for shard in self.shards:
+                shard.wait_ready()
+            self.rows = rows
+
+    def _rebuild_shard(self, position):
+        shard = self.shards[position]
+        row_ids = shard.row_ids.array.copy()
+        shard.stop()
+        print(f"Rebuilding search shard {position} ({len(row_ids)} rows)")
+        self.shards[position] = _Shard(self.context, self.index.names[row_ids], row_ids)
+        self.shards[position].wait_ready()
+
+    def _sync(self):
+        # Hand rows added to the parent index since the last search to the smallest shard
+        rows = len(self.index)
+        if rows == self.rows:
+            return
+        row_ids = np.arange(self.rows, rows, dtype=np.int64)
+        shard = min(self.shards, key=lambda shard: len(shard.row_ids))
+        shard.request('add', self.index.names[row_ids], row_ids)
+        shard.reply()
+        shard.row_ids.extend(row_ids)
+        self.rows = rows
+
+    def match_rows(self, input_name, translated_name, phonetic_encoders=('soundex',), limit=None,
+                   typo_distance=None):
+        """Like ``search.match_rows`` over the whole index, scored by all shards at once.
+
+        Each shard keeps its own deletion dictionary for ``typo_distance``; a row's
+        typo match does not depend on the other rows, so the merge is unchanged.
+        """
+        with self.lock, metrics.stage('search.shards'):
+            self._sync()
+            message = ('search', input_name, translated_name, phonetic_encoders, limit, typo_distance)
+            for position, shard in enumerate(self.shards):
+                if not shard.process.is_alive():
+                    self._rebuild_shard(position)
+                self.shards[position].request(*message)
+            parts = []
+            for position, shard in enumerate(self.shards):
+                try:
+                    parts.append(shard.reply())
+                except (EOFError, OSError):
+                    # The worker died mid-query: rebuild it and ask again
+                    self._rebuild_shard(position)
+                    self.shards[position].request(*message)
+                    parts.append(self.shards[position].reply())
+
+        row_ids = np.concatenate([part[0] for part in parts])
+        scores = np.concatenate([part[1] for part in parts])
+        # Best confidence first; equal ones in table order, as search_name returns them
+        order = np.lexsort((row_ids, -scores))
+        if limit is not None:
+            order = order[:limit]
+        return row_ids[order], scores[order]
+
+    def search(self, input_name, phonetic_encoders=('soundex',), limit=None, typo_distance=None):
+        """Same results as ``search_name(input_name, index, ...)``."""
+        input_name = input_name.strip().lower()
+        with metrics.stage('search.translate'):
+            translated_name = translate_input(input_name).lower() if input_name else ""
+        row_ids, scores = self.match_rows(input_name, translated_name, phonetic_encoders, limit, typo_distance)
+        return search_results(self.index, row_ids, scores)
+
+    def _stop_shards(self):
+        for shard in self.shards:
+            shard.stop()
+        self.shards = []
+
+    def close(self):
+        with self.lock:
+            self._stop_shards()
@@ -0,0 +1,194 @@
+"""Save a NameIndex as a directory of ``.npy`` arrays and open it back memory-mapped.
+
+A DualScriptIndex is saved the same way, its Devanagari view's matching arrays
+under a ``devanagari.`` prefix next to the shared names and fields.
+
+Opening a snapshot maps the arrays read-only instead of reading them, so start-up
+costs next to nothing and processes opening the same snapshot share its pages.
+The first record added to a loaded index copies the arrays it appends to.
+
+The snapshot path is a symlink to a directory written once and never changed.
+Saving writes a new directory next to it and switches the symlink with
+``os.replace``, so a reader opens either the old snapshot or the new one, whole.
+The previous directory is kept for readers still opening it; older ones are
+removed. Saves hold a lock file, so workers starting together save one at a time.
+"""
+import fcntl
+import json
+import os
+import shutil
+import time
+import numpy as np
+from .columns import CategoricalColumn, IntColumn, StringColumn
+from .dual_script import DualScriptIndex
+from .index import NameIndex
+from .ngram_index import TrigramIndex
+from .phonetics import PhoneticIndex
+from .prefix_index import PrefixIndex
+
+SNAPSHOT_FORMAT = 2
+MANIFEST = 'manifest.json'
+
+
+def _field_arrays(column):
+    if isinstance(column, CategoricalColumn):
+        return {'type': 'categorical', 'categories': column.categories}, column.codes.array
+    if isinstance(column, IntColumn):
+        return {'type': 'int'}, column.values.array
+    return {'type': 'str'}, column.values.array
+
+
+def _field_column(spec, array):
+    if spec['type'] == 'categorical':
+        return CategoricalColumn(categories=spec['categories'], codes=array)
+    if spec['type'] == 'int':
+        return IntColumn(array=array)
+    return StringColumn(array=array)
+
+
+def _match_arrays(index, prefix=''):
+    # The arrays a NameIndex matches queries against, named with ``prefix``
+    index.phonetic_index.compact()
+    index.prefix_index.compact()
+    index.trigram_index.compact()
+    arrays = {
+        'lower_names': index.lower_names,
+        'name_lengths': index.name_lengths,
+        'prefix.keys': index.prefix_index.keys,
+        'prefix.row_ids': index.prefix_index.row_ids,
+        'trigram.grams': index.trigram_index.grams,
+        'trigram.offsets': index.trigram_index.offsets,
+        'trigram.row_ids': index.trigram_index.row_ids,
+    }
+    for encoder, codes in index.phonetic_index.codes.items():
+        distinct, offsets, row_ids = index.phonetic_index.blocks[encoder]
+        arrays[f'phonetic.{encoder}.codes'] = codes.array
+        arrays[f'phonetic.{encoder}.distinct'] = distinct
+        arrays[f'phonetic.{encoder}.offsets'] = offsets
+        arrays[f'phonetic.{encoder}.row_ids'] = row_ids
+    return {f'{prefix}{name}': array for name, array in arrays.items()}
+
+
+def save_snapshot(index, path, version=None):
+    """Write ``index`` to the directory ``path``, replacing any snapshot already there."""
+    with index.lock:
+        dual_script = isinstance(index, DualScriptIndex)
+        if dual_script:
+            arrays = _match_arrays(index.devanagari, 'devanagari.')
+            index = index.roman
+        else:
+            arrays = {}
+        arrays['names'] = index.names
+        arrays.update(_match_arrays(index))
+        fields = {}
+        for column, values in index.fields.items():
+            fields[column], arrays[f'field.{column}'] = _field_arrays(values)
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'version': version,
+            'rows': len(index),
+            'encoders': list(index.phonetic_index.codes),
+            'fields': fields,
+            'dual_script': dual_script,
+        }
+
+        with open(f'{path}.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            _write_and_switch(path, arrays, manifest)
+
+
+def _write_and_switch(path, arrays, manifest):
+    # Write a new snapshot directory next to ``path``, then point the ``path`` symlink at it
+    parent, base = os.path.split(os.path.abspath(path))
+    snapshot = f'{base}.{time.time_ns()}-{os.getpid()}'
+    os.makedirs(os.path.join(parent, snapshot))
+    for name, array in arrays.items():
+        np.save(os.path.join(parent, snapshot, f'{name}.npy'), np.asarray(array), allow_pickle=False)
+    with open(os.path.join(parent, snapshot, MANIFEST), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, ensure_ascii=False)
+
+    previous = os.readlink(path) if os.path.islink(path) else None
+    if previous is None and os.path.isdir(path):
+        # A snapshot saved before snapshots were symlinked; replaced in place, once
+        shutil.rmtree(path)
+    link = os.path.join(parent, f'{base}.link-{os.getpid()}')
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(snapshot, link)
+    os.replace(link, path)
+    for name in os.listdir(parent):
+        if name.startswith(f'{base}.') and name[len(base) + 1:][:1].isdigit() and name not in (snapshot, previous):
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_matches(path, version=None, rows=None):
+    """True when ``path`` holds a snapshot in this format with the given version and row count."""
+    manifest = read_manifest(path)
+    if manifest is None or manifest.get('format') != SNAPSHOT_FORMAT:
+        return False
+    if version is not None and manifest.get('version') != version:
+        return False
+    return rows is None or manifest.get('rows') == rows
+
+
+def load_snapshot(path):
+    """Open a snapshot written by ``save_snapshot`` with every array memory-mapped."""
+    # Follow the symlink once, so a save switching it meanwhile cannot mix two snapshots
+    path = os.path.realpath(path)
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"No index snapshot at {path}")
+
+    def load(name):
+        return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+
+    def load_index(prefix=''):
+        encoders = manifest['encoders']
+        phonetic_index = PhoneticIndex.from_parts(
+            {encoder: load(f'{prefix}phonetic.{encoder}.codes') for encoder in encoders},
+            {encoder: (load(f'{prefix}phonetic.{encoder}.distinct'), load(f'{prefix}phonetic.{encoder}.offsets'),
+                       load(f'{prefix}phonetic.{encoder}.row_ids')) for encoder in encoders},
+        )
+        prefix_index = PrefixIndex.from_parts(load(f'{prefix}prefix.keys'), load(f'{prefix}prefix.row_ids'))
+        trigram_index = TrigramIndex.from_parts(load(f'{prefix}trigram.grams'), load(f'{prefix}trigram.offsets'),
+                                                load(f'{prefix}trigram.row_ids'), manifest['rows'])
+        return NameIndex.from_parts(names, load(f'{prefix}lower_names'), load(f'{prefix}name_lengths'),
+                                    fields, phonetic_index, prefix_index, trigram_index)
+
+    names = load('names')
+    fields = {column: _field_column(spec, load(f'field.{column}')) for column, spec in manifest['fields'].items()}
+    index = load_index()
+    if manifest.get('dual_script'):
+        return DualScriptIndex.from_parts(index, load_index('devanagari.'))
+    return index
+
+
+def load_or_build(path, build, version=None, rows=None, load_rows=None):
+    """Open the snapshot at ``path`` if it matches ``version``/``rows``; else ``build()`` and save one.
+
+    With ``load_rows``, a function returning a DataFrame of the table's rows from a
+    given row on, a snapshot of fewer than ``rows`` rows (e.g. saved before records
+    were added) is opened and extended with the missing rows instead of rebuilt.
+    """
+    if snapshot_matches(path, version, rows):
+        return load_snapshot(path)
+    manifest = read_manifest(path)
+    if (load_rows is not None and rows is not None and snapshot_matches(path, version)
+            and manifest['rows'] < rows):
+        index = load_snapshot(path)
+        new_rows = load_rows(len(index))
+        fields = {column: new_rows[column].tolist() for column in new_rows.columns if column != 'names'}
+        index.add(new_rows['names'].tolist(), fields)
+        save_snapshot(index, path, version)
+        return index
+    index = build()
+    save_snapshot(index, path, version)
+    return index
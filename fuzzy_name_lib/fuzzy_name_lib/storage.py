@@ -0,0 +1,236 @@
+"""Storage backends that find candidate rows inside the database.
+
+``search_name`` scores every row of an in-memory ``NameIndex``. A storage backend
+instead asks the database for a bounded set of candidates and only those are
+rescored in Python, so a large table never has to be held in RAM. Candidates are
+the rows with the most trigrams in common with the query or its translation,
+overall and among names with the same first character (which earn a prefix
+bonus), the shortest names starting with the same one or two characters, and
+rows sounding like the query or starting with its first three characters.
+
+Candidates are capped, so results are the best-scoring matches rather than every
+row above ``SEARCH_THRESHOLD``; use a ``limit`` well under ``MAX_CANDIDATES``.
+
+``PostgresBackend`` uses the ``pg_trgm`` and ``fuzzystrmatch`` extensions.
+``SQLiteBackend`` keeps the table in a local file with an FTS5 trigram index, as a
+stand-in for development and tests.
+"""
+import sqlite3
+import threading
+import pandas as pd
+from sqlalchemy import create_engine, text
+from . import metrics
+from .data_loader import LOAD_COLUMNS, _compact_chunk, load_and_preprocess_data, table_columns
+from .index import NameIndex
+from .phonetics import encode_names
+from .search import match_rows, search_results
+from .translation import translate_input
+
+# Candidates fetched per query from each source; rows beyond this are never scored
+MAX_CANDIDATES = 200
+# Characters a candidate must share with the query at the start of its name
+PREFIX_LENGTH = 3
+
+
+class StorageBackend:
+    """Where the names table lives, and how to pull candidate rows for a query out of it.
+
+    Subclasses implement ``candidates``; ``search`` rescores them exactly as
+    ``search_name`` would, so any row among the candidates gets the same
+    confidence and equal confidences keep table order.
+    """
+
+    columns = LOAD_COLUMNS
+
+    def load(self):
+        """The whole table as a DataFrame, e.g. to build a ``NameIndex`` for suggestions."""
+        raise NotImplementedError
+
+    def candidates(self, input_name, translated_name, max_candidates=MAX_CANDIDATES):
+        """A DataFrame of candidate rows for a normalised query, in table order."""
+        raise NotImplementedError
+
+    def search(self, input_name, phonetic_encoders=('soundex',), limit=None, max_candidates=MAX_CANDIDATES):
+        """``search_name`` over the candidate rows only."""
+        input_name = input_name.strip().lower()
+        with metrics.stage('search.translate'):
+            translated_name = translate_input(input_name).lower() if input_name else ""
+        with metrics.stage('search.candidates'):
+            frame = self.candidates(input_name, translated_name, max_candidates)
+        metrics.observe('fuzzy_name_candidates', len(frame), source='database')
+        index = NameIndex.from_dataframe(frame, phonetic_encoders)
+        return search_results(index, *match_rows(index, input_name, translated_name, phonetic_encoders, limit))
+
+
+def _prefixes(input_name, translated_name, length=PREFIX_LENGTH):
+    return sorted({query[:length] for query in (input_name, translated_name) if query})
+
+
+class PostgresBackend(StorageBackend):
+    """Candidates from Postgres: ``pg_trgm`` word similarity, ``fuzzystrmatch`` soundex and name prefixes.
+
+    Word similarity compares the query with the best-matching stretch of each name,
+    which is what ``fuzz.partial_ratio`` scores; the GiST trigram index answers both
+    the ``<%`` filter and nearest-first ordering. ``prepare`` creates the extensions
+    and indexes; rows inserted later are indexed by Postgres itself.
+    """
+
+    def __init__(self, db_url, table_name='Names_individuals', similarity_threshold=0.3):
+        self.engine = create_engine(db_url) if isinstance(db_url, str) else db_url
+        self.table_name = table_name
+        self.similarity_threshold = similarity_threshold
+        self._column_list = None
+
+    def prepare(self):
+        table = self.table_name
+        with self.engine.begin() as connection:
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm;'))
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS fuzzystrmatch;'))
+            connection.execute(text(f'CREATE INDEX IF NOT EXISTS "{table}_names_trgm" '
+                                    f'ON "{table}" USING gist (lower(names) gist_trgm_ops);'))
+            connection.execute(text(f'CREATE INDEX IF NOT EXISTS "{table}_names_soundex" '
+                                    f'ON "{table}" (soundex(names));'))
+            for length in (1, 2, PREFIX_LENGTH):
+                connection.execute(text(f'CREATE INDEX IF NOT EXISTS "{table}_names_prefix{length}" '
+                                        f'ON "{table}" (left(lower(names), {length}));'))
+
+    def load(self):
+        return load_and_preprocess_data(self.engine, self.table_name, self.columns)
+
+    def candidates(self, input_name, translated_name, max_candidates=MAX_CANDIDATES):
+        table = self.table_name
+        if self._column_list is None:
+            self._column_list = ', '.join(f'"{column}"' for column in table_columns(self.engine, table, self.columns))
+        sources = []
+        for name, query in (('input', input_name), ('translated', translated_name)):
+            if not query:
+                continue
+            nearest = f'ORDER BY :{name} <<-> lower(names) LIMIT :limit'
+            sources.append(f'SELECT ctid FROM "{table}" WHERE :{name} <% lower(names) {nearest}')
+            sources.append(f'SELECT ctid FROM "{table}" WHERE left(lower(names), 1) = left(:{name}, 1) {nearest}')
+            # Names starting like the query get a prefix bonus big enough to rank them even
+            # without a trigram in common; shorter ones have less length penalty
+            for length in (1, 2):
+                sources.append(f'SELECT ctid FROM "{table}" WHERE left(lower(names), {length}) = '
+                               f'left(:{name}, {length}) ORDER BY length(names) LIMIT :limit')
+        sources.append(f'SELECT ctid FROM "{table}" WHERE soundex(names) = soundex(:input) LIMIT :limit')
+        sources.append(f'SELECT ctid FROM "{table}" '
+                       f'WHERE left(lower(names), {PREFIX_LENGTH}) = ANY(:prefixes) LIMIT :limit')
+        # Back in physical order, the order a full load returns them in
+        query = text(f'SELECT {self._column_list} FROM "{table}" WHERE ctid IN ('
+                     + ' UNION '.join(f'({source})' for source in sources) + ') ORDER BY ctid;')
+        with self.engine.begin() as connection:
+            connection.execute(text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true);"),
+                               {'threshold': str(self.similarity_threshold)})
+            frame = pd.read_sql(query, connection, params={
+                'input': input_name, 'translated': translated_name,
+                'prefixes': _prefixes(input_name, translated_name), 'limit': max_candidates})
+        return _compact_chunk(frame)
+
+
+# Put in front of every name in the trigram index, so the trigram made of it and a
+# name's first character selects the names starting with that character
+START_MARKER = '\x01\x01'
+
+
+def _fts_term(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _trigram_query(query):
+    # FTS5 trigram terms, each quoted; any shared trigram makes a row match
+    trigrams = {query[start:start + 3] for start in range(len(query) - 2)}
+    return ' OR '.join(_fts_term(trigram) for trigram in sorted(trigrams))
+
+
+class SQLiteBackend(StorageBackend):
+    """The names table in a local SQLite file, with candidates from an FTS5 trigram index.
+
+    Lowercased names and their soundex codes are stored next to each row, and a
+    trigger adds each name (after ``START_MARKER``) to a contentless FTS5 trigram
+    table, so ``insert`` makes rows searchable straight away.
+    """
+
+    def __init__(self, path, table_name='Names_individuals'):
+        self.path = path
+        self.table_name = table_name
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        table = table_name
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+        with self.lock:
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns}, lower_name TEXT, soundex TEXT)')
+            self.db.execute(f'CREATE INDEX IF NOT EXISTS "{table}_lower_name" ON "{table}" (lower_name)')
+            self.db.execute(f'CREATE INDEX IF NOT EXISTS "{table}_soundex" ON "{table}" (soundex)')
+            self.db.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS "{table}_trigrams" USING fts5('
+                            f'name, content="", tokenize="trigram")')
+            self.db.execute(f'CREATE TRIGGER IF NOT EXISTS "{table}_trigrams_insert" AFTER INSERT ON "{table}" '
+                            f'BEGIN INSERT INTO "{table}_trigrams" (rowid, name) '
+                            f"VALUES (new.rowid, '{START_MARKER}' || new.lower_name); END")
+            self.db.commit()
+
+    def insert(self, dataframe):
+        """Append rows (a DataFrame with a 'names' column) and index them."""
+        dataframe = dataframe.rename(columns=lambda column: column.strip().lower())
+        names = dataframe['names'].astype(str).tolist()
+        lower_names = [name.lower() for name in names]
+        values = [dataframe[column].tolist() if column in dataframe.columns else [None] * len(names)
+                  for column in self.columns if column != 'names']
+        codes = [code or '' for code in encode_names(lower_names, 'soundex')]
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+        placeholders = ', '.join('?' * (len(self.columns) + 2))
+        rows = zip(names, *values, lower_names, codes)
+        with self.lock:
+            self.db.executemany(f'INSERT INTO "{self.table_name}" ({columns}, lower_name, soundex) '
+                                f'VALUES ({placeholders})', rows)
+            self.db.commit()
+
+    def add_record(self, record):
+        """Append one row, given as a mapping like ``NameIndex.add_record`` takes."""
+        self.insert(pd.DataFrame([dict(record)]))
+
+    def load(self):
+        return load_and_preprocess_data(create_engine(f'sqlite:///{self.path}'), self.table_name, self.columns)
+
+    def candidates(self, input_name, translated_name, max_candidates=MAX_CANDIDATES):
+        table = self.table_name
+        row_ids = set()
+        with self.lock:
+            for query in (input_name, translated_name):
+                if not query:
+                    continue
+                # The shortest names starting like the query (bm25 ranks shorter rows first)
+                initial = _fts_term(START_MARKER + query[:1])
+                matches = [initial]
+                if len(query) > 1:
+                    matches.append(_fts_term(START_MARKER[1:] + query[:2]))
+                trigrams = _trigram_query(query)
+                if trigrams:
+                    # Most trigrams in common, overall and with the same initial
+                    matches += [trigrams, f'{initial} AND ({trigrams})']
+                for match in matches:
+                    row_ids.update(row_id for row_id, in self.db.execute(
+                        f'SELECT rowid FROM "{table}_trigrams" WHERE "{table}_trigrams" MATCH ? '
+                        f'ORDER BY rank LIMIT ?', (match, max_candidates)))
+            for code in {code for code in encode_names([input_name], 'soundex') if code}:
+                row_ids.update(row_id for row_id, in self.db.execute(
+                    f'SELECT rowid FROM "{table}" WHERE soundex = ? LIMIT ?', (code, max_candidates)))
+            for prefix in _prefixes(input_name, translated_name):
+                # Range over the lower_name index: every string starting with ``prefix``
+                row_ids.update(row_id for row_id, in self.db.execute(
+                    f'SELECT rowid FROM "{table}" WHERE lower_name >= ? AND lower_name < ? LIMIT ?',
+                    (prefix, prefix + '\U0010ffff', max_candidates)))
+
+            column_list = ', '.join(f'"{column}"' for column in self.columns)
+            row_ids = sorted(row_ids)
+            rows = []
+            for start in range(0, len(row_ids), 900):  # under SQLite's bound-parameter limit
+                batch = row_ids[start:start + 900]
+                rows += self.db.execute(f'SELECT {column_list} FROM "{table}" WHERE rowid IN '
+                                        f'({", ".join("?" * len(batch))}) ORDER BY rowid', batch).fetchall()
+        return _compact_chunk(pd.DataFrame(rows, columns=list(self.columns)))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -1,29 +1,179 @@
-from rapidfuzz import fuzz
+import heapq
+import numpy as np
+from . import metrics
+from .token_index import name_tokens
+from .dual_script import DualScriptIndex
 from .translation import translate_input
-from .phonetics import get_phonetic_code
+from .index import as_name_index, clip_rows
+from .scoring import partial_ratios, prefix_bonus, score_names, score_prefix_matches, top_k
 
-def get_suggestions(input_text, dataframe, limit=10):
+# Rows not sharing the query's first character score their partial ratio alone, at most this
+NO_PREFIX_MAX_SCORE = 100
+# Pool rows scored before the k-th best score is used to skip the rest
+FIRST_ROUND_SIZE = 64
+
+
+def _second_char_is(names, char):
+    # Cut names to their first two characters; a match is two long and ends in ``char``
+    pairs = names.astype('<U2')
+    return (np.char.str_len(pairs) == 2) & np.char.endswith(pairs, char)
+
+
+def _rank(index, input_text, matching_ids, matching_scores, other_ids, other_scores, limit, corrected=None):
+    # Each tier keeps only what can still make the page, best first; row ids are
+    # ascending, so equal scores or names stay in table order as a stable sort would
+    page = []
+    if len(matching_ids) > 1 and len(input_text) > 1:
+        # Names sharing the query's second character rank by score, the rest alphabetically
+        with_char = _second_char_is(index.lower_names[matching_ids], input_text[1])
+        if with_char.any():
+            ids, ids_scores = matching_ids[with_char], matching_scores[with_char]
+            page += [(ids[p], ids_scores[p]) for p in top_k(ids_scores, limit)]
+            ids, ids_scores = matching_ids[~with_char], matching_scores[~with_char]
+        else:
+            ids, ids_scores = matching_ids, matching_scores
+        if len(page) < limit and len(ids):
+            by_name = heapq.nsmallest(limit - len(page), zip(index.names[ids].tolist(), range(len(ids))))
+            page += [(ids[p], ids_scores[p]) for _, p in by_name]
+    else:
+        page += [(matching_ids[p], matching_scores[p]) for p in top_k(matching_scores, limit)]
+
+    # Stop once the first tier fills the page
+    if len(page) < limit and corrected is not None:
+        corrected_ids, corrected_scores = corrected
+        page += [(corrected_ids[p], corrected_scores[p]) for p in top_k(corrected_scores, limit - len(page))]
+    if len(page) < limit and other_ids is not None:
+        page += [(other_ids[p], other_scores[p]) for p in top_k(other_scores, limit - len(page))]
+    return page
+
+
+def _best_others(index, input_text, translated_text, matching_ids, pool, need, cancelled):
+    """Row ids and scores holding the ``need`` best rows that do not start with the query.
+
+    Pool rows share the query's first characters, so their prefix bonus bounds their
+    score from above; rows whose bound is below the best scores so far are never
+    fuzzy-scored. Everything else scores at most ``NO_PREFIX_MAX_SCORE`` and is only
+    scanned when the pool cannot fill the page with better scores.
+    """
+    queries = (input_text, translated_text)
+    pool = np.setdiff1d(pool, matching_ids)
+    metrics.observe('fuzzy_name_candidates', len(pool), source='pool')
+    prefix_score, length_penalty, _ = prefix_bonus(index.name_array[pool], index.name_lengths[pool],
+                                                   input_text, translated_text)
+    bound = 100.0 + prefix_score - length_penalty
+
+    scores = np.full(len(pool), -np.inf)
+    first = np.argsort(-bound, kind='stable')[:max(FIRST_ROUND_SIZE, 4 * need)]
+    rounds = [first]
+    while rounds:
+        rows = rounds.pop()
+        scores[rows] = partial_ratios(queries, index.name_array[pool[rows]]) + prefix_score[rows] - length_penalty[rows]
+        scored = np.isfinite(scores)
+        kth_best = np.sort(scores[scored])[-need] if scored.sum() >= need else -np.inf
+        remaining = np.flatnonzero(~scored & (bound >= kth_best))
+        if len(remaining):
+            if cancelled and cancelled():
+                return None
+            rounds.append(remaining)
+
+    scored = np.isfinite(scores)
+    other_ids, other_scores = pool[scored], scores[scored]
+    if scored.sum() >= need and kth_best > NO_PREFIX_MAX_SCORE:
+        metrics.observe('fuzzy_name_rows_scored', int(scored.sum()), operation='suggest')
+        return other_ids, other_scores
+
+    if cancelled and cancelled():
+        return None
+    rest = np.ones(len(index), dtype=bool)
+    rest[matching_ids] = False
+    rest[pool] = False
+    rest = np.flatnonzero(rest)
+    cutoff = kth_best if np.isfinite(kth_best) else None
+    rest_scores = partial_ratios(queries, index.name_array[rest], score_cutoff=cutoff)
+    metrics.observe('fuzzy_name_rows_scored', int(scored.sum()) + len(rest), operation='suggest')
+    if cutoff is not None:
+        # Anything below the cut-off scores 0 and cannot displace the pool's rows
+        keep = rest_scores >= cutoff
+        rest, rest_scores = rest[keep], rest_scores[keep]
+    other_ids = np.concatenate([other_ids, rest])
+    other_scores = np.concatenate([other_scores, rest_scores])
+    order = np.argsort(other_ids, kind='stable')
+    return other_ids[order], other_scores[order]
+
+
+def suggestion_page(index, input_text, translated_text, limit=10, input_matches=None, pool=None, cancelled=None,
+                    typo_distance=None):
+    """Ranked ``(row_id, score)`` pairs for a normalised query and its translation.
+
+    ``input_matches`` (rows starting with ``input_text``) and ``pool`` (rows starting
+    with the first character of the query or its translation) can be passed in when
+    the caller already has them, e.g. narrowed from a previous keystroke. With
+    ``typo_distance`` set, rows holding a token within that many edits of a query
+    token rank right after the names starting with the query. Returns None as soon
+    as ``cancelled()`` is true.
+    """
+    if not input_text:
+        scores, starts_with = score_names(index, input_text, translated_text)
+        matching_ids = starts_with.nonzero()[0]
+        other_ids = (~starts_with).nonzero()[0]
+        return _rank(index, input_text, matching_ids, scores[matching_ids], other_ids, scores[other_ids], limit)
+
+    with metrics.stage('suggest.prefix'):
+        if input_matches is None:
+            input_matches = clip_rows(index, index.prefix_index.lookup(input_text))
+        translated_matches = clip_rows(index, index.prefix_index.lookup(translated_text))
+        matching_ids = np.union1d(input_matches, translated_matches).astype(np.int64)
+        matching_scores = score_prefix_matches(index, input_text, translated_text, matching_ids)
+    metrics.observe('fuzzy_name_candidates', len(matching_ids), source='prefix')
+    if len(matching_ids) >= limit:
+        # Names starting with the query already fill the page, so skip fuzzy scoring
+        metrics.observe('fuzzy_name_rows_scored', 0, operation='suggest')
+        with metrics.stage('suggest.rank'):
+            return _rank(index, input_text, matching_ids, matching_scores, None, None, limit)
+
+    corrected, ranked_ids = None, matching_ids
+    if typo_distance:
+        with metrics.stage('suggest.typos'):
+            corrected_ids = clip_rows(index, index.deletion_index.matching_rows(
+                name_tokens(input_text) + name_tokens(translated_text), typo_distance))
+            corrected_ids = np.setdiff1d(corrected_ids, matching_ids)
+            corrected = corrected_ids, score_names(index, input_text, translated_text, rows=corrected_ids)[0]
+        metrics.observe('fuzzy_name_candidates', len(corrected_ids), source='typo')
+        if len(matching_ids) + len(corrected_ids) >= limit:
+            metrics.observe('fuzzy_name_rows_scored', len(corrected_ids), operation='suggest')
+            with metrics.stage('suggest.rank'):
+                return _rank(index, input_text, matching_ids, matching_scores, None, None, limit, corrected)
+        ranked_ids = np.union1d(matching_ids, corrected_ids)
+
+    with metrics.stage('suggest.score'):
+        if pool is None:
+            pool = clip_rows(index, index.prefix_index.lookup(input_text[:1], translated_text[:1]))
+        others = _best_others(index, input_text, translated_text, ranked_ids, pool, limit - len(ranked_ids),
+                              cancelled)
+    if others is None:
+        return None
+    with metrics.stage('suggest.rank'):
+        return _rank(index, input_text, matching_ids, matching_scores, *others, limit, corrected)
+
+
+def suggestion_dicts(index, page):
+    return [{
+        'name': index.names[row_id],
+        'age': index.field('age', row_id),
+        'location': index.field('location', row_id),
+        'score': float(score),
+    } for row_id, score in page]
+
+
+def get_suggestions(input_text, data, limit=10, typo_distance=None):
+    # Pinned, so rows added while the query runs are left out rather than half read
+    index = as_name_index(data).pinned()
     input_text = input_text.strip().lower()
-    translated_text = translate_input(input_text).lower()
-    input_phonetic = get_phonetic_code(input_text)
-    suggestions = []
-
-    for _, row in dataframe.iterrows():
-        name = row['names'].lower()
-        name_phonetic = get_phonetic_code(name)
-
-        if input_text in name or translated_text in name:
-            suggestions.append({
-                'name': row['names'],
-                'location': row.get('location', 'N/A'),
-            })
-        elif (
-            fuzz.partial_ratio(input_text, name) > 60 or 
-            fuzz.partial_ratio(translated_text, name) > 60 or
-            (input_phonetic and name_phonetic and input_phonetic == name_phonetic)
-        ):
-            suggestions.append({
-                'name': row['names'],
-                'location': row.get('location', 'N/A'),
-            })
-    return sorted(suggestions, key=lambda x: fuzz.partial_ratio(input_text, x['name'].lower()), reverse=True)[:limit]
+    if isinstance(index, DualScriptIndex):
+        # Matched in the query's own script, where every name is already transliterated
+        index, translated_text = index.for_query(input_text), ""
+    else:
+        with metrics.stage('suggest.translate'):
+            translated_text = translate_input(input_text).lower() if input_text else ""
+    return suggestion_dicts(index, suggestion_page(index, input_text, translated_text, limit,
+                                                   typo_distance=typo_distance))
@@ -0,0 +1,199 @@
+"""Synthetic names tables that look like ``backend/data/data.csv``, at any size.
+
+``NameModel`` learns token, field and noise distributions from a sample table
+and draws any number of rows from them reproducibly. ``perturb`` adds the kind
+of spelling and transliteration noise seen in the real data, at the rates
+``NameModel.noise_probabilities`` estimates from it, e.g. to turn sampled names
+into benchmark queries.
+"""
+import re
+import numpy as np
+import pandas as pd
+from .transliteration import transliterate
+
+SCRIPTS = ('roman', 'devanagari')
+FIELD_COLUMNS = ('age', 'location', 'casetype', 'voter_gender')
+NOISE_OPERATIONS = ('drop_last', 'double_vowel', 'swap', 'lowercase', 'stray_dot', 'transliterate')
+_VOWELS = 'aeiou'
+
+
+def _distribution(values):
+    # Values and their probabilities, most frequent first
+    if not isinstance(values, pd.Series):
+        values = pd.Series(list(values), dtype=object)
+    counts = values.value_counts()
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+
+def _script(name):
+    return 'roman' if name.isascii() else 'devanagari'
+
+
+def _misspelling(token, counts, truncated):
+    # The noise operation that turns a more frequent token of the sample into ``token``, if any;
+    # ``truncated`` maps each token less its last letter to the highest count of such tokens
+    count = counts[token]
+    more_frequent = lambda fixed: fixed != token and counts.get(fixed, 0) > count
+    if len(token) >= 3 and truncated.get(token, 0) > count:
+        return 'drop_last'
+    for position in range(len(token) - 1):
+        if token[position] == token[position + 1] and token[position] in _VOWELS:
+            if more_frequent(token[:position] + token[position + 1:]):
+                return 'double_vowel'
+        swapped = token[:position] + token[position + 1] + token[position] + token[position + 2:]
+        if more_frequent(swapped):
+            return 'swap'
+    return None
+
+
+def _noise_rates(names, roman):
+    # Share of names showing each noise operation
+    counts = {}
+    for name in roman:
+        for token in name.lower().split():
+            counts[token] = counts.get(token, 0) + 1
+    truncated = {}
+    for token, count in counts.items():
+        truncated[token[:-1]] = max(truncated.get(token[:-1], 0), count)
+    misspelt = {operation: 0 for operation in ('drop_last', 'double_vowel', 'swap')}
+    for name in roman:
+        found = {_misspelling(token, counts, truncated) for token in name.lower().split()}
+        for operation in found & set(misspelt):
+            misspelt[operation] += 1
+    rates = {operation: found / max(len(roman), 1) for operation, found in misspelt.items()}
+    rates['lowercase'] = float(np.mean([name == name.lower() for name in roman])) if roman else 0.0
+    rates['stray_dot'] = float(np.mean(['.' in name.split() for name in names])) if names else 0.0
+    # A name typed in the other script: how often names are entered in Devanagari
+    rates['transliterate'] = float(np.mean([not name.isascii() for name in names])) if names else 0.0
+    return rates
+
+
+class NameModel:
+    """Distributions of name tokens, fields and noise learned from a names table.
+
+    Names are modelled per script as a first token, optional middle tokens (middle
+    names, initials, stray dots) and a surname, each drawn from the frequencies
+    seen in the sample. Misspelt tokens in the sample are kept as they are, so
+    truncations like "Verm" appear at the rate the real data has them.
+    """
+
+    def __init__(self, scripts, tokens, fields, fir_years, noise):
+        self.scripts = scripts
+        self.tokens = tokens
+        self.fields = fields
+        self.fir_years = fir_years
+        self.noise = noise
+
+    @classmethod
+    def from_dataframe(cls, dataframe):
+        dataframe = dataframe.rename(columns=lambda column: column.strip().lower())
+        names = [name for name in dataframe['names'].astype(str) if name.split()]
+        by_script = {script: [name for name in names if _script(name) == script] for script in SCRIPTS}
+        scripts = _distribution(script for script in map(_script, names))
+
+        tokens = {}
+        for script, script_names in by_script.items():
+            if not script_names:
+                continue
+            split = [name.split() for name in script_names]
+            tokens[script] = {
+                'shape': _distribution(len(parts) for parts in split),
+                'first': _distribution(parts[0] for parts in split),
+                'middle': _distribution(part for parts in split for part in parts[1:-1]) if any(
+                    len(parts) > 2 for parts in split) else _distribution(['.']),
+                'last': _distribution(parts[-1] for parts in split if len(parts) > 1),
+            }
+
+        fields = {column: _distribution(dataframe[column].dropna()) for column in FIELD_COLUMNS
+                  if column in dataframe.columns}
+        years = dataframe['casefir'].astype(str).str.extract(r'(\d{4})')[0].dropna().astype(int) \
+            if 'casefir' in dataframe.columns else pd.Series(dtype=int)
+        fir_years = (int(years.min()), int(years.max())) if len(years) else (2000, 2024)
+
+        noise = _noise_rates(names, by_script['roman'])
+        noise['double_space'] = float(np.mean(['  ' in name for name in names])) if names else 0.0
+        return cls(scripts, tokens, fields, fir_years, noise)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls.from_dataframe(pd.read_csv(path))
+
+    def _names(self, rng, script, count):
+        tokens = self.tokens[script]
+        shapes = rng.choice(tokens['shape'][0], size=count, p=tokens['shape'][1]).astype(int)
+        first = rng.choice(tokens['first'][0], size=count, p=tokens['first'][1])
+        last = rng.choice(tokens['last'][0], size=count, p=tokens['last'][1])
+        middle = iter(rng.choice(tokens['middle'][0], size=int(np.maximum(shapes - 2, 0).sum()),
+                                 p=tokens['middle'][1]))
+        names = []
+        for shape, first_token, last_token in zip(shapes, first, last):
+            if shape == 1:
+                names.append(first_token)
+            else:
+                names.append(' '.join([first_token, *(next(middle) for _ in range(shape - 2)), last_token]))
+        return names
+
+    def sample(self, rows, seed=0):
+        """A DataFrame of ``rows`` synthetic records; the same seed gives the same table."""
+        rng = np.random.default_rng(seed)
+        scripts = rng.choice(self.scripts[0], size=rows, p=self.scripts[1])
+        names = np.empty(rows, dtype=object)
+        for script in self.tokens:
+            rows_in_script = np.flatnonzero(scripts == script)
+            names[rows_in_script] = self._names(rng, script, len(rows_in_script))
+
+        lowercase = (scripts == 'roman') & (rng.random(rows) < self.noise['lowercase'])
+        names[lowercase] = [name.lower() for name in names[lowercase]]
+        double_space = rng.random(rows) < self.noise['double_space']
+        names[double_space] = [name.replace(' ', '  ', 1) for name in names[double_space]]
+
+        data = {'names': names}
+        for column, (values, probabilities) in self.fields.items():
+            data[column] = rng.choice(values, size=rows, p=probabilities)
+        years = rng.integers(self.fir_years[0], self.fir_years[1] + 1, size=rows)
+        numbers = rng.integers(100, 1000, size=rows)
+        data['casefir'] = [f'FIR-{year}-{number}' for year, number in zip(years, numbers)]
+        return pd.DataFrame(data)
+
+    def noise_probabilities(self, operations=NOISE_OPERATIONS):
+        """How often ``perturb`` should pick each of ``operations``, in proportion to the rates
+        seen in the sample; uniform if the sample shows none of them."""
+        rates = np.array([self.noise.get(operation, 0.0) for operation in operations])
+        return rates / rates.sum() if rates.sum() else np.full(len(operations), 1 / len(operations))
+
+    def iter_samples(self, rows, chunksize=1000000, seed=0):
+        """Yield ``sample`` chunks adding up to ``rows``, for tables too big to build at once."""
+        for chunk, start in enumerate(range(0, rows, chunksize)):
+            yield self.sample(min(chunksize, rows - start), seed=[seed, chunk])
+
+
+def perturb(names, seed=0, operations=NOISE_OPERATIONS, probabilities=None):
+    """Apply one random noise operation to each name, as a user typing it might.
+
+    Operations are drawn with ``probabilities`` (e.g. ``NameModel.noise_probabilities()``),
+    uniformly without. Letter-level edits would split Devanagari vowel signs from
+    their consonants, so Devanagari names are transliterated instead.
+    """
+    rng = np.random.default_rng(seed)
+    noisy = []
+    for name, operation in zip(names, rng.choice(operations, size=len(names), p=probabilities)):
+        if not name.isascii() and operation != 'stray_dot':
+            operation = 'transliterate'
+        if operation == 'drop_last' and len(name) > 3:
+            name = name[:-1]
+        elif operation == 'double_vowel':
+            vowels = [match.start() for match in re.finditer(r'[aeiou]', name)]
+            if vowels:
+                position = vowels[rng.integers(len(vowels))]
+                name = name[:position + 1] + name[position:]
+        elif operation == 'swap' and len(name) > 3:
+            position = int(rng.integers(1, len(name) - 2))
+            name = name[:position] + name[position + 1] + name[position] + name[position + 2:]
+        elif operation == 'lowercase':
+            name = name.lower()
+        elif operation == 'stray_dot' and ' ' in name:
+            name = name.replace(' ', ' . ', 1)
+        elif operation == 'transliterate':
+            name = transliterate(name)
+        noisy.append(name)
+    return noisy
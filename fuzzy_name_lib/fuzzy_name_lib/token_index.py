@@ -0,0 +1,169 @@
+"""Token postings over the stored names, and token-set scores for multi-part names.
+
+Names are split into tokens at whitespace and punctuation, so "Karan S. Dhami",
+"karan s dhami" and "K.S. Dhami" all give single-letter initials and whole
+words. A query is scored against a name by aligning their tokens one to one,
+best pairs first, whatever their order: "Dhami Karan" matches "Karan S. Dhami"
+as well as "Karan Dhami" does, less a little for the unmatched initial.
+"""
+import re
+import string
+from collections import defaultdict
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# Per-token ratio at which a query token retrieves a stored token
+TOKEN_THRESHOLD = 80
+# Score of an initial against a token starting with the same letter
+INITIAL_SCORE = 90
+# Taken off a name's score for each of its tokens left unaligned
+UNMATCHED_TOKEN_PENALTY = 2
+
+_SEPARATORS = re.compile(f"[\\s{re.escape(string.punctuation)}]+")
+
+
+def name_tokens(name):
+    """Lowercased tokens of ``name``, split at whitespace and punctuation."""
+    return [token for token in _SEPARATORS.split(name.lower()) if token]
+
+
+def _token_similarity(query_token, token):
+    if query_token == token:
+        return 100.0
+    if len(query_token) == 1 or len(token) == 1:
+        return float(INITIAL_SCORE) if query_token[0] == token[0] else 0.0
+    return fuzz.ratio(query_token, token)
+
+
+def align_tokens(similarity, query_length):
+    """Token-set score of a name from the similarities of its tokens to the query's.
+
+    ``similarity`` holds one list per name token of its similarity to each query
+    token. Pairs are aligned one to one, most similar first; the score is the mean
+    similarity over the query's tokens, less ``UNMATCHED_TOKEN_PENALTY`` for each
+    name token left over. Names are short, so plain lists beat NumPy here.
+    """
+    if len(similarity) == 1 or query_length == 1:
+        # One token on either side: the best pair is the whole alignment
+        best = max(max(scores) for scores in similarity) if similarity else 0.0
+        return best / query_length - UNMATCHED_TOKEN_PENALTY * (len(similarity) - 1 if similarity else 0)
+    pairs = sorted(((score, column, row) for column, scores in enumerate(similarity)
+                    for row, score in enumerate(scores)), key=lambda pair: -pair[0])
+    used_rows, used_columns, total = set(), set(), 0.0
+    for score, column, row in pairs:
+        if row in used_rows or column in used_columns:
+            continue
+        used_rows.add(row)
+        used_columns.add(column)
+        total += score
+        if len(used_rows) == min(query_length, len(similarity)):
+            break
+    return total / query_length - UNMATCHED_TOKEN_PENALTY * (len(similarity) - len(used_columns))
+
+
+class TokenIndex:
+    """The rows holding each distinct token, and the tokens of each row.
+
+    Both directions are kept in sorted arrays for rows present at build time;
+    rows added later go to a dict and a list until the next ``compact``, as in
+    ``TrigramIndex``.
+    """
+
+    def __init__(self, names=()):
+        self.tokens = []
+        self.token_ids = {}
+        token_ids, row_offsets = [], [0]
+        for name in names:
+            token_ids += [self._token_id(token) for token in dict.fromkeys(name_tokens(name))]
+            row_offsets.append(len(token_ids))
+        self._set_rows(np.array(token_ids, dtype=np.int32), np.array(row_offsets, dtype=np.int64))
+        self.buckets = defaultdict(list)
+        self.added_tokens = []
+        self.rows = len(names)
+
+    def __len__(self):
+        return self.rows
+
+    def _set_rows(self, row_tokens, row_offsets):
+        # Token ids of each row, row after row, and the postings of each token built from them
+        self.row_tokens, self.row_offsets = row_tokens, row_offsets
+        row_ids = np.repeat(np.arange(len(row_offsets) - 1, dtype=np.int32), np.diff(row_offsets))
+        order = np.argsort(row_tokens, kind='stable')
+        self.row_ids = row_ids[order]
+        self.offsets = np.searchsorted(row_tokens[order], np.arange(len(self.tokens) + 1)).astype(np.int64)
+
+    def _token_id(self, token):
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = self.token_ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def add(self, names):
+        for row_id, name in enumerate(names, self.rows):
+            token_ids = [self._token_id(token) for token in dict.fromkeys(name_tokens(name))]
+            for token_id in token_ids:
+                self.buckets[token_id].append(row_id)
+            self.added_tokens.append(token_ids)
+        self.rows += len(names)
+
+    def compact(self):
+        """Fold rows added since the build into the sorted arrays."""
+        if not self.added_tokens:
+            return
+        lengths = np.array([len(token_ids) for token_ids in self.added_tokens], dtype=np.int64)
+        added = np.array([token_id for token_ids in self.added_tokens for token_id in token_ids], dtype=np.int32)
+        row_offsets = np.concatenate([self.row_offsets, self.row_offsets[-1] + np.cumsum(lengths)])
+        self._set_rows(np.concatenate([self.row_tokens, added]), row_offsets)
+        self.buckets.clear()
+        self.added_tokens = []
+
+    def postings(self, token_id):
+        """Row ids, ascending, of names holding the token ``token_id``."""
+        if token_id < len(self.offsets) - 1:
+            rows = self.row_ids[self.offsets[token_id]:self.offsets[token_id + 1]]
+        else:
+            rows = np.zeros(0, dtype=np.int32)
+        added = self.buckets.get(token_id)
+        return np.concatenate([rows, np.array(added, dtype=np.int32)]) if added else rows
+
+    def row_token_ids(self, row_id):
+        """Token ids of the name in row ``row_id``, in name order."""
+        built = len(self.row_offsets) - 1
+        if row_id >= built:
+            return self.added_tokens[row_id - built]
+        return self.row_tokens[self.row_offsets[row_id]:self.row_offsets[row_id + 1]].tolist()
+
+    def similar_tokens(self, word, threshold=TOKEN_THRESHOLD):
+        """Ids of the stored tokens whose ratio to ``word`` reaches ``threshold``; the token itself
+        for an initial, which would otherwise retrieve every name with that letter."""
+        if len(word) == 1:
+            token_id = self.token_ids.get(word)
+            return [] if token_id is None else [token_id]
+        matches = process.extract(word, self.tokens, scorer=fuzz.ratio, score_cutoff=threshold, limit=None)
+        return [token_id for _, _, token_id in matches]
+
+    def rows_holding(self, token_ids):
+        """Row ids, ascending, of names holding any of ``token_ids``."""
+        if not token_ids:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate([self.postings(token_id) for token_id in token_ids])).astype(np.int64)
+
+    def matching_rows(self, words, threshold=TOKEN_THRESHOLD):
+        """Row ids, ascending, of names holding a token close to any of ``words``."""
+        return self.rows_holding({token_id for word in words for token_id in self.similar_tokens(word, threshold)})
+
+    def scores(self, words, row_ids):
+        """Token-set scores (see ``align_tokens``) of the names in ``row_ids`` against ``words``."""
+        scores = np.zeros(len(row_ids), dtype=np.float64)
+        if not words:
+            return scores
+        similarity = {}
+        for position, row_id in enumerate(row_ids.tolist()):
+            token_ids = self.row_token_ids(row_id)
+            for token_id in token_ids:
+                if token_id not in similarity:
+                    token = self.tokens[token_id]
+                    similarity[token_id] = [_token_similarity(word, token) for word in words]
+            scores[position] = align_tokens([similarity[token_id] for token_id in token_ids], len(words))
+        return scores
@@ -1,12 +1,63 @@
-from googletrans import Translator
+from . import metrics
+from .transliteration import transliterate
+from .translation_cache import TranslationCache
 
-def translate_input(input_text):
-    translator = Translator()
+_translator = None
+
+def google_translate(input_text):
+    global _translator
+    if _translator is None:
+        from googletrans import Translator
+        _translator = Translator()  # shared; creating one per call is slow
+    if input_text.isascii():  # English to Hindi
+        return _translator.translate(input_text, src='en', dest='hi').text
+    else:  # Hindi to English
+        return _translator.translate(input_text, src='hi', dest='en').text
+
+# Offline rule-based transliteration is the default; Google Translate needs network access
+BACKENDS = {
+    'transliterate': transliterate,
+    'google': google_translate,
+}
+# Only backends that are slower than a cache lookup go through the cache
+CACHED_BACKENDS = {'google'}
+default_backend = 'transliterate'
+
+translation_cache = TranslationCache()
+
+# Read the current cache when rendered, so configure_translation_cache is picked up
+for _stat in ('hits', 'misses'):
+    metrics.register_counter(f'fuzzy_name_translation_cache_{_stat}_total', f'Translation cache {_stat}.',
+                             lambda stat=_stat: translation_cache.stats()[stat])
+for _stat in ('size', 'hit_rate'):
+    metrics.register_gauge(f'fuzzy_name_translation_cache_{_stat}', f'Translation cache {_stat}.',
+                           lambda stat=_stat: translation_cache.stats()[stat])
+
+def configure_translation_cache(path=None, maxsize=50000, ttl=30 * 24 * 3600):
+    """Replace the shared translation cache, e.g. with one persisted to ``path``."""
+    global translation_cache
+    translation_cache.close()
+    translation_cache = TranslationCache(maxsize=maxsize, ttl=ttl, path=path)
+    return translation_cache
+
+def set_translation_backend(backend):
+    global default_backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown translation backend: {backend}")
+    default_backend = backend
+
+def translate_input(input_text, backend=None):
+    backend = backend or default_backend
+    cached = backend in CACHED_BACKENDS
+    if cached:
+        translated = translation_cache.get(backend, input_text)
+        if translated is not None:
+            return translated
     try:
-        if input_text.isascii():  # English to Hindi
-            return translator.translate(input_text, src='en', dest='hi').text
-        else:  # Hindi to English
-            return translator.translate(input_text, src='hi', dest='en').text
+        translated = BACKENDS[backend](input_text)
     except Exception as e:
         print(f"Translation error: {e}")
-        return input_text  # Fallback
+        return input_text  # Fallback, not cached
+    if cached:
+        translation_cache.set(backend, input_text, translated)
+    return translated
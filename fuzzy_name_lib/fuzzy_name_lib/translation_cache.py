@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Hits whose access time is held in memory before being written to the SQLite file
+FLUSH_EVERY = 1000
+
+
+class TranslationCache:
+    """Bounded LRU cache of translations with TTL eviction.
+
+    With ``path`` set, entries are written through to a SQLite file and the most
+    recently used ones are loaded back on start, so a restarted process starts warm.
+    Hits record their access time in memory; those are written with the next
+    ``set``, every ``FLUSH_EVERY`` hits and on ``close``.
+    """
+
+    def __init__(self, maxsize=50000, ttl=30 * 24 * 3600, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()  # (backend, text) -> (translation, expires_at)
+        self.used = {}  # (backend, text) -> last access time not yet written
+        self.lock = threading.Lock()
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('PRAGMA synchronous=NORMAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS translations ('
+                            'backend TEXT, text TEXT, translation TEXT, expires_at REAL, used_at REAL, '
+                            'PRIMARY KEY (backend, text))')
+            columns = [row[1] for row in self.db.execute('PRAGMA table_info(translations)')]
+            if 'used_at' not in columns:
+                # Files written before access times were kept; their entries count as least recent
+                self.db.execute('ALTER TABLE translations ADD COLUMN used_at REAL DEFAULT 0')
+            self._load()
+
+    def _load(self):
+        now = time.time()
+        self.db.execute('DELETE FROM translations WHERE expires_at <= ?', (now,))
+        self.db.commit()
+        rows = self.db.execute('SELECT backend, text, translation, expires_at FROM translations '
+                               'ORDER BY used_at DESC, rowid DESC LIMIT ?', (self.maxsize,)).fetchall()
+        # Least recently used first, so the LRU order carries over
+        for backend, text, translation, expires_at in reversed(rows):
+            self.entries[(backend, text)] = (translation, expires_at)
+
+    def get(self, backend, text):
+        key = (backend, text)
+        with self.lock:
+            entry = self.entries.get(key)
+            now = time.time()
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                if self.db is not None:
+                    self.used[key] = now
+                    if len(self.used) >= FLUSH_EVERY:
+                        self._flush()
+                return entry[0]
+            if entry is not None:
+                self._evict(key)
+            self.misses += 1
+            return None
+
+    def set(self, backend, text, translation):
+        key = (backend, text)
+        now = time.time()
+        expires_at = now + self.ttl
+        with self.lock:
+            self.entries[key] = (translation, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self._evict(next(iter(self.entries)))
+            if self.db is not None:
+                self.used.pop(key, None)
+                self.db.execute('INSERT OR REPLACE INTO translations (backend, text, translation, expires_at, used_at) '
+                                'VALUES (?, ?, ?, ?, ?)', (backend, text, translation, expires_at, now))
+                self._flush()
+
+    def _flush(self):
+        # Write the access times of hits since the last flush, and commit
+        self.db.executemany('UPDATE translations SET used_at = ? WHERE backend = ? AND text = ?',
+                            [(used_at, *key) for key, used_at in self.used.items()])
+        self.used.clear()
+        self.db.commit()
+
+    def _evict(self, key):
+        del self.entries[key]
+        self.used.pop(key, None)
+        if self.db is not None:
+            self.db.execute('DELETE FROM translations WHERE backend = ? AND text = ?', key)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self.db is not None:
+            with self.lock:
+                self._flush()
+            self.db.close()
+            self.db = None
@@ -0,0 +1,212 @@
+"""Table-driven Devanagari <-> Roman transliteration for names.
+
+Follows the character-mapping approach of ``backend/transliteration/string_processing.cpp``:
+each consonant carries an inherent ``a`` that a virama (``्``) removes, and vowel
+signs replace it. Reading Devanagari drops the inherent ``a`` where Hindi speech
+does (word-final, and between two consonants in ``VC_CV`` position), so
+``कमलेश`` reads ``kamlesh`` and ``राम`` reads ``ram``.
+
+An initial (a single letter followed by ``.``) is written as the letter's name,
+as Hindi records spell them: ``K.S. Dhami`` is ``के.एस. धमी``, and reads back as
+``k.s. dhami``.
+"""
+import re
+
+VIRAMA = '्'
+NUKTA = '़'
+ANUSVARA = 'ं'
+CHANDRABINDU = 'ँ'
+VISARGA = 'ः'
+# Zero-width joiners show up inside conjuncts in the stored names
+IGNORED = {'\u200c', '\u200d'}
+
+CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'n',
+    'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh', 'ञ': 'n',
+    'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n',
+    'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm',
+    'य': 'y', 'र': 'r', 'ल': 'l', 'व': 'v', 'श': 'sh',
+    'ष': 'sh', 'स': 's', 'ह': 'h', 'ळ': 'l',
+    # Precomposed nukta letters
+    '\u0958': 'q', '\u0959': 'kh', '\u095a': 'g', '\u095b': 'z', '\u095c': 'r',
+    '\u095d': 'rh', '\u095e': 'f', '\u095f': 'y',
+}
+# Nukta letters decomposed into base consonant + nukta
+NUKTA_CONSONANTS = {base + NUKTA: roman for base, roman in {
+    'क': 'q', 'ख': 'kh', 'ग': 'g', 'ज': 'z', 'ड': 'r', 'ढ': 'rh', 'फ': 'f', 'य': 'y',
+}.items()}
+
+VOWELS = {
+    'अ': 'a', 'आ': 'a', 'इ': 'i', 'ई': 'i', 'उ': 'u', 'ऊ': 'u', 'ऋ': 'ri',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au', 'ऍ': 'e', 'ऑ': 'o',
+}
+VOWEL_SIGNS = {
+    'ा': 'a', 'ि': 'i', 'ी': 'i', 'ु': 'u', 'ू': 'u', 'ृ': 'ri',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au', 'ॅ': 'e', 'ॉ': 'o',
+}
+DIGITS = {chr(0x0966 + d): str(d) for d in range(10)}
+
+# Roman -> Devanagari, matched longest first
+ROMAN_CONSONANTS = {
+    'ksh': 'क्ष', 'chh': 'छ', 'kh': 'ख', 'gh': 'घ', 'ch': 'च', 'jh': 'झ',
+    'th': 'थ', 'dh': 'ध', 'ph': 'फ', 'bh': 'भ', 'sh': 'श', 'gy': 'ज्ञ',
+    'k': 'क', 'g': 'ग', 'c': 'क', 'j': 'ज', 't': 'त', 'd': 'द', 'n': 'न',
+    'p': 'प', 'f': 'फ', 'b': 'ब', 'm': 'म', 'y': 'य', 'r': 'र', 'l': 'ल',
+    'v': 'व', 'w': 'व', 's': 'स', 'h': 'ह', 'z': 'ज़', 'q': 'क', 'x': 'क्स',
+}
+ROMAN_VOWELS = {
+    'aa': ('आ', 'ा'), 'ai': ('ऐ', 'ै'), 'au': ('औ', 'ौ'), 'ee': ('ई', 'ी'),
+    'ii': ('ई', 'ी'), 'oo': ('ऊ', 'ू'), 'uu': ('ऊ', 'ू'), 'ow': ('औ', 'ौ'),
+    'a': ('अ', ''), 'i': ('इ', 'ि'), 'u': ('उ', 'ु'), 'e': ('ए', 'े'), 'o': ('ओ', 'ो'),
+}
+# Word-final short vowels are usually written long in names (Rekha, Laxmi, Raju, Chowdhary)
+ROMAN_FINAL_SIGNS = {'a': 'ा', 'i': 'ी', 'u': 'ू', 'y': 'ी'}
+# n/m before these are written as a full consonant rather than anusvara
+NO_ANUSVARA_BEFORE = {'n', 'm', 'y', 'r', 'h', 'v', 'w'}
+
+# Initials: Roman letters and how their names are written in Devanagari
+LETTER_NAMES = {
+    'a': 'ए', 'b': 'बी', 'c': 'सी', 'd': 'डी', 'e': 'ई', 'f': 'एफ', 'g': 'जी', 'h': 'एच',
+    'i': 'आई', 'j': 'जे', 'k': 'के', 'l': 'एल', 'm': 'एम', 'n': 'एन', 'o': 'ओ', 'p': 'पी',
+    'q': 'क्यू', 'r': 'आर', 's': 'एस', 't': 'टी', 'u': 'यू', 'v': 'वी', 'w': 'डब्ल्यू', 'x': 'एक्स',
+    'y': 'वाई', 'z': 'ज़ेड',
+}
+LETTERS = {name: letter for letter, name in LETTER_NAMES.items()}
+
+_DEVANAGARI_WORD = re.compile('[\u0900-\u097f\u200c\u200d]+')
+_ROMAN_WORD = re.compile('[a-z]+')
+_LABIALS = ('p', 'b', 'm')
+
+
+def _syllables(word):
+    """Split a Devanagari word into ``[consonants, vowel, inherent, coda]`` units."""
+    units = []
+    joining = False  # previous consonant was killed by a virama
+    i = 0
+    while i < len(word):
+        char = word[i]
+        if word[i:i + 2] in NUKTA_CONSONANTS:
+            consonant, i = NUKTA_CONSONANTS[word[i:i + 2]], i + 2
+        else:
+            consonant, i = CONSONANTS.get(char), i + 1
+        if consonant is not None:
+            if joining:
+                units[-1][0].append(consonant)
+                units[-1][1:3] = ['a', True]
+            else:
+                units.append([[consonant], 'a', True, ''])
+            joining = False
+            continue
+        if char in IGNORED:
+            continue
+        joining = False
+        if char == VIRAMA and units and units[-1][2]:
+            units[-1][1:3] = ['', False]
+            joining = True
+        elif char in VOWEL_SIGNS and units and units[-1][2]:
+            units[-1][1:3] = [VOWEL_SIGNS[char], False]
+        elif char in VOWELS:
+            units.append([[], VOWELS[char], False, ''])
+        elif char in (ANUSVARA, CHANDRABINDU) and units:
+            units[-1][3] += 'n'
+        elif char == VISARGA and units:
+            units[-1][3] += 'h'
+        elif char in DIGITS:
+            units.append([[], DIGITS[char], False, ''])
+    return units
+
+
+def _roman_word(word):
+    units = _syllables(word)
+    # Drop the inherent vowel where Hindi speech does, scanning right to left
+    for i in range(len(units) - 1, 0, -1):
+        consonants, _, inherent, coda = units[i]
+        if not inherent or coda or len(consonants) > 1:
+            continue
+        if i == len(units) - 1:
+            # Word-final; kept after a conjunct (Mishra) and in one-letter words
+            units[i][1] = ''
+        elif units[i - 1][1] and units[i + 1][0] and units[i + 1][1]:
+            # Between a vowel-consonant and a consonant-vowel (Kamalesh -> Kamlesh)
+            units[i][1] = ''
+    roman = []
+    for i, (consonants, vowel, _, coda) in enumerate(units):
+        consonants = ''.join(consonants).replace('jn', 'gy')
+        if coda.startswith('n') and i + 1 < len(units) and ''.join(units[i + 1][0]).startswith(_LABIALS):
+            coda = 'm' + coda[1:]
+        roman.append(consonants + vowel + coda)
+    return ''.join(roman)
+
+
+def _is_initial(match):
+    return match.string[match.end():match.end() + 1] == '.'
+
+
+def to_roman(text):
+    """Transliterate the Devanagari words in ``text`` to lowercase Roman script."""
+    def roman(match):
+        word = match.group()
+        return LETTERS[word] if word in LETTERS and _is_initial(match) else _roman_word(word)
+    return _DEVANAGARI_WORD.sub(roman, text)
+
+
+def _roman_tokens(word):
+    tokens = []
+    i = 0
+    while i < len(word):
+        for size in (3, 2, 1):
+            piece = word[i:i + size]
+            if piece in ROMAN_VOWELS:
+                tokens.append(('vowel', piece))
+                break
+            if piece in ROMAN_CONSONANTS:
+                tokens.append(('consonant', piece))
+                break
+        i += len(piece)
+    return tokens
+
+
+def _devanagari_word(word):
+    tokens = _roman_tokens(word)
+    output = []
+    previous = None
+    for i, (kind, token) in enumerate(tokens):
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token == 'y' and following is None and previous == 'consonant':
+            output.append(ROMAN_FINAL_SIGNS[token])
+        elif kind == 'vowel':
+            if previous == 'consonant':
+                final = following is None and token in ROMAN_FINAL_SIGNS and i > 0
+                output.append(ROMAN_FINAL_SIGNS[token] if final else ROMAN_VOWELS[token][1])
+            else:
+                output.append(ROMAN_VOWELS[token][0])
+        elif (token in ('n', 'm') and previous == 'vowel' and following and following[0] == 'consonant'
+              and following[1][0] not in NO_ANUSVARA_BEFORE):
+            # Nasal before another consonant is written as anusvara (Hindu -> हिंदू)
+            output.append(ANUSVARA)
+            kind = 'nasal'
+        else:
+            if previous == 'consonant':
+                output.append(VIRAMA)
+            output.append(ROMAN_CONSONANTS[token])
+        previous = kind
+    return ''.join(output)
+
+
+def to_devanagari(text):
+    """Transliterate the Roman words in ``text`` to Devanagari."""
+    def devanagari(match):
+        word = match.group()
+        return LETTER_NAMES[word] if len(word) == 1 and _is_initial(match) else _devanagari_word(word)
+    return _ROMAN_WORD.sub(devanagari, text.lower())
+
+
+def has_devanagari(text):
+    """True when ``text`` contains any Devanagari character."""
+    return _DEVANAGARI_WORD.search(text) is not None
+
+
+def transliterate(text):
+    """Convert Roman text to Devanagari, and anything else to Roman."""
+    return to_devanagari(text) if text.isascii() else to_roman(text)
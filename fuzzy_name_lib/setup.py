@@ -8,11 +8,16 @@ setup(
     packages=find_packages(),
     install_requires=[
         'pandas',
+        'numpy',
         'googletrans',
         'rapidfuzz',
         'sqlalchemy',
         'pyphonetics',
+        'unidecode',
         'Flask',
         'flask-cors'
     ],
+    entry_points={
+        'console_scripts': ['fuzzy-name-dedupe=fuzzy_name_lib.dedupe:main'],
+    },
 )
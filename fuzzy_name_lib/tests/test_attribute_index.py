@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+import pandas as pd
+from fuzzy_name_lib import attribute_index
+from fuzzy_name_lib.attribute_index import AttributeIndex, CategoryBitmaps
+from fuzzy_name_lib.columns import as_column
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.search import search_name
+
+class TestAttributeIndex(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'names': ['Ramesh Kumar', 'Rajesh Kumar', 'Ramesh Thapa', 'Suresh Rana', 'Ramesh Kumar'],
+            'age': pd.array([25, 31, 22, None, 29], dtype='Int16'),
+            'location': pd.Categorical(['Dewas', 'Dewas', 'Sagar', 'Dewas', 'Dewas']),
+            'voter_gender': pd.Categorical(['1', '0', '1', '1', '0']),
+            'casefir': ['FIR-1', 'FIR-2', 'FIR-3', 'FIR-4', 'FIR-5'],
+        })
+        self.index = NameIndex.from_dataframe(self.data)
+
+    def test_filters_are_intersected(self):
+        rows = self.index.attribute_index.matching_rows
+        self.assertEqual(rows({'location': 'Dewas'}, 5).tolist(), [0, 1, 3, 4])
+        self.assertEqual(rows({'location': 'Dewas', 'age': {'min': 20, 'max': 30}}, 5).tolist(), [0, 4])
+        self.assertEqual(rows({'age': {'max': 24}}, 5).tolist(), [2])  # missing ages never match
+        self.assertEqual(rows({'voter_gender': 1, 'location': ['Sagar', 'Indore']}, 5).tolist(), [2])
+        self.assertEqual(rows({'age': [22, 31]}, 5).tolist(), [1, 2])
+        self.assertEqual(rows({'casefir': 'FIR-4'}, 5).tolist(), [3])
+        self.assertEqual(rows({'location': 'Nowhere'}, 5).tolist(), [])
+        with self.assertRaises(ValueError):
+            rows({'height': 3}, 5)
+        with self.assertRaises(ValueError):
+            rows({'location': {'min': 'A'}}, 5)
+
+    def test_sparse_and_dense_categories(self):
+        column = as_column(pd.Series(pd.Categorical(['a'] * 99 + ['b'])))
+        bitmaps = CategoryBitmaps(column)
+        self.assertEqual(bitmaps.sets[0].dtype, np.uint8)  # packed bits
+        self.assertEqual(bitmaps.sets[1].tolist(), [99])  # sorted row ids
+        self.assertEqual(bitmaps.mask(['a'], 100).sum(), 99)
+        self.assertEqual(bitmaps.mask(['b'], 100).nonzero()[0].tolist(), [99])
+
+    def test_added_rows_before_and_after_rebuild(self):
+        index = AttributeIndex(self.index.fields)
+        self.assertEqual(index.matching_rows({'location': 'Indore'}, 5).tolist(), [])
+        self.index.add_record({'names': 'Mahesh', 'age': 27, 'location': 'Indore', 'voter_gender': '1'})
+        self.assertEqual(index.matching_rows({'location': 'Indore', 'age': {'min': 27}}, 6).tolist(), [5])
+        original = attribute_index.MIN_TAIL_SIZE
+        attribute_index.MIN_TAIL_SIZE = 0
+        try:
+            self.assertEqual(index.matching_rows({'location': 'Indore', 'age': {'min': 27}}, 6).tolist(), [5])
+            self.assertEqual(index.columns['location'].rows, 6)
+        finally:
+            attribute_index.MIN_TAIL_SIZE = original
+
+    def test_search_scores_only_filtered_rows(self):
+        full = search_name('Ramesh Kumar', self.index)
+        filtered = search_name('Ramesh Kumar', self.index, filters={'location': 'Dewas', 'age': {'min': 20, 'max': 30}})
+        self.assertEqual(filtered, [result for result in full if result['location'] == 'Dewas'
+                                    and result['age'] is not None and 20 <= result['age'] <= 30])
+        self.assertEqual(len(filtered), 2)
+        by_edits = search_name('Ramesh Kumar', self.index, max_edits=2, filters={'voter_gender': '0'})
+        self.assertEqual([result['age'] for result in by_edits], [29, 31])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine
+from fuzzy_name_lib.data_loader import load_and_preprocess_data
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.columns import CategoricalColumn, IntColumn
+
+class TestDataLoader(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        pd.DataFrame({
+            'Names': ['Ramesh', 'Suresh', 'Mahesh', 'Sita'],
+            'age': [30, None, 45, 22],
+            'location': ['Dewas', 'Sagar', 'Dewas', 'Indore'],
+            'casetype': ['Victim', 'Witness', 'Victim', 'Victim'],
+            'casefir': ['FIR-1', 'FIR-2', 'FIR-3', 'FIR-4'],
+            'voter_gender': ['1', '0', '1', '0'],
+            'notes': ['unused'] * 4,
+        }).to_sql('Names_individuals', self.engine, index=False)
+
+    def test_chunked_projected_compact_load(self):
+        df = load_and_preprocess_data(self.engine, 'Names_individuals', chunksize=3)
+        self.assertEqual(list(df.columns), ['names', 'age', 'location', 'casetype', 'casefir', 'voter_gender'])
+        self.assertEqual(df['location'].dtype, 'category')
+        self.assertEqual(list(df['location'].cat.categories), ['Dewas', 'Sagar', 'Indore'])
+        self.assertEqual(str(df['age'].dtype), 'Int16')
+        self.assertEqual(df.attrs['memory']['rows'], 4)
+
+    def test_index_keeps_columns_encoded(self):
+        index = NameIndex.from_dataframe(load_and_preprocess_data(self.engine, 'Names_individuals', chunksize=3))
+        self.assertIsInstance(index.fields['location'], CategoricalColumn)
+        self.assertIsInstance(index.fields['age'], IntColumn)
+        self.assertEqual(index.field('location', 3), 'Indore')
+        self.assertIsNone(index.field('age', 1))
+        index.add_record({'names': 'Gita', 'age': 51, 'location': 'Bhopal'})
+        self.assertEqual((index.field('age', 4), index.field('location', 4)), (51, 'Bhopal'))
+
+    def test_offset_skips_loaded_rows(self):
+        df = load_and_preprocess_data(self.engine, 'Names_individuals', chunksize=3, offset=2)
+        self.assertEqual(df['names'].tolist(), ['Mahesh', 'Sita'])
+
+    def test_missing_columns_and_bad_ages(self):
+        pd.DataFrame({
+            'names': ['Ramesh', 'Suresh', 'Mahesh', 'Sita'],
+            'age': [30.5, 40000, 'unknown', 45],
+            'location': ['Dewas', 'Sagar', 'Dewas', 'Indore'],
+        }).to_sql('Names_only', self.engine, index=False)
+        df = load_and_preprocess_data(self.engine, 'Names_only', chunksize=3)
+        self.assertEqual(list(df.columns), ['names', 'age', 'location'])
+        self.assertEqual(df['age'].tolist(), [pd.NA, pd.NA, pd.NA, 45])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine
+from fuzzy_name_lib.dedupe import UnionFind, find_duplicates
+
+class TestDedupe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'names.sqlite3')}")
+        pd.DataFrame({
+            'names': ['Binod Tamang', 'Suresh Kumar', 'Binod . Taman', 'बिनोद तामाङ्ग', 'Sita Rai', 'Suresh Kumaar'],
+            'age': [41, 30, 41, 42, 22, 31],
+            'location': ['Kolkata', 'Dewas', 'Kolkata', 'Kolkata', 'Indore', 'Dewas'],
+            'casetype': ['Witness', 'Victim', 'Witness', 'Witness', 'Victim', 'Victim'],
+            'casefir': ['FIR-1', 'FIR-2', 'FIR-3', 'FIR-4', 'FIR-5', 'FIR-6'],
+            'voter_gender': ['1', '1', '1', '1', '0', '1'],
+        }).to_sql('Names_individuals', self.engine, index=False)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_find_duplicates(self):
+        output = os.path.join(self.tmp.name, 'duplicates.csv')
+        summary = find_duplicates(self.engine, 'Names_individuals', output, partitions=4, workers=1, chunksize=4)
+        report = pd.read_csv(output)
+        clusters = sorted(sorted(group['row_id']) for _, group in report.groupby('cluster_id'))
+        self.assertEqual(clusters, [[0, 2, 3], [1, 5]])
+        self.assertEqual((summary['rows'], summary['clusters'], summary['duplicate_rows']), (6, 2, 5))
+        self.assertEqual(report.loc[report['row_id'] == 3, 'casefir'].item(), 'FIR-4')
+
+    def test_pairs_blocked_by_several_passes_count_once(self):
+        pd.DataFrame({'names': ['Ram Thapa', 'Ram Thapa'], 'age': [30, 30], 'location': ['Dewas', 'Dewas']}).to_sql(
+            'Twins', self.engine, index=False)
+        output, pairs = os.path.join(self.tmp.name, 'twins.csv'), os.path.join(self.tmp.name, 'pairs.csv')
+        summary = find_duplicates(self.engine, 'Twins', output, pairs_path=pairs, partitions=4, workers=1)
+        self.assertEqual((summary['candidate_pairs'], summary['matched_pairs']), (1, 1))
+        self.assertEqual(pd.read_csv(pairs)[['row_id_a', 'row_id_b']].values.tolist(), [[0, 1]])
+
+    def test_union_find(self):
+        union_find = UnionFind()
+        for a, b in [(1, 2), (3, 4), (2, 3), (7, 8)]:
+            union_find.union(a, b)
+        self.assertEqual(sorted(union_find.groups()), [[1, 2, 3, 4], [7, 8]])
+
+if __name__ == '__main__':
+    unittest.main()
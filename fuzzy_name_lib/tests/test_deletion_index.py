@@ -0,0 +1,50 @@
+import unittest
+from rapidfuzz.distance import OSA
+from fuzzy_name_lib.deletion_index import DeletionIndex
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.token_index import TokenIndex, name_tokens
+from fuzzy_name_lib.search import search_name
+from fuzzy_name_lib.suggestion import get_suggestions
+
+NAMES = ['Ramesh Kumar', 'Suresh', 'Diksha . Kadel', 'Karan S. Dhami', 'Rameshwaram', 'रमेश', 'Kumari Devi']
+
+class TestDeletionIndex(unittest.TestCase):
+    def test_name_tokens(self):
+        self.assertEqual(name_tokens('Karan S. Dhami'), ['karan', 's', 'dhami'])
+        self.assertEqual(name_tokens('Diksha . Kadel'), ['diksha', 'kadel'])
+
+    def test_lookup_matches_brute_force(self):
+        index = DeletionIndex(TokenIndex([name.lower() for name in NAMES]), prefix_length=4)
+        tokens = {token for name in NAMES for token in name_tokens(name)}
+        for word in ['kumar', 'kumra', 'rameshwarm', 'sursh', 'रमश', 'dhmi', 'x']:
+            for distance in (1, 2):
+                expected = sorted((OSA.distance(word, token), token) for token in tokens
+                                  if OSA.distance(word, token) <= distance)
+                self.assertEqual(index.lookup(word, distance), [(token, d) for d, token in expected])
+        with self.assertRaises(ValueError):
+            index.lookup('kumar', 3)
+
+    def test_added_rows_before_and_after_compact(self):
+        tokens = TokenIndex(['ramesh kumar', 'suresh'])
+        index = DeletionIndex(tokens)
+        tokens.add(['kumaar das', 'suresh'])
+        index.update()
+        self.assertEqual(index.matching_rows(['kumar'], 1).tolist(), [0, 2])
+        tokens.compact()
+        self.assertEqual(index.matching_rows(['kumar'], 1).tolist(), [0, 2])
+        self.assertEqual(index.matching_rows(['sursh'], 1).tolist(), [1, 3])
+
+    def test_search_and_suggestions_return_corrected_tokens(self):
+        index = NameIndex(['Ramesh Kumar', 'Nanda Avtar Gauchan', 'Navin Regmi', 'Kavita Vilas Chowdhari'])
+        self.assertEqual(search_name('vatra', index), [])
+        self.assertEqual(search_name('vatra', index, typo_distance=1), [])
+        self.assertEqual([result['name'] for result in search_name('vatra', index, typo_distance=2)],
+                         ['Nanda Avtar Gauchan'])
+        self.assertNotIn('Navin Regmi', [suggestion['name'] for suggestion in get_suggestions('reei', index, 2)])
+        index.add(['Sita Regmi'])
+        self.assertIs(index.deletion_index.token_index, index.token_index)
+        names = [suggestion['name'] for suggestion in get_suggestions('reei', index, 3, typo_distance=2)]
+        self.assertEqual(sorted(names[:2]), ['Navin Regmi', 'Sita Regmi'])
+
+if __name__ == '__main__':
+    unittest.main()
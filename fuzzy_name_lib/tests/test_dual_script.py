@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from fuzzy_name_lib.dual_script import DualScriptIndex, script_forms
+from fuzzy_name_lib.search import search_name, search_names_bulk
+from fuzzy_name_lib.sessions import SuggestionSessions
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.snapshot import load_or_build, load_snapshot, save_snapshot
+from fuzzy_name_lib.suggestion import get_suggestions
+
+class TestDualScriptIndex(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'names': ['Ramesh Kumar', 'Suresh Thapa', 'सीता देवी', 'रमेश कुमार'],
+            'age': [30, 41, 52, 23],
+            'location': pd.Categorical(['Delhi', 'Mumbai', 'Pune', 'Delhi']),
+        })
+        self.index = DualScriptIndex.from_dataframe(self.data)
+
+    def test_script_forms(self):
+        roman, devanagari = script_forms(['Ramesh', 'सीता'])
+        self.assertEqual(roman, ['ramesh', 'sita'])
+        self.assertEqual(devanagari, ['रमेश', 'सीता'])
+
+    def test_queries_match_both_scripts_without_translation(self):
+        with mock.patch('fuzzy_name_lib.search.translate_input') as translate:
+            roman = search_name('sita devi', self.index)
+            devanagari = search_name('रमेश', self.index)
+        translate.assert_not_called()
+        self.assertEqual(roman[0]['name'], 'सीता देवी')
+        self.assertEqual({result['name'] for result in devanagari[:2]}, {'Ramesh Kumar', 'रमेश कुमार'})
+        self.assertEqual(roman[0]['age'], 52)
+
+    def test_add_keeps_views_aligned(self):
+        row_id = self.index.add_record({'names': 'सुरेश', 'age': 60, 'location': 'Indore'})
+        self.assertEqual(row_id, 4)
+        self.assertEqual(len(self.index.roman), len(self.index.devanagari))
+        self.assertEqual(self.index.devanagari.names[row_id], 'सुरेश')
+        self.assertEqual(self.index.roman.lower_names[row_id], 'suresh')
+        self.assertIn('सुरेश', [result['name'] for result in search_name('suresh', self.index)])
+
+    def test_views_are_pinned_together(self):
+        before = search_name('रमेश', self.index), get_suggestions('र', self.index)
+        # Mid-add: the Devanagari view has the new row, the Roman view and the names do not yet
+        self.index.devanagari._extend_match_names(['रमेश'])
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual((search_name('रमेश', self.index), get_suggestions('र', self.index)), before)
+
+    def test_bulk_and_suggestions_match_single_queries(self):
+        queries = ['ramesh', 'सीता', '', 'ramesh']
+        bulk = dict(search_names_bulk(queries, self.index))
+        self.assertEqual(bulk[''], [])
+        for query in ['ramesh', 'सीता']:
+            self.assertEqual(bulk[query], search_name(query, self.index))
+        sessions = SuggestionSessions(self.index)
+        for query in ['र', 'रम', 'ra', 'ram']:
+            self.assertEqual(sessions.suggest('client', query), get_suggestions(query, self.index))
+
+    def test_snapshot_round_trip(self):
+        self.index.add_record({'names': 'सुरेश', 'age': 60, 'location': 'Indore'})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index')
+            save_snapshot(self.index, path)
+            loaded = load_snapshot(path)
+            self.assertIsInstance(loaded, DualScriptIndex)
+            for query in ['suresh', 'रमेश']:
+                self.assertEqual(search_name(query, loaded), search_name(query, self.index))
+            loaded.add_record({'names': 'Mahesh', 'age': 33, 'location': 'Pune'})
+            self.assertEqual(search_name('महेश', loaded)[0]['name'], 'Mahesh')
+
+    def test_versions_keep_index_kinds_apart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index')
+            load_or_build(path, lambda: self.index, version='dual-script')
+            single = load_or_build(path, lambda: NameIndex.from_dataframe(self.data), version='single-script')
+            self.assertIsInstance(single, NameIndex)
+            self.assertIsInstance(load_or_build(path, lambda: self.index, version='dual-script'), DualScriptIndex)
+
+if __name__ == '__main__':
+    unittest.main()
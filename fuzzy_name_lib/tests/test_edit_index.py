@@ -0,0 +1,66 @@
+import sys
+import threading
+import unittest
+import numpy as np
+from rapidfuzz.distance import Levenshtein
+from fuzzy_name_lib import edit_index
+from fuzzy_name_lib.edit_index import EditDistanceIndex
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.search import search_name
+
+NAMES = ['ramesh', 'ramesh kumar', 'rajesh', 'suresh', 'ramesh', 'mahesh', 'रमेश', 'ramu', 'r', '']
+
+class TestEditDistanceIndex(unittest.TestCase):
+    def brute_force(self, names, query, max_edits):
+        distances = np.array([Levenshtein.distance(query, name) for name in names])
+        row_ids = np.flatnonzero(distances <= max_edits)
+        return row_ids.tolist(), distances[row_ids].tolist()
+
+    def test_search_matches_brute_force(self):
+        index = EditDistanceIndex(NAMES[:5])
+        index.add(NAMES[5:])
+        for compacted in (False, True):
+            if compacted:
+                index.compact()
+            for query in ['ramesh', 'rmesh', 'sursh', 'रमेश', 'ramesh kumr', 'x', '']:
+                for max_edits in (0, 1, 2):
+                    row_ids, distances, visited = index.search([query], max_edits)
+                    self.assertEqual((row_ids.tolist(), distances.tolist()), self.brute_force(NAMES, query, max_edits))
+
+    def test_added_names_are_folded_in(self):
+        index = EditDistanceIndex(NAMES)
+        for i in range(edit_index.MIN_TAIL_SIZE + 1):
+            index.add([f'filler {i}'])
+        self.assertFalse(index.state[3])  # compacted once the added names outgrew the tail
+        self.assertEqual(index.search(['filler 7'], 0)[0].tolist(), [len(NAMES) + 7])
+
+    def test_search_during_adds(self):
+        index = EditDistanceIndex(NAMES)
+        adding = threading.Thread(target=lambda: [index.add([f'name {i}']) for i in range(20000)])
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads often, so searches overlap adds
+        try:
+            adding.start()
+            while adding.is_alive():
+                self.assertIn(0, index.search(['ramesh'], 2)[0].tolist())
+            adding.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+    def test_far_prefixes_are_skipped(self):
+        names = [f'{prefix}{suffix}' for prefix in ['ab', 'cd', 'ef', 'gh'] for suffix in ['one', 'two', 'six']]
+        _, _, visited = EditDistanceIndex(names).search(['abone'], 1)
+        self.assertLess(visited, sum(len(name) for name in names) // 2)
+
+    def test_search_name_max_edits(self):
+        index = NameIndex(['Ramesh', 'Ramesh Kumar', 'Rajesh', 'Suresh', 'रमेश'])
+        self.assertEqual([result['name'] for result in search_name('Ramehs', index, max_edits=2)], ['Ramesh'])
+        # Fewest edits first; the Devanagari name matches through the query's translation
+        results = search_name('Ramesh', index, max_edits=1)
+        self.assertEqual([result['name'] for result in results], ['Ramesh', 'रमेश', 'Rajesh'])
+        index.add(['Ramesh'])
+        self.assertEqual(len(search_name('Ramesh', index, max_edits=0)), 3)
+        self.assertEqual(len(search_name('Ramesh', index, max_edits=1, limit=2)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
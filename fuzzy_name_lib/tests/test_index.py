@@ -0,0 +1,54 @@
+import unittest
+from fuzzy_name_lib.index import NameIndex, as_name_index
+from fuzzy_name_lib.search import search_name
+from fuzzy_name_lib.sessions import SuggestionSessions
+from fuzzy_name_lib.suggestion import get_suggestions
+import pandas as pd
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({'names': ['Ramesh', 'Suresh', 'Mahesh'], 'location': ['Delhi', 'Mumbai', 'Pune']})
+
+    def test_columns_are_precomputed(self):
+        index = NameIndex.from_dataframe(self.data)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.lower_names.tolist(), ['ramesh', 'suresh', 'mahesh'])
+        self.assertEqual(index.phonetic_codes[0], 'R520')
+        self.assertEqual(index.field('location', 1), 'Mumbai')
+        self.assertEqual(index.field('age', 1), 'N/A')
+
+    def test_search_accepts_index(self):
+        index = as_name_index(self.data)
+        self.assertIs(as_name_index(index), index)
+        self.assertEqual(search_name('Ramesh', index), search_name('Ramesh', self.data))
+    def test_added_records_are_searchable(self):
+        index = NameIndex.from_dataframe(self.data)
+        for i in range(300):
+            index.add([f'Filler {i}'], {'location': ['Indore']})
+        row_id = index.add_record({'names': 'Dinesh Yadav', 'location': 'Dewas', 'age': 41})
+        self.assertEqual(row_id, 303)
+        self.assertEqual(len(index.name_array), 304)
+        self.assertEqual(index.prefix_index.lookup('din').tolist(), [303])
+        result = search_name('Dinesh Yadav', index)
+        self.assertEqual(result[0]['name'], 'Dinesh Yadav')
+        self.assertEqual(result[0]['location'], 'Dewas')
+        self.assertEqual(index.field('location', 5), 'Indore')
+
+    def test_queries_skip_a_half_added_row(self):
+        # What a reader sees while add() is between the match arrays and the names
+        index = NameIndex.from_dataframe(self.data)
+        for lazy in ('deletion_index', 'edit_index', 'minhash_index', 'token_index'):
+            getattr(index, lazy)
+        index._extend_match_names(['ramesh kumar'])
+        self.assertEqual(len(index), 3)
+        for options in ({}, {'typo_distance': 1}, {'max_edits': 2}, {'tokens': True}, {'lsh': True}):
+            names = [result['name'] for result in search_name('Ramesh', index, **options)]
+            self.assertIn('Ramesh', names)
+        clean = NameIndex.from_dataframe(self.data)
+        for query in ('', 'r', 'ram'):
+            self.assertEqual(get_suggestions(query, index, typo_distance=1),
+                             get_suggestions(query, clean, typo_distance=1))
+        self.assertEqual(SuggestionSessions(index).suggest('client', 'ram'), get_suggestions('ram', index))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from fuzzy_name_lib import metrics
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.search import search_name
+from fuzzy_name_lib.suggestion import get_suggestions
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(['Ramesh', 'Rajesh', 'Ramesh Kumar', 'Suresh', 'Mahesh'])
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.enable(False)
+        metrics.end_request()
+        metrics.reset()
+
+    def test_records_nothing_while_disabled(self):
+        metrics.enable(False)
+        search_name('Ramesh', self.index)
+        self.assertNotIn('fuzzy_name_stage_seconds', metrics.render())
+
+    def test_search_and_suggestion_stages_are_rendered(self):
+        search_name('Ramesh', self.index)
+        get_suggestions('ram', self.index)
+        text = metrics.render()
+        for stage in ['search.translate', 'search.phonetic', 'search.score', 'search.select', 'search.results',
+                      'suggest.translate', 'suggest.prefix', 'suggest.rank']:
+            self.assertIn(f'fuzzy_name_stage_seconds_count{{stage="{stage}"}} 1', text)
+        self.assertIn('fuzzy_name_rows_scored_count{operation="search"} 1', text)
+        self.assertIn('fuzzy_name_rows_scored_sum{operation="search"} 5', text)
+        self.assertIn('fuzzy_name_stage_seconds_bucket{stage="search.score",le="+Inf"} 1', text)
+        self.assertIn('# TYPE fuzzy_name_translation_cache_hit_rate gauge', text)
+        self.assertIn('# TYPE fuzzy_name_translation_cache_hits_total counter', text)
+        self.assertIn('# TYPE fuzzy_name_translation_cache_misses_total counter', text)
+        self.assertNotIn('fuzzy_name_translation_cache_hits ', text)
+
+    def test_request_record_holds_only_that_request(self):
+        search_name('Ramesh', self.index)
+        metrics.begin_request()
+        get_suggestions('ram', self.index)
+        record = metrics.end_request()
+        self.assertIn('suggest.prefix', record['stages'])
+        self.assertNotIn('search.score', record['stages'])
+        self.assertEqual(record['fuzzy_name_candidates']['prefix'], 2)
+        self.assertIsNone(metrics.end_request())
+
+    def test_counters(self):
+        metrics.increment('fuzzy_name_http_requests_total', endpoint='/search', status=200)
+        metrics.increment('fuzzy_name_http_requests_total', endpoint='/search', status=200)
+        self.assertIn('fuzzy_name_http_requests_total{endpoint="/search",status="200"} 2', metrics.render())
+
+if __name__ == '__main__':
+    unittest.main()
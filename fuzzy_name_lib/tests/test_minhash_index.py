@@ -0,0 +1,45 @@
+import unittest
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.minhash_index import MinHashIndex
+from fuzzy_name_lib.search import search_name
+
+NAMES = ['ramesh kumar', 'rajesh kumar', 'suresh thapa', 'ramesh kumar', 'kamla devi', 'ra', 'रमेश कुमार']
+
+class TestMinHashIndex(unittest.TestCase):
+    def test_identical_names_share_every_bucket(self):
+        index = MinHashIndex(NAMES, bands=8, rows=2)
+        self.assertEqual(index.keys.shape, (8, len(NAMES) - 1))  # 'ra' has no trigrams
+        candidates = index.candidates(['ramesh kumar'])
+        self.assertIn(0, candidates)
+        self.assertIn(3, candidates)
+        self.assertNotIn(5, candidates)
+        self.assertEqual(index.candidates(['ra']).tolist(), [])
+
+    def test_more_rows_per_band_give_fewer_candidates(self):
+        names = [f'{first} {last}' for first in ['ramesh', 'rajesh', 'suresh', 'mahesh', 'dinesh']
+                 for last in ['kumar', 'thapa', 'devi', 'sharma']]
+        loose = MinHashIndex(names, bands=16, rows=1).candidates(['ramesh kumar'])
+        strict = MinHashIndex(names, bands=16, rows=4).candidates(['ramesh kumar'])
+        self.assertTrue(set(strict) <= set(loose))
+        self.assertLess(len(strict), len(loose))
+
+    def test_added_rows_before_and_after_compact(self):
+        index = MinHashIndex(NAMES[:3])
+        index.add(NAMES[3:])
+        before = index.candidates(['ramesh kumar'])
+        index.compact()
+        self.assertEqual(index.candidates(['ramesh kumar']).tolist(), before.tolist())
+        self.assertEqual(index.candidates(['ramesh kumar']).tolist(),
+                         MinHashIndex(NAMES).candidates(['ramesh kumar']).tolist())
+        self.assertEqual(len(index), len(NAMES))
+
+    def test_lsh_search_rescores_candidates(self):
+        index = NameIndex([name.title() for name in NAMES])
+        full = search_name('Ramesh Kumar', index, limit=3)
+        self.assertEqual(search_name('Ramesh Kumar', index, limit=3, lsh=True), full)
+        index.add(['Ramesh Kumar'])
+        self.assertEqual(len(search_name('Ramesh Kumar', index, lsh=True, limit=10)),
+                         len(search_name('Ramesh Kumar', index, limit=10)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import numpy as np
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.ngram_index import TrigramIndex, trigram_codes
+from fuzzy_name_lib.search import search_name
+
+NAMES = ['ramesh', 'rajesh', 'ramesh kumar', 'suresh', 'mahesh', 'ra', 'रमेश', 'kamla devi', 'ramu ramu']
+
+class TestTrigramIndex(unittest.TestCase):
+    def brute_force(self, names, query):
+        codes = trigram_codes(query)
+        shared = [len(codes & trigram_codes(name)) for name in names]
+        row_ids = np.flatnonzero(shared)
+        return row_ids.tolist(), [shared[row_id] for row_id in row_ids]
+
+    def test_shared_counts_match_brute_force(self):
+        index = TrigramIndex(NAMES[:5])
+        index.add(NAMES[5:])
+        for query in ['ramesh', 'esh', 'रमेश', 'ramu', 'xyz']:
+            for compacted in (False, True):
+                if compacted:
+                    index.compact()
+                row_ids, counts = index.shared_counts(query)
+                self.assertEqual((row_ids.tolist(), counts.tolist()), self.brute_force(NAMES, query))
+        self.assertEqual(len(index), len(NAMES))
+
+    def test_candidate_search_matches_full_search(self):
+        index = NameIndex([name.title() for name in NAMES])
+        for query in ['Ramesh', 'ramu', 'रमेश', 'qqqq']:
+            self.assertEqual(search_name(query, index, limit=3, max_candidates=50),
+                             search_name(query, index, limit=3))
+        # 'Ramesh' shares no trigram with 'mahes', so candidate mode misses it
+        full = search_name('mahes', index, limit=3)
+        self.assertEqual(search_name('mahes', index, limit=3, max_candidates=50), full[:1])
+
+if __name__ == '__main__':
+    unittest.main()
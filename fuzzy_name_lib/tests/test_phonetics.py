@@ -0,0 +1,21 @@
+import unittest
+from fuzzy_name_lib.phonetics import PhoneticIndex, indic_key, encode_names
+
+class TestPhonetics(unittest.TestCase):
+    def test_indic_key_folds_romanisation_variants(self):
+        self.assertEqual(indic_key('Vishwas'), indic_key('Wiswas'))
+        self.assertEqual(indic_key('Raam'), indic_key('Ram'))
+        self.assertEqual(indic_key('Kapoor'), indic_key('Kapur'))
+
+    def test_unencodable_names_get_none(self):
+        self.assertEqual(encode_names(['', '123', 'ram'], 'soundex'), [None, None, 'R500'])
+
+    def test_index_looks_up_sound_alike_rows(self):
+        index = PhoneticIndex(['ramesh', 'suresh', 'raamesh', 'mahesh'])
+        self.assertEqual(index.lookup('ramesh', 'soundex').tolist(), [0, 2])
+        self.assertEqual(index.candidates('raamesh', ['indic']).tolist(), [0, 2])
+        index.add(['ramesh kumar', 'rameesh'])
+        self.assertEqual(index.candidates('ramesh').tolist(), [0, 2, 5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import sys
+import threading
+import unittest
+from fuzzy_name_lib.prefix_index import PrefixIndex
+from fuzzy_name_lib.suggestion import get_suggestions
+import pandas as pd
+
+class TestPrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.names = ['ramesh', 'suresh', 'rajesh', 'रमेश', 'ram']
+
+    def test_lookup_returns_rows_with_prefix(self):
+        index = PrefixIndex(self.names)
+        self.assertEqual(index.lookup('ra').tolist(), [0, 2, 4])
+        self.assertEqual(index.lookup('ram', 'रम').tolist(), [0, 3, 4])
+        self.assertEqual(index.lookup('x').tolist(), [])
+        self.assertEqual(index.lookup('').tolist(), [])
+
+    def test_lookups_during_adds_and_compactions(self):
+        index = PrefixIndex(self.names)
+        names = list(self.names)
+        for i in range(20000):
+            names.append(f'{"ra" if i % 2 else "su"}{i}')
+
+        def add():
+            for row_id in range(len(self.names), len(names)):
+                index.add(names[row_id], row_id)
+
+        adding = threading.Thread(target=add)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads often, so lookups overlap adds and merges
+        try:
+            adding.start()
+            while adding.is_alive():
+                self.assertTrue(all(names[row_id].startswith('ra') for row_id in index.lookup('ra')))
+            adding.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(len(index.lookup('ra')), 10000 + 3)
+
+    def test_full_prefix_tier_skips_other_names(self):
+        data = pd.DataFrame({'names': ['Ramesh', 'Rajesh', 'Suresh', 'Ram']})
+        result = get_suggestions('Ra', data, limit=2)
+        self.assertEqual([r['name'] for r in result], ['Ram', 'Ramesh'])
+
+if __name__ == '__main__':
+    unittest.main()
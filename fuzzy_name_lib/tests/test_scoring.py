@@ -0,0 +1,36 @@
+import unittest
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.scoring import SEARCH_THRESHOLD, partial_ratio_blocks, partial_ratios, score_name, score_names, top_k
+
+class TestScoring(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(['Ramesh Kumar', 'Rajesh', 'Suresh', 'Kumar Ramesh', 'रमेश', 'R'])
+
+    def test_batched_scores_match_single_name_scores(self):
+        for query, translated in [('ramesh', 'रमेश'), ('ra', ''), ('kum', 'कुम')]:
+            scores, starts_with = score_names(self.index, query, translated)
+            for row_id, name in enumerate(self.index.lower_names):
+                expected = score_name(name, query, translated)
+                self.assertEqual((scores[row_id], starts_with[row_id]), expected)
+
+    def test_threshold_only_prunes_rows_below_it(self):
+        exact, _ = score_names(self.index, 'suresh', '')
+        pruned, _ = score_names(self.index, 'suresh', '', threshold=SEARCH_THRESHOLD)
+        for full, cut in zip(exact, pruned):
+            self.assertEqual(cut, full if full >= SEARCH_THRESHOLD else 0)
+
+    def test_top_k_keeps_row_order_for_equal_scores(self):
+        self.assertEqual(top_k([50, 90, 70, 90, 10], 3), [1, 3, 2])
+        self.assertEqual(top_k([50, 90], 5), [1, 0])
+        self.assertEqual(top_k([50, 90], 0), [])
+
+    def test_partial_ratio_blocks_match_one_query_at_a_time(self):
+        pairs = [('ramesh', 'रमेश'), ('su', ''), ('', ''), ('kum', 'कुम')]
+        for max_cells in (1, 12, 100):
+            blocks = list(partial_ratio_blocks(pairs, self.index.name_array, max_cells=max_cells))
+            self.assertEqual(len(blocks), len(pairs))
+            for block, pair in zip(blocks, pairs):
+                self.assertEqual(block.tolist(), partial_ratios(pair, self.index.name_array).tolist())
+
+if __name__ == '__main__':
+    unittest.main()
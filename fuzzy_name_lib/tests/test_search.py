@@ -1,5 +1,7 @@
+import itertools
 import unittest
-from fuzzy_name_lib.search import search_name
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.search import iter_search_name, search_name, search_names_bulk, search_page
 import pandas as pd
 
 class TestSearch(unittest.TestCase):
@@ -11,5 +13,43 @@ class TestSearch(unittest.TestCase):
         self.assertGreater(len(result), 0)
         self.assertEqual(result[0]['name'], 'Ramesh')
 
+    def test_search_limit(self):
+        result = search_name('Ramesh', self.data)
+        self.assertEqual(search_name('Ramesh', self.data, limit=1), result[:1])
+
+    def test_search_names_bulk(self):
+        names = ['Ramesh', 'suresh ', 'Ramesh', '']
+        result = list(search_names_bulk(names, self.data))
+        self.assertEqual([name for name, _ in result], names)
+        self.assertEqual(result[0][1], search_name('Ramesh', self.data))
+        self.assertEqual(result[1][1], search_name('Suresh', self.data))
+        self.assertEqual(result[2][1], result[0][1])
+        self.assertEqual(result[3][1], [])
+
+    def test_iter_search_name(self):
+        result = search_name('Ramesh', self.data)
+        self.assertEqual(list(iter_search_name('Ramesh', self.data)), result)
+        self.assertEqual(list(itertools.islice(iter_search_name('Ramesh', self.data), 1)), result[:1])
+
+    def test_search_pages(self):
+        # Equal scores are ranked by row id, so pages never repeat or skip a tie
+        index = NameIndex(['Ramesh', 'Ramesh', 'Rameshwar', 'Ramesh', 'Suresh', 'Mahesh', 'Ramesh Kumar'])
+        result = search_name('Ramesh', index)
+        pages, cursor = [], None
+        while True:
+            page, cursor = search_page('Ramesh', index, 2, cursor)
+            pages += page
+            if cursor is None:
+                break
+        self.assertEqual(pages, result)
+        # A row added after a page was served, ranking before it, does not shift the next page
+        page, cursor = search_page('Ramesh', index, 4)
+        index.add(['Ramesh'])
+        self.assertEqual(search_page('Ramesh', index, 2, cursor)[0], result[4:6])
+        with self.assertRaises(ValueError):
+            search_page('Ramesh', index, 2, 'not a cursor')
+        with self.assertRaises(ValueError):
+            search_page('Ramesh', index, 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import unittest
+from unittest import mock
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.sessions import SuggestionCancelled, SuggestionSessions
+from fuzzy_name_lib.suggestion import get_suggestions
+
+class TestSuggestionSessions(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(['Ramesh', 'Rajesh', 'Ramesh Kumar', 'Suresh', 'Mahesh', 'Ramu', 'Raman'])
+        self.sessions = SuggestionSessions(self.index, limit=3)
+
+    def test_keystrokes_match_get_suggestions(self):
+        for query in ['r', 'ra', 'ram', 'rame', 'ram', 'rajx', 'su']:
+            if query == 'rame':
+                self.index.add_record({'names': 'Rameshwar'})
+            self.assertEqual(self.sessions.suggest('client', query), get_suggestions(query, self.index, limit=3))
+
+    def test_coalesces_identical_requests_and_cancels_stale_ones(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_translate(text):
+            calls.append(text)
+            if text == 'ram':
+                started.set()
+                release.wait(5)
+            return text
+
+        results = {}
+
+        def suggest(client, query):
+            try:
+                results[client, query] = self.sessions.suggest(client, query)
+            except SuggestionCancelled:
+                results[client, query] = 'cancelled'
+
+        with mock.patch('fuzzy_name_lib.sessions.translate_input', slow_translate):
+            first = threading.Thread(target=suggest, args=('a', 'ram'))
+            first.start()
+            started.wait(5)
+            second = threading.Thread(target=suggest, args=('b', 'ram'))
+            second.start()
+            while len(self.sessions.in_flight['ram'].tickets) < 2:
+                pass
+            suggest('a', 'rame')
+            release.set()
+            first.join(5)
+            second.join(5)
+
+        self.assertEqual(calls, ['ram', 'rame'])
+        self.assertEqual(results['a', 'ram'], 'cancelled')
+        self.assertEqual(results['b', 'ram'], get_suggestions('ram', self.index, limit=3))
+        self.assertEqual(results['a', 'rame'], get_suggestions('rame', self.index, limit=3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.search import search_name
+from fuzzy_name_lib.sharding import ShardedIndex
+
+class TestShardedIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(['Ramesh', 'Rajesh', 'Ramesh Kumar', 'Suresh', 'Mahesh', 'Ramu', 'Raman'],
+                               {'location': ['Delhi', 'Pune', 'Delhi', 'Mumbai', 'Pune', 'Agra', 'Agra']})
+        self.sharded = ShardedIndex(self.index, shards=3)
+
+    def tearDown(self):
+        self.sharded.close()
+
+    def test_merged_results_match_search_name(self):
+        for query in ['Ramesh', 'suresh', 'xyz']:
+            self.assertEqual(self.sharded.search(query), search_name(query, self.index))
+            self.assertEqual(self.sharded.search(query, limit=2), search_name(query, self.index, limit=2))
+
+    def test_typo_distance(self):
+        for query in ['Rmesh Kumr', 'Surseh']:
+            self.assertEqual(self.sharded.search(query, typo_distance=2),
+                             search_name(query, self.index, typo_distance=2))
+
+    def test_added_rows_reach_a_shard(self):
+        self.index.add_record({'names': 'Rameshwar', 'location': 'Indore'})
+        self.assertEqual(self.sharded.search('Ramesh'), search_name('Ramesh', self.index))
+        self.assertEqual(sorted(len(shard.row_ids) for shard in self.sharded.shards), [2, 3, 3])
+
+if __name__ == '__main__':
+    unittest.main()
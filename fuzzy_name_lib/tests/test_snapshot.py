@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.search import search_name
+from fuzzy_name_lib.suggestion import get_suggestions
+from fuzzy_name_lib.snapshot import load_or_build, load_snapshot, save_snapshot, snapshot_matches
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'names': ['Ramesh', 'Suresh', 'Mahesh', 'रमेश'],
+            'age': [30, 41, 52, 23],
+            'location': pd.Categorical(['Delhi', 'Mumbai', 'Pune', 'Delhi']),
+        })
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'index')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_is_memory_mapped(self):
+        index = NameIndex.from_dataframe(self.data)
+        index.add_record({'names': 'Rameshwar', 'age': 60, 'location': 'Indore'})
+        save_snapshot(index, self.path, version='v1')
+        loaded = load_snapshot(self.path)
+        self.assertFalse(loaded.name_array.flags.writeable)  # mapped, not read into memory
+        self.assertEqual(search_name('Ramesh', loaded), search_name('Ramesh', index))
+        self.assertEqual(get_suggestions('Ra', loaded), get_suggestions('Ra', index))
+        self.assertEqual(search_name('Ramesh', loaded, limit=2, max_candidates=2),
+                         search_name('Ramesh', index, limit=2, max_candidates=2))
+
+        loaded.add_record({'names': 'Ramesh Kumar', 'age': 35, 'location': 'Delhi'})
+        self.assertEqual(search_name('Ramesh Kumar', loaded)[0]['name'], 'Ramesh Kumar')
+        self.assertEqual(len(load_snapshot(self.path)), 5)
+
+    def test_load_or_build_checks_version_and_rows(self):
+        builds = []
+        def build():
+            builds.append(1)
+            return NameIndex.from_dataframe(self.data)
+        load_or_build(self.path, build, version='v1', rows=4)
+        load_or_build(self.path, build, version='v1', rows=4)
+        self.assertEqual(len(builds), 1)
+        self.assertFalse(snapshot_matches(self.path, rows=5))
+        load_or_build(self.path, build, version='v2')
+        self.assertEqual(len(builds), 2)
+
+    def test_load_or_build_appends_rows_added_since(self):
+        builds = []
+        def build():
+            builds.append(1)
+            return NameIndex.from_dataframe(self.data.iloc[:3])
+        load_or_build(self.path, build, version='v1', rows=3)
+        loaded = load_or_build(self.path, build, version='v1', rows=4, load_rows=lambda start: self.data.iloc[start:])
+        self.assertEqual(len(builds), 1)
+        self.assertEqual((len(loaded), loaded.field('age', 3), loaded.field('location', 3)), (4, 23, 'Delhi'))
+        self.assertEqual(search_name('Ramesh', loaded), search_name('Ramesh', NameIndex.from_dataframe(self.data)))
+        self.assertTrue(snapshot_matches(self.path, version='v1', rows=4))
+
+    def test_saves_switch_a_symlink(self):
+        index = NameIndex.from_dataframe(self.data)
+        os.makedirs(self.path)  # a snapshot directory from before snapshots were symlinked
+        save_snapshot(index, self.path, version='v1')
+        first = load_snapshot(self.path)
+        for version in ('v2', 'v3'):
+            save_snapshot(index, self.path, version=version)
+        self.assertTrue(os.path.islink(self.path))
+        self.assertTrue(snapshot_matches(self.path, version='v3'))
+        snapshots = [name for name in os.listdir(self.tmp.name) if name[len('index.'):][:1].isdigit()]
+        self.assertEqual(len(snapshots), 2)  # the current snapshot and the one before it
+        self.assertEqual(search_name('Ramesh', first), search_name('Ramesh', index))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from fuzzy_name_lib import NameIndex, search_name
+from fuzzy_name_lib.storage import SQLiteBackend
+
+class TestSQLiteBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = SQLiteBackend(os.path.join(self.tmp.name, 'names.sqlite3'))
+        self.data = pd.DataFrame({
+            'names': ['Ramesh Kumar', 'Rajesh', 'Suresh', 'रमेश', 'Mahesh', 'Ramu', 'Kamla Devi'],
+            'age': [30, 40, 50, 60, 35, 45, 55],
+            'location': ['Delhi', 'Pune', 'Agra', 'Delhi', 'Pune', 'Agra', 'Delhi'],
+            'casetype': ['theft', 'fraud', 'theft', 'theft', 'fraud', 'theft', 'fraud'],
+            'casefir': [f'FIR-{number}' for number in range(7)],
+            'voter_gender': ['M', 'M', 'M', 'M', 'M', 'M', 'F'],
+        })
+        self.backend.insert(self.data)
+
+    def tearDown(self):
+        self.backend.close()
+        self.tmp.cleanup()
+
+    def test_search_matches_search_name(self):
+        index = NameIndex.from_dataframe(self.backend.load())
+        for query in ['Ramesh', 'rajesh', 'रमेश', 'Mahes', 'ra', 'qqqq']:
+            self.assertEqual(self.backend.search(query, limit=5), search_name(query, index, limit=5))
+
+    def test_inserted_rows_are_searchable(self):
+        self.backend.add_record({'names': 'Rameshwar', 'age': 20, 'location': 'Agra', 'casetype': 'theft',
+                                 'casefir': 'FIR-7', 'voter_gender': 'M'})
+        results = self.backend.search('Rameshwar', limit=1)
+        self.assertEqual(results[0]['name'], 'Rameshwar')
+        self.assertEqual(results[0]['casefir'], 'FIR-7')
+        self.assertEqual(len(self.backend.load()), 8)
+
+if __name__ == '__main__':
+    unittest.main()
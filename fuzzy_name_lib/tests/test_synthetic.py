@@ -0,0 +1,44 @@
+import unittest
+import pandas as pd
+from fuzzy_name_lib.synthetic import NOISE_OPERATIONS, NameModel, perturb
+
+class TestSynthetic(unittest.TestCase):
+    def setUp(self):
+        self.model = NameModel.from_dataframe(pd.DataFrame({
+            'Names': ['Ramesh Kumar', 'Sita . Rai', 'राम बहादुर थापा', 'hari thapa', 'Gita  Rai'],
+            'age': [30, 41, 25, 52, 33],
+            'location': ['Dewas', 'Indore', 'Dewas', 'Rewa', 'Dewas'],
+            'caseFIR': ['FIR-2005-931', 'FIR-2012-286', 'FIR-2011-591', 'FIR-2020-100', 'FIR-2001-660'],
+        }))
+
+    def test_sample_is_reproducible_and_learned(self):
+        table = self.model.sample(200, seed=7)
+        self.assertTrue(table.equals(self.model.sample(200, seed=7)))
+        self.assertEqual(list(table.columns), ['names', 'age', 'location', 'casefir'])
+        self.assertTrue(set(table['location']) <= {'Dewas', 'Indore', 'Rewa'})
+        self.assertTrue(table['age'].between(25, 52).all())
+        surnames = {name.split()[-1].lower() for name in table['names'] if len(name.split()) > 1}
+        self.assertTrue(surnames <= {'kumar', 'rai', 'थापा', 'thapa'})
+
+    def test_noise_rates_are_learned(self):
+        model = NameModel.from_dataframe(pd.DataFrame({'Names': [
+            'Arvind Verma', 'Sunil Verma', 'Mohan Verma', 'Arvind Verm', 'Gita Rai', 'Sita Rai', 'Hari Raai',
+            'Ram Thapa', 'Sita . Thapa', 'राम थापा']}))
+        self.assertEqual(model.noise['drop_last'], 1 / 9)  # 'Verm' of 9 Roman names
+        self.assertEqual(model.noise['double_vowel'], 1 / 9)  # 'Raai'
+        self.assertEqual(model.noise['swap'], 0)
+        self.assertEqual((model.noise['stray_dot'], model.noise['transliterate']), (0.1, 0.1))
+        probabilities = dict(zip(NOISE_OPERATIONS, model.noise_probabilities()))
+        self.assertEqual(probabilities['swap'], 0)
+        self.assertAlmostEqual(sum(probabilities.values()), 1)
+        noisy = perturb(['Ram Thapa'] * 20, operations=('swap', 'drop_last'), probabilities=[0, 1])
+        self.assertEqual(set(noisy), {'Ram Thap'})
+
+    def test_perturb(self):
+        names = ['Ramesh Kumar', 'राम थापा']
+        self.assertEqual(perturb(names, seed=1), perturb(names, seed=1))
+        self.assertEqual(perturb(names, operations=('drop_last',))[0], 'Ramesh Kuma')
+        self.assertTrue(perturb(['राम थापा'], operations=('swap',))[0].isascii())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from fuzzy_name_lib.index import NameIndex
+from fuzzy_name_lib.search import search_name, search_page
+from fuzzy_name_lib.token_index import TokenIndex, align_tokens, name_tokens
+
+NAMES = ['karan s. dhami', 'diksha . kadel', 'karan dhami', 'ramesh dhami', 'k.s. dhami', 'suresh thapa']
+
+class TestTokenIndex(unittest.TestCase):
+    def test_name_tokens_normalise_initials_and_punctuation(self):
+        self.assertEqual(name_tokens('Karan S. Dhami'), ['karan', 's', 'dhami'])
+        self.assertEqual(name_tokens('K.S. Dhami'), ['k', 's', 'dhami'])
+        self.assertEqual(name_tokens('Diksha . Kadel'), ['diksha', 'kadel'])
+        self.assertEqual(name_tokens('रमेश  कुमार'), ['रमेश', 'कुमार'])
+
+    def test_align_tokens(self):
+        # One list per name token of its similarity to each query token; one to one, best pairs first
+        self.assertEqual(align_tokens([[100.0, 0.0], [0.0, 0.0], [0.0, 100.0]], 2), 98.0)
+        self.assertEqual(align_tokens([[90.0, 80.0], [85.0, 10.0]], 2), 50.0)  # greedy, not optimal
+        self.assertEqual(align_tokens([[100.0], [90.0]], 1), 98.0)
+        self.assertEqual(align_tokens([], 1), 0.0)
+
+    def test_surname_touches_only_rows_holding_it(self):
+        index = TokenIndex(NAMES)
+        self.assertEqual(index.matching_rows(['dhami']).tolist(), [0, 2, 3, 4])
+        self.assertEqual(index.matching_rows(['dhamy']).tolist(), [0, 2, 3, 4])
+        self.assertEqual(index.matching_rows(['s']).tolist(), [0, 4])  # initials only retrieve themselves
+        self.assertEqual([index.tokens[token_id] for token_id in index.row_token_ids(4)], ['k', 's', 'dhami'])
+
+    def test_added_rows_before_and_after_compact(self):
+        index = TokenIndex(NAMES[:3])
+        index.add(NAMES[3:])
+        before = index.matching_rows(['dhami']), index.scores(['dhami'], np.arange(6))
+        index.compact()
+        after = index.matching_rows(['dhami']), index.scores(['dhami'], np.arange(6))
+        full = TokenIndex(NAMES)
+        for rows, scores in (before, after):
+            self.assertEqual(rows.tolist(), full.matching_rows(['dhami']).tolist())
+            self.assertEqual(scores.tolist(), full.scores(['dhami'], np.arange(6)).tolist())
+
+    def test_token_search(self):
+        index = NameIndex([name.title() for name in NAMES])
+        names = [result['name'] for result in search_name('Dhami Karan', index, tokens=True)]
+        self.assertEqual(names[:3], ['Karan Dhami', 'Karan S. Dhami', 'K.S. Dhami'])
+        surname = search_name('dhami', index, tokens=True)
+        self.assertEqual(len(surname), 4)
+        self.assertEqual(search_name('dhami', index, tokens=True, limit=2), surname[:2])
+        page, cursor = search_page('dhami', index, 3, tokens=True)
+        self.assertEqual(page + search_page('dhami', index, 3, cursor, tokens=True)[0], surname)
+        index.add(['Sita Dhami'])
+        self.assertIn('Sita Dhami', [result['name'] for result in search_name('dhami', index, tokens=True)])
+
+if __name__ == '__main__':
+    unittest.main()
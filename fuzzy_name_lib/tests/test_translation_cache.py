@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from fuzzy_name_lib import translation
+from fuzzy_name_lib.translation_cache import TranslationCache
+
+class TestTranslationCache(unittest.TestCase):
+    def test_lru_bound_and_ttl(self):
+        cache = TranslationCache(maxsize=2)
+        cache.set('google', 'ram', 'राम')
+        cache.set('google', 'shyam', 'श्याम')
+        self.assertEqual(cache.get('google', 'ram'), 'राम')
+        cache.set('google', 'sita', 'सीता')  # evicts "shyam", the least recently used
+        self.assertIsNone(cache.get('google', 'shyam'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+        expired = TranslationCache(ttl=-1)
+        expired.set('google', 'ram', 'राम')
+        self.assertIsNone(expired.get('google', 'ram'))
+
+    def test_persisted_cache_starts_warm(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.sqlite3')
+            cache = TranslationCache(path=path)
+            cache.set('google', 'ram', 'राम')
+            cache.close()
+            restarted = TranslationCache(path=path)
+            self.assertEqual(restarted.get('google', 'ram'), 'राम')
+            restarted.close()
+
+    def test_persisted_cache_keeps_lru_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.sqlite3')
+            cache = TranslationCache(path=path)
+            for text, translated in [('ram', 'राम'), ('shyam', 'श्याम'), ('sita', 'सीता')]:
+                cache.set('google', text, translated)
+            cache.get('google', 'ram')  # used last, though it expires first
+            cache.close()
+            restarted = TranslationCache(maxsize=2, path=path)
+            self.assertEqual(list(restarted.entries), [('google', 'sita'), ('google', 'ram')])
+            restarted.close()
+
+    def test_translate_input_caches_remote_backend(self):
+        calls = []
+        original = translation.BACKENDS['google']
+        translation.BACKENDS['google'] = lambda text: calls.append(text) or text.upper()
+        cache = translation.configure_translation_cache()
+        try:
+            self.assertEqual(translation.translate_input('ram', backend='google'), 'RAM')
+            self.assertEqual(translation.translate_input('ram', backend='google'), 'RAM')
+            self.assertEqual(calls, ['ram'])
+            self.assertEqual(cache.stats()['hits'], 1)
+        finally:
+            translation.BACKENDS['google'] = original
+            translation.configure_translation_cache()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from fuzzy_name_lib.transliteration import to_devanagari, to_roman, transliterate
+from fuzzy_name_lib.translation import translate_input
+
+class TestTransliteration(unittest.TestCase):
+    def test_devanagari_to_roman(self):
+        self.assertEqual(to_roman('रमेश'), 'ramesh')
+        self.assertEqual(to_roman('कमलेश कुमार'), 'kamlesh kumar')
+        self.assertEqual(to_roman('लक्ष्मी मिश्र'), 'lakshmi mishra')
+        self.assertEqual(to_roman('संजिब  थारु'), 'sanjib  tharu')
+
+    def test_roman_to_devanagari(self):
+        self.assertEqual(to_devanagari('Ramesh'), 'रमेश')
+        self.assertEqual(to_devanagari('hindu'), 'हिंदू')
+        self.assertEqual(to_devanagari('Rekha Chowdhary'), 'रेखा चौधरी')
+
+    def test_initials_are_spelled_out(self):
+        self.assertEqual(to_devanagari('Karan S. Dhami'), 'करन एस. धमी')
+        self.assertEqual(to_devanagari('K.S. Dhami'), 'के.एस. धमी')
+        for name in ['karan s. dhami', 'k.s. dhami', 'w. thapa']:
+            self.assertEqual(to_roman(to_devanagari(name)), name)
+        self.assertEqual(to_roman('राम के घर'), 'ram ke ghar')  # only followed by '.' is a letter's name
+
+    def test_round_trip_and_default_backend(self):
+        for name in ['suresh', 'sanjay', 'deepak thapa']:
+            self.assertEqual(to_roman(to_devanagari(name)), name.replace('ee', 'i'))
+        self.assertEqual(translate_input('ramesh'), transliterate('ramesh'))
+        self.assertEqual(translate_input('सुरेश'), 'suresh')
+
+if __name__ == '__main__':
+    unittest.main()